@@ -18,6 +18,7 @@ from .embodied_agent import EmbodiedAgent
 from .knowledge_graph_agent import KnowledgeGraphAgent
 from .role_assignment_agent import RoleAssignmentAgent
 from .search_agent import SearchAgent
+from .step_observer import StepObserver
 from .task_agent import (
     TaskCreationAgent,
     TaskPlannerAgent,
@@ -41,4 +42,5 @@ __all__ = [
     'RoleAssignmentAgent',
     'SearchAgent',
     'KnowledgeGraphAgent',
+    'StepObserver',
 ]
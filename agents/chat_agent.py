@@ -13,22 +13,42 @@
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 from __future__ import annotations
 
+import asyncio
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 from camel.agents.base import BaseAgent
+from camel.agents.step_observer import StepObserver
 from camel.configs import ChatGPTConfig
 from camel.memories import (
     AgentMemory,
     ChatHistoryMemory,
+    CompactionStrategy,
     MemoryRecord,
     ScoreBasedContextCreator,
 )
 from camel.messages import BaseMessage, FunctionCallingMessage, OpenAIMessage
-from camel.models import BaseModelBackend, ModelFactory
-from camel.responses import ChatAgentResponse
+from camel.models import BaseModelBackend, ModelFactory, prompt_tokens_hint
+from camel.responses import (
+    AsyncChatAgentStream,
+    ChatAgentResponse,
+    ChatAgentStream,
+)
 from camel.types import (
     ChatCompletion,
     ChatCompletionChunk,
@@ -36,13 +56,20 @@ from camel.types import (
     OpenAIBackendRole,
     RoleType,
 )
-from camel.utils import get_model_encoding
+from camel.utils import (
+    PhaseTimer,
+    TokenizerRegistry,
+    get_model_encoding,
+    time_phase,
+)
 
 if TYPE_CHECKING:
-    from openai import Stream
+    from openai import AsyncStream, Stream
+    from openai.types.chat import ChatCompletionMessageToolCall
 
     from camel.configs import BaseConfig
     from camel.functions import OpenAIFunction
+    from camel.models import RateLimiter, ResponseCache
     from camel.terminators import ResponseTerminator
 
 
@@ -75,6 +102,68 @@ class FunctionCallingRecord:
         )
 
 
+class _StreamAccumulator:
+    r"""Accumulates the chunks of a streamed chat completion. The content
+    deltas of every choice are collected in a buffer and only joined once
+    the choice finishes.
+
+    Args:
+        role_name (str): The role name of the output messages.
+        role_type (RoleType): The role type of the output messages.
+    """
+
+    def __init__(self, role_name: str, role_type: RoleType) -> None:
+        self.role_name = role_name
+        self.role_type = role_type
+        self.response_id: str = ""
+        self._buffers: Dict[int, List[str]] = defaultdict(list)
+        self._finish_reasons: Dict[int, str] = {}
+        self._output_messages: List[BaseMessage] = []
+
+    def add_chunk(self, chunk: ChatCompletionChunk) -> List[Tuple[int, str]]:
+        r"""Adds a chunk to the buffers, and creates an output message for
+        every choice that finishes in this chunk.
+
+        Args:
+            chunk (ChatCompletionChunk): A chunk of the streamed response.
+
+        Returns:
+            List[Tuple[int, str]]: The non-empty content deltas in the chunk,
+                with the index of the choice they belong to.
+        """
+        self.response_id = chunk.id
+        deltas: List[Tuple[int, str]] = []
+        # All choices in one response share one role
+        for choice in chunk.choices:
+            index = choice.index
+            delta = choice.delta
+            if delta.content is not None:
+                # When response has not been stopped
+                # Notice that only the first chunk_dict has the "role"
+                self._buffers[index].append(delta.content)
+                if delta.content:
+                    deltas.append((index, delta.content))
+            else:
+                self._finish_reasons[index] = str(choice.finish_reason)
+                chat_message = BaseMessage(
+                    role_name=self.role_name,
+                    role_type=self.role_type,
+                    meta_dict=dict(),
+                    content="".join(self._buffers[index]),
+                )
+                self._output_messages.append(chat_message)
+        return deltas
+
+    def finalize(self) -> Tuple[List[BaseMessage], List[str], str]:
+        r"""Returns the output messages, the finish reasons and the id of the
+        response after the stream has ended."""
+        finish_reasons = [
+            self._finish_reasons.get(i, "")
+            for i in range(len(self._finish_reasons))
+        ]
+        return self._output_messages, finish_reasons, self.response_id
+
+
 class ChatAgent(BaseAgent):
     r"""Class for managing conversations of CAMEL Chat Agents.
 
@@ -104,6 +193,29 @@ class ChatAgent(BaseAgent):
         response_terminators (List[ResponseTerminator], optional): List of
             :obj:`ResponseTerminator` bind to one chat agent.
             (default: :obj:`None`)
+        response_cache (ResponseCache, optional): A cache to serve repeated
+            model requests from. (default: :obj:`None`)
+        rate_limiter (RateLimiter, optional): A rate limiter, usually shared
+            by several agents, admitting the model requests of this agent.
+            (default: :obj:`None`)
+        record_timings (bool, optional): Whether to measure the latency of
+            the phases of :meth:`step`, :meth:`step_async` and the streamed
+            steps, and report it under `"timings"` in the info of the
+            response.
+            (default: :obj:`False`)
+        step_observers (List[StepObserver], optional): Observers receiving
+            the latency of the phases of every step. Timings are measured if
+            any observer is given. (default: :obj:`None`)
+        token_estimate_margin (float, optional): If set, context token
+            counts are estimated from the text length instead of being
+            tokenized, unless the estimate is within this relative margin of
+            the token limit. See :obj:`ScoreBasedContextCreator`. Only used
+            if :obj:`memory` is `None`. (default: :obj:`None`)
+        compaction_strategies (List[CompactionStrategy], optional): The
+            strategies reducing the context when it exceeds the token limit,
+            applied before the low-score messages are pruned. See
+            :obj:`ScoreBasedContextCreator`. Only used if :obj:`memory` is
+            `None`. (default: :obj:`None`)
     """
 
     def __init__(
@@ -118,6 +230,12 @@ class ChatAgent(BaseAgent):
         output_language: Optional[str] = None,
         tools: Optional[List[OpenAIFunction]] = None,
         response_terminators: Optional[List[ResponseTerminator]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        record_timings: bool = False,
+        step_observers: Optional[List[StepObserver]] = None,
+        token_estimate_margin: Optional[float] = None,
+        compaction_strategies: Optional[List[CompactionStrategy]] = None,
     ) -> None:
         self.orig_sys_message: BaseMessage = system_message
         self.system_message = system_message
@@ -139,12 +257,18 @@ class ChatAgent(BaseAgent):
         self.model_config = model_config or ChatGPTConfig()
         self._api_key = api_key
         self.model_backend: BaseModelBackend = ModelFactory.create(
-            self.model_type, self.model_config.__dict__, self._api_key
+            self.model_type,
+            self.model_config.__dict__,
+            self._api_key,
+            response_cache=response_cache,
+            rate_limiter=rate_limiter,
         )
         self.model_token_limit = token_limit or self.model_backend.token_limit
         context_creator = ScoreBasedContextCreator(
             self.model_backend.token_counter,
             self.model_token_limit,
+            estimate_margin=token_estimate_margin,
+            compaction_strategies=compaction_strategies,
         )
         self.memory: AgentMemory = memory or ChatHistoryMemory(
             context_creator, window_size=message_window_size
@@ -152,6 +276,8 @@ class ChatAgent(BaseAgent):
 
         self.terminated: bool = False
         self.response_terminators = response_terminators or []
+        self.record_timings = record_timings
+        self.step_observers = step_observers or []
         self.init_messages()
 
     def reset(self):
@@ -205,7 +331,13 @@ class ChatAgent(BaseAgent):
                 messages.
             role (OpenAIBackendRole): The backend role type.
         """
-        self.memory.write_record(MemoryRecord(message, role))
+        with time_phase("memory_write"):
+            if role == OpenAIBackendRole.USER and (
+                message.image_list or message.video_bytes
+            ):
+                # Encode the media once now, later conversions are cached
+                message.to_openai_user_message()
+            self.memory.write_record(MemoryRecord(message, role))
 
     def set_output_language(self, output_language: str) -> BaseMessage:
         r"""Sets the output language for the system message. This method
@@ -299,21 +431,22 @@ class ChatAgent(BaseAgent):
                 a boolean indicating whether the chat session has terminated,
                 and information about the chat session.
         """
+        timer = self._create_step_timer()
+        if timer is None:
+            return self._step(input_message)
+        with timer:
+            response = self._step(input_message)
+        return self._finish_step_timer(timer, response)
+
+    def _step(self, input_message: BaseMessage) -> ChatAgentResponse:
         self.update_memory(input_message, OpenAIBackendRole.USER)
 
-        output_messages: List[BaseMessage]
-        info: Dict[str, Any]
         tool_calls: List[FunctionCallingRecord] = []
         while True:
-            # Format messages and get the token number
-            openai_messages: list[OpenAIMessage] | None
-
-            try:
-                openai_messages, num_tokens = self.memory.get_context()
-            except RuntimeError as e:
-                return self.step_token_exceed(
-                    e.args[1], tool_calls, "max_tokens_exceeded"
-                )
+            context = self._step_get_context(tool_calls)
+            if isinstance(context, ChatAgentResponse):
+                return context
+            openai_messages, num_tokens = context
             (
                 response,
                 output_messages,
@@ -322,40 +455,22 @@ class ChatAgent(BaseAgent):
                 response_id,
             ) = self._step_model_response(openai_messages, num_tokens)
 
-            if (
-                self.is_tools_added()
-                and isinstance(response, ChatCompletion)
-                and response.choices[0].message.tool_calls is not None
-            ):
+            if self._is_tool_call_response(response):
                 # Tools added for function calling and not in stream mode
-
-                # Do function calling
-                func_assistant_msg, func_result_msg, func_record = (
-                    self.step_tool_call(response)
-                )
-
-                # Update the messages
-                self.update_memory(
-                    func_assistant_msg, OpenAIBackendRole.ASSISTANT
+                self._step_record_tool_calls(
+                    self.step_tool_call(response), tool_calls
                 )
-                self.update_memory(func_result_msg, OpenAIBackendRole.FUNCTION)
+                continue
 
-                # Record the function calling
-                tool_calls.append(func_record)
-
-            else:
-                # Function calling disabled or not a function calling
-                info = self._step_get_info(
-                    output_messages,
-                    finish_reasons,
-                    usage_dict,
-                    response_id,
-                    tool_calls,
-                    num_tokens,
-                )
-                break
-
-        return ChatAgentResponse(output_messages, self.terminated, info)
+            # Function calling disabled or not a function calling
+            return self._step_finish(
+                output_messages,
+                finish_reasons,
+                usage_dict,
+                response_id,
+                tool_calls,
+                num_tokens,
+            )
 
     async def step_async(
         self,
@@ -375,64 +490,365 @@ class ChatAgent(BaseAgent):
                 a boolean indicating whether the chat session has terminated,
                 and information about the chat session.
         """
+        timer = self._create_step_timer()
+        if timer is None:
+            return await self._step_async(input_message)
+        with timer:
+            response = await self._step_async(input_message)
+        return self._finish_step_timer(timer, response)
+
+    async def _step_async(
+        self, input_message: BaseMessage
+    ) -> ChatAgentResponse:
         self.update_memory(input_message, OpenAIBackendRole.USER)
 
-        output_messages: List[BaseMessage]
-        info: Dict[str, Any]
         tool_calls: List[FunctionCallingRecord] = []
         while True:
-            # Format messages and get the token number
-            openai_messages: list[OpenAIMessage] | None
-
-            try:
-                openai_messages, num_tokens = self.memory.get_context()
-            except RuntimeError as e:
-                return self.step_token_exceed(
-                    e.args[1], tool_calls, "max_tokens_exceeded"
-                )
+            context = self._step_get_context(tool_calls)
+            if isinstance(context, ChatAgentResponse):
+                return context
+            openai_messages, num_tokens = context
             (
                 response,
                 output_messages,
                 finish_reasons,
                 usage_dict,
                 response_id,
-            ) = self._step_model_response(openai_messages, num_tokens)
+            ) = await self._step_model_response_async(
+                openai_messages, num_tokens
+            )
 
-            if (
-                self.is_tools_added()
-                and isinstance(response, ChatCompletion)
-                and response.choices[0].message.tool_calls is not None
-            ):
+            if self._is_tool_call_response(response):
                 # Tools added for function calling and not in stream mode
+                self._step_record_tool_calls(
+                    await self.step_tool_call_async(response), tool_calls
+                )
+                continue
+
+            # Function calling disabled or not a function calling
+            return self._step_finish(
+                output_messages,
+                finish_reasons,
+                usage_dict,
+                response_id,
+                tool_calls,
+                num_tokens,
+            )
 
-                # Do function calling
-                (
-                    func_assistant_msg,
-                    func_result_msg,
-                    func_record,
-                ) = await self.step_tool_call_async(response)
+    def _create_step_timer(self) -> Optional[PhaseTimer]:
+        if not self.record_timings and not self.step_observers:
+            return None
+        if not self.step_observers:
+            return PhaseTimer()
+
+        def on_phase(phase: str, duration: float) -> None:
+            if phase == "total":
+                return
+            for observer in self.step_observers:
+                observer.on_phase(self, phase, duration)
+
+        return PhaseTimer(on_phase)
+
+    def _finish_step_timer(
+        self, timer: PhaseTimer, response: ChatAgentResponse
+    ) -> ChatAgentResponse:
+        timings = dict(timer.timings)
+        if self.record_timings:
+            response.info["timings"] = timings
+        for observer in self.step_observers:
+            observer.on_step(self, timings)
+        return response
+
+    def step_stream(self, input_message: BaseMessage) -> ChatAgentStream:
+        r"""Performs a single step in the chat session like :meth:`step`, but
+        yields the content of the response as it is generated by the model.
+
+        Only the deltas of the first choice are yielded. Tool calls are
+        handled as in :meth:`step`. If the model backend is not in stream
+        mode, the whole content is yielded at once. After the iteration, the
+        returned stream holds the complete :obj:`ChatAgentResponse`, with
+        usage and termination information, as :obj:`response`. Timings and
+        step observers apply as in :meth:`step`, leaving out the time spent
+        by the caller between two deltas.
+
+        Args:
+            input_message (BaseMessage): The input message to the agent.
+                Its `role` field that specifies the role at backend may be
+                either `user` or `assistant` but it will be set to `user`
+                anyway since for the self agent any incoming message is
+                external.
 
-                # Update the messages
-                self.update_memory(
-                    func_assistant_msg, OpenAIBackendRole.ASSISTANT
+        Returns:
+            ChatAgentStream: An iterator over the content deltas of the
+                response.
+        """
+        return ChatAgentStream(
+            self._timed_stream(self._step_stream(input_message))
+        )
+
+    def step_stream_async(
+        self, input_message: BaseMessage
+    ) -> AsyncChatAgentStream:
+        r"""Asynchronous version of :meth:`step_stream`, using the native
+        async model call and async function calls.
+
+        Args:
+            input_message (BaseMessage): The input message to the agent.
+
+        Returns:
+            AsyncChatAgentStream: An async iterator over the content deltas
+                of the response.
+        """
+        return AsyncChatAgentStream(
+            self._timed_stream_async(self._step_stream_async(input_message))
+        )
+
+    def _timed_stream(
+        self, stream: Generator[str | ChatAgentResponse, None, None]
+    ) -> Iterator[str | ChatAgentResponse]:
+        r"""Runs a streamed step under the step timer, if any. The timer is
+        only active while the step runs, not while the caller handles the
+        deltas, so the timings cover the work of the agent alone."""
+        timer = self._create_step_timer()
+        if timer is None:
+            yield from stream
+            return
+        try:
+            while True:
+                with timer:
+                    item = next(stream, None)
+                if item is None:
+                    return
+                if isinstance(item, ChatAgentResponse):
+                    item = self._finish_step_timer(timer, item)
+                yield item
+        finally:
+            stream.close()
+
+    async def _timed_stream_async(
+        self, stream: AsyncGenerator[str | ChatAgentResponse, None]
+    ) -> AsyncIterator[str | ChatAgentResponse]:
+        r"""Asynchronous version of :meth:`_timed_stream`."""
+        timer = self._create_step_timer()
+        if timer is None:
+            async for item in stream:
+                yield item
+            return
+        try:
+            while True:
+                with timer:
+                    try:
+                        item = await stream.__anext__()
+                    except StopAsyncIteration:
+                        return
+                if isinstance(item, ChatAgentResponse):
+                    item = self._finish_step_timer(timer, item)
+                yield item
+        finally:
+            await stream.aclose()
+
+    def _step_stream(
+        self, input_message: BaseMessage
+    ) -> Generator[str | ChatAgentResponse, None, None]:
+        self.update_memory(input_message, OpenAIBackendRole.USER)
+
+        tool_calls: List[FunctionCallingRecord] = []
+        while True:
+            context = self._step_get_context(tool_calls)
+            if isinstance(context, ChatAgentResponse):
+                yield context
+                return
+            openai_messages, num_tokens = context
+            response = self._call_model(openai_messages, num_tokens)
+
+            if isinstance(response, ChatCompletion):
+                if self._is_tool_call_response(response):
+                    self._step_record_tool_calls(
+                        self.step_tool_call(response), tool_calls
+                    )
+                    continue
+                with time_phase("response_handling"):
+                    (
+                        output_messages,
+                        finish_reasons,
+                        usage_dict,
+                        response_id,
+                    ) = self.handle_batch_response(response)
+                if output_messages and output_messages[0].content:
+                    yield output_messages[0].content
+            else:
+                accumulator = _StreamAccumulator(
+                    self.role_name, self.role_type
                 )
-                self.update_memory(func_result_msg, OpenAIBackendRole.FUNCTION)
+                chunks = iter(response)
+                while True:
+                    # Timed per chunk, so that the time the caller spends
+                    # on the deltas is not counted
+                    with time_phase("response_handling"):
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        deltas = accumulator.add_chunk(chunk)
+                    for index, delta in deltas:
+                        if index == 0:
+                            yield delta
+                with time_phase("response_handling"):
+                    output_messages, finish_reasons, response_id = (
+                        accumulator.finalize()
+                    )
+                    usage_dict = self.get_usage_dict(
+                        output_messages, num_tokens
+                    )
+
+            yield self._step_finish(
+                output_messages,
+                finish_reasons,
+                usage_dict,
+                response_id,
+                tool_calls,
+                num_tokens,
+            )
+            return
+
+    async def _step_stream_async(
+        self, input_message: BaseMessage
+    ) -> AsyncGenerator[str | ChatAgentResponse, None]:
+        self.update_memory(input_message, OpenAIBackendRole.USER)
 
-                # Record the function calling
-                tool_calls.append(func_record)
+        tool_calls: List[FunctionCallingRecord] = []
+        while True:
+            context = self._step_get_context(tool_calls)
+            if isinstance(context, ChatAgentResponse):
+                yield context
+                return
+            openai_messages, num_tokens = context
+            response = await self._call_model_async(
+                openai_messages, num_tokens
+            )
 
+            if isinstance(response, ChatCompletion):
+                if self._is_tool_call_response(response):
+                    self._step_record_tool_calls(
+                        await self.step_tool_call_async(response), tool_calls
+                    )
+                    continue
+                with time_phase("response_handling"):
+                    (
+                        output_messages,
+                        finish_reasons,
+                        usage_dict,
+                        response_id,
+                    ) = self.handle_batch_response(response)
+                if output_messages and output_messages[0].content:
+                    yield output_messages[0].content
             else:
-                # Function calling disabled or not a function calling
-                info = self._step_get_info(
-                    output_messages,
-                    finish_reasons,
-                    usage_dict,
-                    response_id,
-                    tool_calls,
-                    num_tokens,
+                accumulator = _StreamAccumulator(
+                    self.role_name, self.role_type
                 )
-                break
+                chunks = response.__aiter__()
+                while True:
+                    # Timed per chunk, so that the time the caller spends
+                    # on the deltas is not counted
+                    with time_phase("response_handling"):
+                        try:
+                            chunk = await chunks.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        deltas = accumulator.add_chunk(chunk)
+                    for index, delta in deltas:
+                        if index == 0:
+                            yield delta
+                with time_phase("response_handling"):
+                    output_messages, finish_reasons, response_id = (
+                        accumulator.finalize()
+                    )
+                    usage_dict = self.get_usage_dict(
+                        output_messages, num_tokens
+                    )
+
+            yield self._step_finish(
+                output_messages,
+                finish_reasons,
+                usage_dict,
+                response_id,
+                tool_calls,
+                num_tokens,
+            )
+            return
+
+    def _step_get_context(
+        self, tool_calls: List[FunctionCallingRecord]
+    ) -> Tuple[List[OpenAIMessage], int] | ChatAgentResponse:
+        r"""Returns the context of the next model call and its token count,
+        or the response ending the step if the context exceeds the token
+        limit."""
+        try:
+            return self.memory.get_context()
+        except RuntimeError as e:
+            return self.step_token_exceed(
+                e.args[1], tool_calls, "max_tokens_exceeded"
+            )
+
+    def _call_model(
+        self, openai_messages: List[OpenAIMessage], num_tokens: int
+    ) -> ChatCompletion | Stream[ChatCompletionChunk]:
+        with time_phase("model_call"), prompt_tokens_hint(
+            openai_messages, num_tokens
+        ):
+            return self.model_backend.run(openai_messages)
+
+    async def _call_model_async(
+        self, openai_messages: List[OpenAIMessage], num_tokens: int
+    ) -> ChatCompletion | AsyncStream[ChatCompletionChunk]:
+        with time_phase("model_call"), prompt_tokens_hint(
+            openai_messages, num_tokens
+        ):
+            return await self.model_backend.arun(openai_messages)
+
+    def _is_tool_call_response(self, response: Any) -> bool:
+        r"""Whether the response asks for tool calls to be executed, which
+        is only supported outside of the stream mode."""
+        return (
+            self.is_tools_added()
+            and isinstance(response, ChatCompletion)
+            and response.choices[0].message.tool_calls is not None
+        )
 
+    def _step_record_tool_calls(
+        self,
+        results: List[
+            Tuple[
+                FunctionCallingMessage,
+                FunctionCallingMessage,
+                FunctionCallingRecord,
+            ]
+        ],
+        tool_calls: List[FunctionCallingRecord],
+    ) -> None:
+        r"""Writes the messages of executed tool calls to the memory and adds
+        their records to the tool calls of the step."""
+        for func_assistant_msg, func_result_msg, func_record in results:
+            self.update_memory(func_assistant_msg, OpenAIBackendRole.ASSISTANT)
+            self.update_memory(func_result_msg, OpenAIBackendRole.FUNCTION)
+            tool_calls.append(func_record)
+
+    def _step_finish(
+        self,
+        output_messages: List[BaseMessage],
+        finish_reasons: List[str],
+        usage_dict: Dict[str, int],
+        response_id: str,
+        tool_calls: List[FunctionCallingRecord],
+        num_tokens: int,
+    ) -> ChatAgentResponse:
+        info = self._step_get_info(
+            output_messages,
+            finish_reasons,
+            usage_dict,
+            response_id,
+            tool_calls,
+            num_tokens,
+        )
         return ChatAgentResponse(output_messages, self.terminated, info)
 
     def _step_model_response(
@@ -448,16 +864,52 @@ class ChatAgent(BaseAgent):
     ]:
         r"""Internal function for agent step model response."""
         # Obtain the model's response
-        response = self.model_backend.run(openai_messages)
+        response = self._call_model(openai_messages, num_tokens)
 
-        if isinstance(response, ChatCompletion):
-            output_messages, finish_reasons, usage_dict, response_id = (
-                self.handle_batch_response(response)
-            )
-        else:
-            output_messages, finish_reasons, usage_dict, response_id = (
-                self.handle_stream_response(response, num_tokens)
-            )
+        with time_phase("response_handling"):
+            if isinstance(response, ChatCompletion):
+                output_messages, finish_reasons, usage_dict, response_id = (
+                    self.handle_batch_response(response)
+                )
+            else:
+                output_messages, finish_reasons, usage_dict, response_id = (
+                    self.handle_stream_response(response, num_tokens)
+                )
+        return (
+            response,
+            output_messages,
+            finish_reasons,
+            usage_dict,
+            response_id,
+        )
+
+    async def _step_model_response_async(
+        self,
+        openai_messages: list[OpenAIMessage],
+        num_tokens: int,
+    ) -> tuple[
+        ChatCompletion | AsyncStream[ChatCompletionChunk],
+        list[BaseMessage],
+        list[str],
+        dict[str, int],
+        str,
+    ]:
+        r"""Internal function for agent step model response without blocking
+        the event loop."""
+        # Obtain the model's response
+        response = await self._call_model_async(openai_messages, num_tokens)
+
+        with time_phase("response_handling"):
+            if isinstance(response, ChatCompletion):
+                output_messages, finish_reasons, usage_dict, response_id = (
+                    self.handle_batch_response(response)
+                )
+            else:
+                output_messages, finish_reasons, usage_dict, response_id = (
+                    await self.handle_stream_response_async(
+                        response, num_tokens
+                    )
+                )
         return (
             response,
             output_messages,
@@ -478,10 +930,11 @@ class ChatAgent(BaseAgent):
         # Loop over responses terminators, get list of termination
         # tuples with whether the terminator terminates the agent
         # and termination reason
-        termination = [
-            terminator.is_terminated(output_messages)
-            for terminator in self.response_terminators
-        ]
+        with time_phase("terminators"):
+            termination = [
+                terminator.is_terminated(output_messages)
+                for terminator in self.response_terminators
+            ]
         # Terminate the agent if any of the terminator terminates
         self.terminated, termination_reason = next(
             (
@@ -553,32 +1006,32 @@ class ChatAgent(BaseAgent):
             tuple: A tuple of list of output `ChatMessage`, list of
                 finish reasons, usage dictionary, and response id.
         """
-        content_dict: defaultdict = defaultdict(lambda: "")
-        finish_reasons_dict: defaultdict = defaultdict(lambda: "")
-        output_messages: List[BaseMessage] = []
-        response_id: str = ""
-        # All choices in one response share one role
+        accumulator = _StreamAccumulator(self.role_name, self.role_type)
         for chunk in response:
-            response_id = chunk.id
-            for choice in chunk.choices:
-                index = choice.index
-                delta = choice.delta
-                if delta.content is not None:
-                    # When response has not been stopped
-                    # Notice that only the first chunk_dict has the "role"
-                    content_dict[index] += delta.content
-                else:
-                    finish_reasons_dict[index] = choice.finish_reason
-                    chat_message = BaseMessage(
-                        role_name=self.role_name,
-                        role_type=self.role_type,
-                        meta_dict=dict(),
-                        content=content_dict[index],
-                    )
-                    output_messages.append(chat_message)
-        finish_reasons = [
-            finish_reasons_dict[i] for i in range(len(finish_reasons_dict))
-        ]
+            accumulator.add_chunk(chunk)
+        output_messages, finish_reasons, response_id = accumulator.finalize()
+        usage_dict = self.get_usage_dict(output_messages, prompt_tokens)
+        return output_messages, finish_reasons, usage_dict, response_id
+
+    async def handle_stream_response_async(
+        self,
+        response: AsyncStream[ChatCompletionChunk],
+        prompt_tokens: int,
+    ) -> Tuple[List[BaseMessage], List[str], Dict[str, int], str]:
+        r"""Asynchronous version of :meth:`handle_stream_response`.
+
+        Args:
+            response (AsyncStream[ChatCompletionChunk]): Model response.
+            prompt_tokens (int): Number of input prompt tokens.
+
+        Returns:
+            tuple: A tuple of list of output `ChatMessage`, list of
+                finish reasons, usage dictionary, and response id.
+        """
+        accumulator = _StreamAccumulator(self.role_name, self.role_type)
+        async for chunk in response:
+            accumulator.add_chunk(chunk)
+        output_messages, finish_reasons, response_id = accumulator.finalize()
         usage_dict = self.get_usage_dict(output_messages, prompt_tokens)
         return output_messages, finish_reasons, usage_dict, response_id
 
@@ -621,88 +1074,112 @@ class ChatAgent(BaseAgent):
     def step_tool_call(
         self,
         response: ChatCompletion,
-    ) -> Tuple[
-        FunctionCallingMessage, FunctionCallingMessage, FunctionCallingRecord
+    ) -> List[
+        Tuple[
+            FunctionCallingMessage,
+            FunctionCallingMessage,
+            FunctionCallingRecord,
+        ]
     ]:
-        r"""Execute the function with arguments following the model's response.
+        r"""Execute the functions with arguments following the model's
+        response. All tool calls of the response are executed, concurrently
+        on a thread pool if there are several of them.
 
         Args:
             response (Dict[str, Any]): The response obtained by calling the
                 model.
 
         Returns:
-            tuple: A tuple consisting of two obj:`FunctionCallingMessage`,
-                one about the arguments and the other about the execution
-                result, and a struct for logging information about this
-                function call.
+            list: A list with one tuple per tool call, in the order of the
+                tool calls in the response. Each tuple consists of two
+                obj:`FunctionCallingMessage`, one about the arguments and the
+                other about the execution result, and a struct for logging
+                information about this function call.
         """
-        choice = response.choices[0]
-        if choice.message.tool_calls is None:
-            raise RuntimeError("Tool call is None")
-        func_name = choice.message.tool_calls[0].function.name
-        func = self.func_dict[func_name]
-
-        args_str: str = choice.message.tool_calls[0].function.arguments
-        args = json.loads(args_str.replace("'", "\""))
-
-        # Pass the extracted arguments to the indicated function
-        try:
-            result = func(**args)
-        except Exception:
-            raise ValueError(
-                f"Execution of function {func.__name__} failed with "
-                f"arguments being {args}."
-            )
-
-        assist_msg = FunctionCallingMessage(
-            role_name=self.role_name,
-            role_type=self.role_type,
-            meta_dict=None,
-            content="",
-            func_name=func_name,
-            args=args,
-        )
-        func_msg = FunctionCallingMessage(
-            role_name=self.role_name,
-            role_type=self.role_type,
-            meta_dict=None,
-            content="",
-            func_name=func_name,
-            result=result,
-        )
-
-        # Record information about this function call
-        func_record = FunctionCallingRecord(func_name, args, result)
-        return assist_msg, func_msg, func_record
+        tool_calls = self._get_tool_calls(response)
+        with time_phase("tool_execution"):
+            if len(tool_calls) == 1:
+                return [self._execute_tool_call(tool_calls[0])]
+            with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+                return list(executor.map(self._execute_tool_call, tool_calls))
 
     async def step_tool_call_async(
         self,
         response: ChatCompletion,
-    ) -> Tuple[
-        FunctionCallingMessage, FunctionCallingMessage, FunctionCallingRecord
+    ) -> List[
+        Tuple[
+            FunctionCallingMessage,
+            FunctionCallingMessage,
+            FunctionCallingRecord,
+        ]
     ]:
-        r"""Execute the async function with arguments following the model's
-        response.
+        r"""Execute the async functions with arguments following the model's
+        response. All tool calls of the response are awaited concurrently.
 
         Args:
             response (Dict[str, Any]): The response obtained by calling the
                 model.
 
         Returns:
-            tuple: A tuple consisting of two obj:`FunctionCallingMessage`,
-                one about the arguments and the other about the execution
-                result, and a struct for logging information about this
-                function call.
+            list: A list with one tuple per tool call, in the order of the
+                tool calls in the response. Each tuple consists of two
+                obj:`FunctionCallingMessage`, one about the arguments and the
+                other about the execution result, and a struct for logging
+                information about this function call.
         """
+        tool_calls = self._get_tool_calls(response)
+        with time_phase("tool_execution"):
+            return list(
+                await asyncio.gather(
+                    *[
+                        self._execute_tool_call_async(tool_call)
+                        for tool_call in tool_calls
+                    ]
+                )
+            )
+
+    def _get_tool_calls(
+        self, response: ChatCompletion
+    ) -> List[ChatCompletionMessageToolCall]:
         # Note that when function calling is enabled, `n` is set to 1.
         choice = response.choices[0]
         if choice.message.tool_calls is None:
             raise RuntimeError("Tool call is None")
-        func_name = choice.message.tool_calls[0].function.name
+        return choice.message.tool_calls
+
+    def _parse_tool_call(
+        self, tool_call: ChatCompletionMessageToolCall
+    ) -> Tuple[str, Callable, Dict[str, Any]]:
+        func_name = tool_call.function.name
         func = self.func_dict[func_name]
 
-        args_str: str = choice.message.tool_calls[0].function.arguments
+        args_str: str = tool_call.function.arguments
         args = json.loads(args_str.replace("'", "\""))
+        return func_name, func, args
+
+    def _execute_tool_call(
+        self, tool_call: ChatCompletionMessageToolCall
+    ) -> Tuple[
+        FunctionCallingMessage, FunctionCallingMessage, FunctionCallingRecord
+    ]:
+        func_name, func, args = self._parse_tool_call(tool_call)
+
+        # Pass the extracted arguments to the indicated function
+        try:
+            result = func(**args)
+        except Exception:
+            raise ValueError(
+                f"Execution of function {func.__name__} failed with "
+                f"arguments being {args}."
+            )
+        return self._create_tool_call_output(func_name, args, result)
+
+    async def _execute_tool_call_async(
+        self, tool_call: ChatCompletionMessageToolCall
+    ) -> Tuple[
+        FunctionCallingMessage, FunctionCallingMessage, FunctionCallingRecord
+    ]:
+        func_name, func, args = self._parse_tool_call(tool_call)
 
         # Pass the extracted arguments to the indicated function
         try:
@@ -712,7 +1189,13 @@ class ChatAgent(BaseAgent):
                 f"Execution of function {func.__name__} failed with "
                 f"arguments being {args}."
             )
+        return self._create_tool_call_output(func_name, args, result)
 
+    def _create_tool_call_output(
+        self, func_name: str, args: Dict[str, Any], result: Any
+    ) -> Tuple[
+        FunctionCallingMessage, FunctionCallingMessage, FunctionCallingRecord
+    ]:
         assist_msg = FunctionCallingMessage(
             role_name=self.role_name,
             role_type=self.role_type,
@@ -747,9 +1230,14 @@ class ChatAgent(BaseAgent):
             dict: Usage dictionary.
         """
         encoding = get_model_encoding(self.model_type.value_for_tiktoken)
+        registry = TokenizerRegistry.default()
         completion_tokens = 0
         for message in output_messages:
-            completion_tokens += len(encoding.encode(message.content))
+            completion_tokens += registry.count_tokens(
+                encoding.name,
+                message.content,
+                lambda text: len(encoding.encode(text)),
+            )
         usage_dict = dict(
             completion_tokens=completion_tokens,
             prompt_tokens=prompt_tokens,
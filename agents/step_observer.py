@@ -0,0 +1,47 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+from typing import Any, Dict
+
+
+class StepObserver:
+    r"""Base class of observers receiving the latency of the phases of the
+    steps of a :obj:`ChatAgent`. Subclasses override the hooks they need,
+    e.g. to export the timings to a metrics system.
+
+    The phases are `"memory_write"`, `"memory_retrieval"`,
+    `"context_creation"`, `"model_call"` (including `"rate_limit_wait"` if
+    the agent is rate limited), `"response_handling"`, `"tool_execution"`
+    and `"terminators"`. A phase may occur several times in a step, e.g.
+    once per round of tool calls.
+    """
+
+    def on_phase(self, agent: Any, phase: str, duration: float) -> None:
+        r"""Called when a phase of a step has finished.
+
+        Args:
+            agent (Any): The agent performing the step.
+            phase (str): The name of the phase.
+            duration (float): The duration of the phase in seconds.
+        """
+        pass
+
+    def on_step(self, agent: Any, timings: Dict[str, float]) -> None:
+        r"""Called when a step has finished.
+
+        Args:
+            agent (Any): The agent performing the step.
+            timings (Dict[str, float]): The total duration of every phase of
+                the step in seconds, and of the whole step as `"total"`.
+        """
+        pass
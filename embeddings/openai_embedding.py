@@ -14,11 +14,9 @@
 import os
 from typing import Any, List, Optional
 
-from openai import OpenAI
-
 from camel.embeddings.base import BaseEmbedding
 from camel.types import EmbeddingModelType
-from camel.utils import model_api_key_required
+from camel.utils import OpenAIClientRegistry, model_api_key_required
 
 
 class OpenAIEmbedding(BaseEmbedding[str]):
@@ -44,7 +42,9 @@ class OpenAIEmbedding(BaseEmbedding[str]):
         self.model_type = model_type
         self.output_dim = model_type.output_dim
         self._api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        self.client = OpenAI(timeout=60, max_retries=3, api_key=self._api_key)
+        self.client = OpenAIClientRegistry.default().get_client(
+            timeout=60, max_retries=3, api_key=self._api_key
+        )
 
     @model_api_key_required
     def embed_list(
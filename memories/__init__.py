@@ -15,24 +15,43 @@
 from .agent_memories import (
     ChatHistoryMemory,
     LongtermAgentMemory,
+    RollingSummaryMemory,
     VectorDBMemory,
 )
 from .base import AgentMemory, BaseContextCreator, MemoryBlock
 from .blocks.chat_history_block import ChatHistoryBlock
 from .blocks.vectordb_block import VectorDBBlock
+from .context_creators.compaction import (
+    CompactionStrategy,
+    ContextUnit,
+    DropOldestStrategy,
+    KeepRecentStrategy,
+    TruncateToolResultsStrategy,
+)
 from .context_creators.score_based import ScoreBasedContextCreator
+from .record_storage import InMemoryRecordStorage
 from .records import ContextRecord, MemoryRecord
+from .session_manager import SessionMemory, SessionMemoryManager
 
 __all__ = [
     'MemoryRecord',
     'ContextRecord',
+    'InMemoryRecordStorage',
     'MemoryBlock',
     "AgentMemory",
     'BaseContextCreator',
     'ScoreBasedContextCreator',
+    'ContextUnit',
+    'CompactionStrategy',
+    'DropOldestStrategy',
+    'KeepRecentStrategy',
+    'TruncateToolResultsStrategy',
     'ChatHistoryMemory',
     'VectorDBMemory',
     'ChatHistoryBlock',
     'VectorDBBlock',
     'LongtermAgentMemory',
+    'RollingSummaryMemory',
+    'SessionMemory',
+    'SessionMemoryManager',
 ]
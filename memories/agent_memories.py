@@ -12,7 +12,11 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
-from typing import List, Optional
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, List, Optional, Tuple
 
 from camel.memories.base import AgentMemory, BaseContextCreator
 from camel.memories.blocks import ChatHistoryBlock, VectorDBBlock
@@ -20,8 +24,11 @@ from camel.memories.records import (
     ContextRecord,
     MemoryRecord,
 )
+from camel.messages import BaseMessage
+from camel.models import BaseModelBackend
 from camel.storages import BaseKeyValueStorage, BaseVectorStorage
-from camel.types import OpenAIBackendRole
+from camel.types import ChatCompletion, OpenAIBackendRole, RoleType
+from camel.utils import TokenEstimator
 
 
 class ChatHistoryMemory(AgentMemory):
@@ -76,6 +83,9 @@ class VectorDBMemory(AgentMemory):
             (default: :obj:`None`)
         retrieve_limit (int, optional): The maximum number of messages
             to be added into the context.  (default: :obj:`3`)
+        write_behind (bool, optional): Whether to embed and store messages
+            in a background thread. See :obj:`VectorDBBlock`.
+            (default: :obj:`False`)
     """
 
     def __init__(
@@ -83,10 +93,13 @@ class VectorDBMemory(AgentMemory):
         context_creator: BaseContextCreator,
         storage: Optional[BaseVectorStorage] = None,
         retrieve_limit: int = 3,
+        write_behind: bool = False,
     ) -> None:
         self._context_creator = context_creator
         self._retrieve_limit = retrieve_limit
-        self._vectordb_block = VectorDBBlock(storage=storage)
+        self._vectordb_block = VectorDBBlock(
+            storage=storage, write_behind=write_behind
+        )
 
         self._current_topic: str = ""
 
@@ -106,6 +119,11 @@ class VectorDBMemory(AgentMemory):
     def get_context_creator(self) -> BaseContextCreator:
         return self._context_creator
 
+    def clear(self) -> None:
+        r"""Removes all records from the memory."""
+        self._vectordb_block.clear()
+        self._current_topic = ""
+
 
 class LongtermAgentMemory(AgentMemory):
     r"""An implementation of the :obj:`AgentMemory` abstract base class for
@@ -154,3 +172,281 @@ class LongtermAgentMemory(AgentMemory):
         r"""Removes all records from the memory."""
         self.chat_history_block.clear()
         self.vector_db_block.clear()
+
+
+class RollingSummaryMemory(AgentMemory):
+    r"""A chat history memory keeping its context bounded by summarizing the
+    oldest messages.
+
+    Once the estimated number of tokens of the history exceeds
+    :obj:`token_threshold`, the oldest messages are summarized on a worker
+    thread by :obj:`summary_model`, which may be a cheaper model than the
+    one of the agent, until about :obj:`keep_tokens` tokens of recent
+    messages are left. The summary is folded into the previous one, so the
+    context consists of the system messages, the summary as a user message
+    and the recent messages.
+
+    Summarizing never blocks the agent. The summary is built in a back
+    buffer while the agent keeps reading and writing the full history, and
+    swapped in by the first :meth:`retrieve` or :meth:`write_records` after
+    it is ready. The summarized messages stay in the storage, but are no
+    longer retrieved.
+
+    Args:
+        context_creator (BaseContextCreator): A model context creator.
+        summary_model (BaseModelBackend): The non-streaming model backend
+            writing the summaries.
+        token_threshold (int): The estimated number of tokens of the history
+            above which the oldest messages are summarized.
+        keep_tokens (int, optional): The estimated number of tokens of the
+            recent messages kept as they are. If `None`, half of
+            :obj:`token_threshold`. (default: :obj:`None`)
+        storage (BaseKeyValueStorage, optional): A storage backend for storing
+            chat history. If `None`, an :obj:`InMemoryKeyValueStorage`
+            will be used. (default: :obj:`None`)
+        summary_prompt (str, optional): The instruction given to
+            :obj:`summary_model`. If `None`, a default prompt asking for a
+            concise summary keeping facts, decisions and open tasks is used.
+            (default: :obj:`None`)
+    """
+
+    _DEFAULT_SUMMARY_PROMPT = (
+        "Summarize the conversation below for the assistant taking part in "
+        "it. Merge it with the previous summary if there is one. Keep the "
+        "facts, decisions, results and open tasks, and drop small talk. "
+        "Answer with the summary only."
+    )
+
+    def __init__(
+        self,
+        context_creator: BaseContextCreator,
+        summary_model: BaseModelBackend,
+        token_threshold: int,
+        keep_tokens: Optional[int] = None,
+        storage: Optional[BaseKeyValueStorage] = None,
+        summary_prompt: Optional[str] = None,
+    ) -> None:
+        if summary_model.stream:
+            raise ValueError("`summary_model` must not be streaming.")
+        if keep_tokens is None:
+            keep_tokens = token_threshold // 2
+        if not 0 <= keep_tokens < token_threshold:
+            raise ValueError(
+                "`keep_tokens` must be in [0, `token_threshold`)."
+            )
+        self._context_creator = context_creator
+        self.summary_model = summary_model
+        self.token_threshold = token_threshold
+        self.keep_tokens = keep_tokens
+        self.summary_prompt = summary_prompt or self._DEFAULT_SUMMARY_PROMPT
+        self._chat_history_block = ChatHistoryBlock(storage=storage)
+        self._estimator: TokenEstimator = (
+            context_creator.token_counter.create_estimator()
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="camel_summary"
+        )
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        # Incremented by `clear()`, so that summaries of a cleared history
+        # are discarded
+        self._generation = 0
+        # Back buffer, written by the worker thread: the generation, the
+        # summary, the system messages of the summarized records and the
+        # number of summarized records
+        self._pending: Optional[
+            Tuple[int, MemoryRecord, List[MemoryRecord], int]
+        ] = None
+        self._num_summaries = 0
+        self._reset_state()
+        # Account for records already in the storage
+        self._append(self._chat_history_block.load_records())
+
+    def _reset_state(self) -> None:
+        r"""Resets the front buffer to an empty history."""
+        self._summary: Optional[MemoryRecord] = None
+        self._summary_tokens = 0
+        self._pinned: List[MemoryRecord] = []
+        self._pinned_tokens = 0
+        # Estimated tokens of every record not summarized yet
+        self._live_tokens: Deque[int] = deque()
+        self._live_total = 0
+
+    def _estimate(self, record: MemoryRecord) -> int:
+        return self._estimator.estimate_message(record.to_openai_message())
+
+    def _append(self, records: List[MemoryRecord]) -> None:
+        for record in records:
+            num_tokens = self._estimate(record)
+            self._live_tokens.append(num_tokens)
+            self._live_total += num_tokens
+
+    @property
+    def num_tokens(self) -> int:
+        r"""The estimated number of tokens of the retrieved records."""
+        return self._pinned_tokens + self._summary_tokens + self._live_total
+
+    @property
+    def num_summaries(self) -> int:
+        r"""The number of summaries swapped in so far."""
+        return self._num_summaries
+
+    @property
+    def summary(self) -> Optional[str]:
+        r"""The current summary, or `None` if nothing was summarized yet."""
+        if self._summary is None:
+            return None
+        return self._summary.message.content
+
+    def retrieve(self) -> List[ContextRecord]:
+        self._swap_buffers()
+        num_live = len(self._live_tokens)
+        records = [ContextRecord(record, 1.0) for record in self._pinned]
+        if self._summary is not None:
+            records.append(ContextRecord(self._summary, 1.0))
+        if num_live > 0:
+            records.extend(self._chat_history_block.retrieve(num_live))
+        return records
+
+    def write_records(self, records: List[MemoryRecord]) -> None:
+        self._swap_buffers()
+        self._chat_history_block.write_records(records)
+        self._append(records)
+        self._maybe_summarize()
+
+    def get_context_creator(self) -> BaseContextCreator:
+        return self._context_creator
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+        self._chat_history_block.clear()
+        self._reset_state()
+
+    def wait_for_summary(self, timeout: Optional[float] = None) -> None:
+        r"""Waits until the running summarization, if any, has finished, and
+        swaps its summary in.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait.
+                If `None`, waits without limit. (default: :obj:`None`)
+
+        Raises:
+            concurrent.futures.TimeoutError: If the summarization does not
+                finish in time.
+        """
+        future = self._future
+        if future is not None:
+            future.exception(timeout=timeout)
+        self._swap_buffers()
+
+    def close(self) -> None:
+        r"""Stops the worker thread after the running summarization."""
+        self._executor.shutdown(wait=True)
+
+    def _swap_buffers(self) -> None:
+        r"""Swaps a finished summary in, replacing the records it covers."""
+        if self._pending is None:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        generation, summary, pinned, num_summarized = pending
+        if generation != self._generation:
+            return
+        for _ in range(num_summarized):
+            self._live_total -= self._live_tokens.popleft()
+        self._pinned.extend(pinned)
+        self._pinned_tokens += sum(self._estimate(r) for r in pinned)
+        self._summary = summary
+        self._summary_tokens = self._estimate(summary)
+        self._num_summaries += 1
+
+    def _maybe_summarize(self) -> None:
+        r"""Starts summarizing the oldest records on the worker thread if the
+        history exceeds the threshold and no summarization is running."""
+        if self._future is not None and not self._future.done():
+            return
+        # Swap in the result of the last summarization first, so that the
+        # next one starts after the records it covers
+        self._swap_buffers()
+        if self._pending is not None:
+            return
+        if self.num_tokens <= self.token_threshold:
+            return
+        # Summarize the oldest records until `keep_tokens` are left, without
+        # separating a function result from the call preceding it
+        num_live = len(self._live_tokens)
+        remaining = self._live_total
+        num_summarized = 0
+        while num_summarized < num_live - 1 and remaining > self.keep_tokens:
+            remaining -= self._live_tokens[num_summarized]
+            num_summarized += 1
+        records = self._chat_history_block.load_records(num_live)
+        while (
+            0 < num_summarized < num_live
+            and records[num_summarized].role_at_backend
+            == OpenAIBackendRole.FUNCTION
+        ):
+            num_summarized += 1
+        if num_summarized == 0 or num_summarized == num_live:
+            return
+        self._future = self._executor.submit(
+            self._summarize,
+            self._generation,
+            self._summary,
+            records[:num_summarized],
+        )
+
+    def _summarize(
+        self,
+        generation: int,
+        previous: Optional[MemoryRecord],
+        records: List[MemoryRecord],
+    ) -> None:
+        r"""Summarizes records on the worker thread and fills the back
+        buffer."""
+        pinned = []
+        lines = []
+        if previous is not None:
+            lines.append(f"Previous summary:\n{previous.message.content}\n")
+        lines.append("Conversation:")
+        for record in records:
+            if record.role_at_backend == OpenAIBackendRole.SYSTEM:
+                pinned.append(record)
+                continue
+            message = record.to_openai_message()
+            content = message.get("content") or message.get(
+                "function_call", ""
+            )
+            lines.append(f"{message['role']}: {content}")
+        try:
+            response = self.summary_model.run(
+                [
+                    {"role": "system", "content": self.summary_prompt},
+                    {"role": "user", "content": "\n".join(lines)},
+                ]
+            )
+            if not isinstance(response, ChatCompletion):
+                raise RuntimeError("Expected a `ChatCompletion` response.")
+            text = response.choices[0].message.content
+        except Exception as e:
+            # The records are kept and summarized again after the next write
+            warnings.warn(f"Failed to summarize the chat history: {e}")
+            return
+        summary = MemoryRecord(
+            message=BaseMessage(
+                role_name="Summary",
+                role_type=RoleType.USER,
+                meta_dict=None,
+                content=f"Summary of the earlier conversation:\n{text}",
+            ),
+            # Not a system message, since some APIs only accept a leading
+            # system prompt
+            role_at_backend=OpenAIBackendRole.USER,
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._pending = (generation, summary, pinned, len(records))
@@ -17,7 +17,7 @@ from typing import List, Tuple
 
 from camel.memories.records import ContextRecord, MemoryRecord
 from camel.messages import OpenAIMessage
-from camel.utils import BaseTokenCounter
+from camel.utils import BaseTokenCounter, time_phase
 
 
 class MemoryBlock(ABC):
@@ -137,4 +137,7 @@ class AgentMemory(MemoryBlock, ABC):
             (List[OpenAIMessage], int): A tuple containing the constructed
                 context in OpenAIMessage format and the total token count.
         """
-        return self.get_context_creator().create_context(self.retrieve())
+        with time_phase("memory_retrieval"):
+            records = self.retrieve()
+        with time_phase("context_creation"):
+            return self.get_context_creator().create_context(records)
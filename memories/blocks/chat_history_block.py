@@ -15,8 +15,9 @@ import warnings
 from typing import List, Optional
 
 from camel.memories.base import MemoryBlock
+from camel.memories.record_storage import InMemoryRecordStorage
 from camel.memories.records import ContextRecord, MemoryRecord
-from camel.storages import BaseKeyValueStorage, InMemoryKeyValueStorage
+from camel.storages import BaseKeyValueStorage
 from camel.types import OpenAIBackendRole
 
 
@@ -32,8 +33,9 @@ class ChatHistoryBlock(MemoryBlock):
 
     Args:
         storage (BaseKeyValueStorage, optional): A storage mechanism for
-            storing chat history. If `None`, an :obj:`InMemoryKeyValueStorage`
-            will be used. (default: :obj:`None`)
+            storing chat history. If `None`, an :obj:`InMemoryRecordStorage`
+            will be used, which keeps the records without converting them to
+            dicts. (default: :obj:`None`)
         keep_rate (float, optional): In historical messages, the score of the
             last message is 1.0, and with each step taken backward, the score
             of the message is multiplied by the `keep_rate`. Higher `keep_rate`
@@ -48,7 +50,7 @@ class ChatHistoryBlock(MemoryBlock):
     ) -> None:
         if keep_rate > 1 or keep_rate < 0:
             raise ValueError("`keep_rate` should be in [0,1]")
-        self.storage = storage or InMemoryKeyValueStorage()
+        self.storage = storage or InMemoryRecordStorage()
         self.keep_rate = keep_rate
 
     def retrieve(
@@ -67,16 +69,11 @@ class ChatHistoryBlock(MemoryBlock):
         Returns:
             List[ContextRecord]: A list of retrieved records.
         """
-        record_dicts = self.storage.load()
-        if len(record_dicts) == 0:
+        chat_records = self.load_records(window_size)
+        if len(chat_records) == 0:
             warnings.warn("The `ChatHistoryMemory` is empty.")
             return list()
 
-        chat_records: List[MemoryRecord] = []
-        truncate_idx = -window_size if window_size is not None else 0
-        for record_dict in record_dicts[truncate_idx:]:
-            chat_records.append(MemoryRecord.from_dict(record_dict))
-
         # We assume that, in the chat history memory, the closer the record is
         # to the current message, the more score it will be.
         output_records = []
@@ -93,6 +90,30 @@ class ChatHistoryBlock(MemoryBlock):
         output_records.reverse()
         return output_records
 
+    def load_records(
+        self, window_size: Optional[int] = None
+    ) -> List[MemoryRecord]:
+        r"""Loads the most recent records from the storage, without scoring
+        them.
+
+        Args:
+            window_size (int, optional): Specifies the number of recent chat
+                messages to load. If not provided, the entire chat history
+                will be loaded. (default: :obj:`None`)
+
+        Returns:
+            List[MemoryRecord]: The loaded records, in storing order.
+        """
+        if isinstance(self.storage, InMemoryRecordStorage):
+            start = -window_size if window_size else 0
+            return self.storage.load_records(start)
+        if window_size:
+            # Only read the records inside the window from the storage
+            record_dicts = self.storage.load_tail(window_size)
+        else:
+            record_dicts = self.storage.load()
+        return [MemoryRecord.from_dict(r) for r in record_dicts]
+
     def write_records(self, records: List[MemoryRecord]) -> None:
         r"""Writes memory records to the memory. Additionally, performs
         validation checks on the messages.
@@ -101,6 +122,9 @@ class ChatHistoryBlock(MemoryBlock):
             records (List[MemoryRecord]): Memory records to be added to the
                 memory.
         """
+        if isinstance(self.storage, InMemoryRecordStorage):
+            self.storage.save_records(records)
+            return
         stored_records = []
         for record in records:
             stored_records.append(record.to_dict())
@@ -12,7 +12,9 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 from camel.embeddings import BaseEmbedding, OpenAIEmbedding
 from camel.memories.base import MemoryBlock
@@ -30,6 +32,19 @@ class VectorDBBlock(MemoryBlock):
     maintaining and retrieving information using vector embeddings within a
     vector database.
 
+    Records are embedded in one batch per write. In write-behind mode, they
+    are embedded and added to the storage by a background thread instead,
+    so that writing does not wait for the embedding API. Records written
+    while the thread is busy are embedded together in its next batch.
+    :meth:`retrieve` waits until all written records are in the storage.
+
+    The embeddings of the last queried keywords are cached, and so are the
+    results of the queries until new records are written or the block is
+    cleared. Repeated retrievals for an unchanged topic, e.g. in every round
+    of tool calls of a step, thus neither call the embedding API nor query
+    the database. The cached results are only valid if the storage is not
+    modified by anything but this block.
+
     Args:
         storage (Optional[BaseVectorStorage], optional): The storage mechanism
             for the vector database. Defaults to in-memory :obj:`Qdrant` if not
@@ -37,16 +52,44 @@ class VectorDBBlock(MemoryBlock):
         embedding (Optional[BaseEmbedding], optional): Embedding mechanism to
             convert chat messages into vector representations. Defaults to
             :obj:`OpenAiEmbedding` if not provided. (default: :obj:`None`)
+        write_behind (bool, optional): Whether to embed and store records in
+            a background thread. (default: :obj:`False`)
+        max_pending (int, optional): In write-behind mode, the maximum number
+            of records waiting to be stored. Writing blocks while the
+            backlog is full. (default: :obj:`256`)
+        cache_queries (bool, optional): Whether to cache the keyword
+            embeddings and query results. (default: :obj:`True`)
     """
 
+    # Maximum number of texts per embedding request
+    _EMBED_BATCH_SIZE = 256
+    # Number of keyword embeddings kept in the cache
+    _QUERY_CACHE_SIZE = 16
+
     def __init__(
         self,
         storage: Optional[BaseVectorStorage] = None,
         embedding: Optional[BaseEmbedding] = None,
+        write_behind: bool = False,
+        max_pending: int = 256,
+        cache_queries: bool = True,
     ) -> None:
+        if max_pending < 1:
+            raise ValueError("`max_pending` must be positive.")
         self.embedding = embedding or OpenAIEmbedding()
         self.vector_dim = self.embedding.get_output_dim()
         self.storage = storage or QdrantStorage(vector_dim=self.vector_dim)
+        self.write_behind = write_behind
+        self.max_pending = max_pending
+        self._pending: List[MemoryRecord] = []
+        self._num_in_flight = 0
+        self._error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self.cache_queries = cache_queries
+        self._query_vectors: OrderedDict[str, List[float]] = OrderedDict()
+        self._results: Dict[Tuple[str, int], List[ContextRecord]] = {}
 
     def retrieve(
         self,
@@ -56,6 +99,9 @@ class VectorDBBlock(MemoryBlock):
         r"""Retrieves similar records from the vector database based on the
         content of the keyword.
 
+        In write-behind mode, the keyword is embedded while the pending
+        records are stored, and the database is queried once they are.
+
         Args:
             keyword (str): This string will be converted into a vector
                 representation to query the database.
@@ -66,9 +112,13 @@ class VectorDBBlock(MemoryBlock):
             List[ContextRecord]: A list of memory records retrieved from the
                 vector database based on similarity to :obj:`current_state`.
         """
-        query_vector = self.embedding.embed(keyword)
+        cached = self._results.get((keyword, limit))
+        if cached is not None:
+            return list(cached)
+        query_vector = self._embed_query(keyword)
+        self.flush()
         results = self.storage.query(VectorDBQuery(query_vector, top_k=limit))
-        return [
+        records = [
             ContextRecord(
                 memory_record=MemoryRecord.from_dict(result.record.payload),
                 score=result.similarity,
@@ -76,6 +126,23 @@ class VectorDBBlock(MemoryBlock):
             for result in results
             if result.record.payload is not None
         ]
+        if self.cache_queries:
+            self._results[(keyword, limit)] = records
+            if len(self._results) > self._QUERY_CACHE_SIZE:
+                del self._results[next(iter(self._results))]
+        return list(records)
+
+    def _embed_query(self, keyword: str) -> List[float]:
+        query_vector = self._query_vectors.get(keyword)
+        if query_vector is not None:
+            self._query_vectors.move_to_end(keyword)
+            return query_vector
+        query_vector = self.embedding.embed(keyword)
+        if self.cache_queries:
+            self._query_vectors[keyword] = query_vector
+            if len(self._query_vectors) > self._QUERY_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return query_vector
 
     def write_records(self, records: List[MemoryRecord]) -> None:
         """
@@ -86,16 +153,110 @@ class VectorDBBlock(MemoryBlock):
             records (List[MemoryRecord]): Memory records to be added to the
                 memory.
         """
+        if not records:
+            return
+        # The new records may change the results of any query
+        self._results.clear()
+        if not self.write_behind:
+            self._store(records)
+            return
+        with self._cond:
+            self._raise_error()
+            # Wait for room in the backlog, unless the batch alone fills it
+            while self._is_backlog_full(len(records)):
+                self._cond.wait()
+                self._raise_error()
+            self._pending.extend(records)
+            self._start_worker()
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        r"""Waits until all written records are stored. Raises the error of
+        the background thread if storing some of them failed.
+
+        Raises:
+            RuntimeError: If the background thread failed to store records.
+        """
+        with self._cond:
+            while self._pending or self._num_in_flight:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self) -> None:
+        r"""Stores the pending records and stops the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        with self._cond:
+            self._closed = False
+            self._raise_error()
+
+    def _store(self, records: List[MemoryRecord]) -> None:
+        texts = [record.message.content for record in records]
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self._EMBED_BATCH_SIZE):
+            vectors.extend(
+                self.embedding.embed_list(
+                    texts[i : i + self._EMBED_BATCH_SIZE]
+                )
+            )
         v_records = [
             VectorRecord(
-                vector=self.embedding.embed(record.message.content),
+                vector=vector,
                 payload=record.to_dict(),
                 id=str(record.uuid),
             )
-            for record in records
+            for record, vector in zip(records, vectors)
         ]
         self.storage.add(v_records)
 
+    def _is_backlog_full(self, num_records: int) -> bool:
+        num_waiting = len(self._pending) + self._num_in_flight
+        return num_waiting > 0 and num_waiting + num_records > self.max_pending
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(
+                "Failed to store records in the vector database."
+            ) from error
+
+    def _start_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run_worker,
+                name="camel_vectordb_writer",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _run_worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                records, self._pending = self._pending, []
+                self._num_in_flight = len(records)
+            try:
+                self._store(records)
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+            with self._cond:
+                self._num_in_flight = 0
+                self._cond.notify_all()
+
     def clear(self) -> None:
         r"""Removes all records from the vector database memory."""
+        with self._cond:
+            self._pending.clear()
+            while self._num_in_flight:
+                self._cond.wait()
+            self._error = None
+        self._results.clear()
         self.storage.clear()
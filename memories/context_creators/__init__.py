@@ -12,8 +12,20 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
+from .compaction import (
+    CompactionStrategy,
+    ContextUnit,
+    DropOldestStrategy,
+    KeepRecentStrategy,
+    TruncateToolResultsStrategy,
+)
 from .score_based import ScoreBasedContextCreator
 
 __all__ = [
     'ScoreBasedContextCreator',
+    'ContextUnit',
+    'CompactionStrategy',
+    'DropOldestStrategy',
+    'KeepRecentStrategy',
+    'TruncateToolResultsStrategy',
 ]
@@ -0,0 +1,176 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import List
+
+from camel.memories.records import ContextRecord
+from camel.messages import OpenAIMessage
+from camel.types import OpenAIBackendRole
+from camel.utils import BaseTokenCounter
+
+
+@dataclass(frozen=True)
+class ContextUnit:
+    r"""A record in a context under construction, with its converted
+    message and token count.
+
+    Attributes:
+        idx (int): The position of the record in the retrieved records.
+        record (ContextRecord): The record.
+        message (OpenAIMessage): The record converted to an OpenAI message.
+        num_tokens (int): The number of tokens of the message.
+    """
+
+    idx: int
+    record: ContextRecord
+    message: OpenAIMessage
+    num_tokens: int
+
+    @property
+    def is_system(self) -> bool:
+        r"""Whether the record is a system message."""
+        return (
+            self.record.memory_record.role_at_backend
+            == OpenAIBackendRole.SYSTEM
+        )
+
+
+class CompactionStrategy(ABC):
+    r"""A strategy reducing a context that exceeds the token limit. Context
+    creators apply their strategies in order until the context fits, before
+    pruning the records with a score below 1.
+    """
+
+    @abstractmethod
+    def compact(
+        self,
+        units: List[ContextUnit],
+        token_limit: int,
+        token_counter: BaseTokenCounter,
+    ) -> List[ContextUnit]:
+        r"""Reduces a context.
+
+        Args:
+            units (List[ContextUnit]): The units of the context, ordered by
+                their index.
+            token_limit (int): The maximum number of tokens of the context.
+            token_counter (BaseTokenCounter): The token counter of the
+                context creator, to count modified messages.
+
+        Returns:
+            List[ContextUnit]: The units of the reduced context, ordered by
+                their index. The context may still exceed the limit.
+        """
+        pass
+
+
+class DropOldestStrategy(CompactionStrategy):
+    r"""Drops the oldest messages until the context fits, keeping the system
+    messages and the newest message.
+    """
+
+    def compact(
+        self,
+        units: List[ContextUnit],
+        token_limit: int,
+        token_counter: BaseTokenCounter,
+    ) -> List[ContextUnit]:
+        total_tokens = sum(unit.num_tokens for unit in units)
+        dropped = set()
+        for i, unit in enumerate(units[:-1]):
+            if total_tokens <= token_limit:
+                break
+            if not unit.is_system:
+                dropped.add(i)
+                total_tokens -= unit.num_tokens
+        return [unit for i, unit in enumerate(units) if i not in dropped]
+
+
+class KeepRecentStrategy(CompactionStrategy):
+    r"""Keeps only the system messages and the :obj:`num_recent` newest other
+    messages.
+
+    Args:
+        num_recent (int): The number of newest messages to keep.
+    """
+
+    def __init__(self, num_recent: int) -> None:
+        if num_recent < 1:
+            raise ValueError("`num_recent` must be positive.")
+        self.num_recent = num_recent
+
+    def compact(
+        self,
+        units: List[ContextUnit],
+        token_limit: int,
+        token_counter: BaseTokenCounter,
+    ) -> List[ContextUnit]:
+        num_other = sum(1 for unit in units if not unit.is_system)
+        num_dropped = max(0, num_other - self.num_recent)
+        kept = []
+        for unit in units:
+            if not unit.is_system and num_dropped > 0:
+                num_dropped -= 1
+                continue
+            kept.append(unit)
+        return kept
+
+
+class TruncateToolResultsStrategy(CompactionStrategy):
+    r"""Truncates the content of function call results that are longer than
+    :obj:`max_tokens` tokens, oldest first, until the context fits.
+
+    Args:
+        max_tokens (int, optional): The number of tokens a truncated result
+            is cut down to, approximately. (default: :obj:`256`)
+        marker (str, optional): The text appended to truncated results.
+            (default: :obj:`"\n...[truncated]"`)
+    """
+
+    def __init__(
+        self, max_tokens: int = 256, marker: str = "\n...[truncated]"
+    ) -> None:
+        if max_tokens < 1:
+            raise ValueError("`max_tokens` must be positive.")
+        self.max_tokens = max_tokens
+        self.marker = marker
+
+    def compact(
+        self,
+        units: List[ContextUnit],
+        token_limit: int,
+        token_counter: BaseTokenCounter,
+    ) -> List[ContextUnit]:
+        total_tokens = sum(unit.num_tokens for unit in units)
+        units = list(units)
+        for i, unit in enumerate(units):
+            if total_tokens <= token_limit:
+                break
+            content = unit.message.get("content")
+            if (
+                unit.record.memory_record.role_at_backend
+                != OpenAIBackendRole.FUNCTION
+                or not isinstance(content, str)
+                or unit.num_tokens <= self.max_tokens
+            ):
+                continue
+            # Cut the content proportionally to the number of tokens
+            length = len(content) * self.max_tokens // unit.num_tokens
+            message = {**unit.message, "content": content[:length]}
+            message["content"] += self.marker
+            num_tokens = token_counter.count_tokens_from_messages([message])
+            total_tokens -= unit.num_tokens - num_tokens
+            units[i] = replace(unit, message=message, num_tokens=num_tokens)
+        return units
@@ -11,20 +11,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
-from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from camel.memories.base import BaseContextCreator
+from camel.memories.context_creators.compaction import (
+    CompactionStrategy,
+    ContextUnit,
+)
 from camel.memories.records import ContextRecord
 from camel.messages import OpenAIMessage
-from camel.utils import BaseTokenCounter
-
-
-@dataclass(frozen=True)
-class _ContextUnit:
-    idx: int
-    record: ContextRecord
-    num_tokens: int
+from camel.utils import BaseTokenCounter, TokenEstimator
 
 
 class ScoreBasedContextCreator(BaseContextCreator):
@@ -36,18 +32,72 @@ class ScoreBasedContextCreator(BaseContextCreator):
     the context does not exceed a specified limit. It prunes messages based
     on their score if the total token count exceeds the limit.
 
+    If the context exceeds the limit, the :obj:`compaction_strategies` are
+    applied to the whole context first, in order until it fits. They run
+    before pruning because memories give a score of 1 to the system
+    messages only, so pruning would drop every other message, including the
+    newest one, before a strategy could keep or shorten them. If the context
+    still exceeds the limit, the records with a score below 1 are pruned
+    lowest score first, oldest first among equal scores.
+
+    The converted OpenAI message and the token count of every record are
+    cached by the record's UUID, so only records that have not been seen
+    before are tokenized, in one batch. Records that are no longer part of
+    the input are dropped from the cache on the next call.
+
+    If :obj:`estimate_margin` is set, token counts are estimated from the
+    length of the texts with a :obj:`TokenEstimator` instead. The estimator
+    is calibrated with exact counts of the first records and of every
+    :obj:`calibration_interval`-th new record after them. Records are only
+    counted exactly, and pruned if necessary, when the estimated total is
+    within the margin or the estimator's error bound of the limit, whichever
+    is larger. The returned token count is an estimate otherwise.
+
     Args:
         token_counter (BaseTokenCounter): An instance responsible for counting
             tokens in a message.
         token_limit (int): The maximum number of tokens allowed in the
             generated context.
+        estimate_margin (float, optional): The relative margin below the
+            token limit within which token counts are estimated. If `None`,
+            all token counts are exact. (default: :obj:`None`)
+        calibration_interval (int, optional): Every how many new records one
+            is counted exactly to calibrate the estimator.
+            (default: :obj:`10`)
+        compaction_strategies (List[CompactionStrategy], optional): The
+            strategies reducing a context that exceeds the token limit,
+            applied before pruning. If `None`, the context is only pruned.
+            (default: :obj:`None`)
     """
 
+    # Records counted exactly before estimates are used
+    _MIN_CALIBRATION_SAMPLES = 8
+
     def __init__(
-        self, token_counter: BaseTokenCounter, token_limit: int
+        self,
+        token_counter: BaseTokenCounter,
+        token_limit: int,
+        estimate_margin: Optional[float] = None,
+        calibration_interval: int = 10,
+        compaction_strategies: Optional[List[CompactionStrategy]] = None,
     ) -> None:
+        if estimate_margin is not None and not 0 <= estimate_margin < 1:
+            raise ValueError("`estimate_margin` must be in [0, 1).")
+        if calibration_interval < 1:
+            raise ValueError("`calibration_interval` must be positive.")
         self._token_counter = token_counter
         self._token_limit = token_limit
+        self._cache: Dict[int, Tuple[OpenAIMessage, int]] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self.estimate_margin = estimate_margin
+        self.calibration_interval = calibration_interval
+        self._estimator: Optional[TokenEstimator] = None
+        if estimate_margin is not None:
+            self._estimator = token_counter.create_estimator()
+        self._estimates: Dict[int, Tuple[OpenAIMessage, int]] = {}
+        self._num_new_records = 0
+        self.compaction_strategies = list(compaction_strategies or [])
 
     @property
     def token_counter(self) -> BaseTokenCounter:
@@ -57,6 +107,109 @@ class ScoreBasedContextCreator(BaseContextCreator):
     def token_limit(self) -> int:
         return self._token_limit
 
+    @property
+    def cache_hits(self) -> int:
+        r"""Number of records whose message and token count were served from
+        the cache."""
+        return self._cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        r"""Number of records that had to be converted and tokenized."""
+        return self._cache_misses
+
+    def clear_cache(self) -> None:
+        r"""Drops all cached messages and token counts, and resets the hit and
+        miss counters."""
+        self._cache.clear()
+        self._estimates.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def estimator(self) -> Optional[TokenEstimator]:
+        r"""The token estimator, or `None` if all token counts are exact."""
+        return self._estimator
+
+    def _get_messages_and_tokens(
+        self, records: List[ContextRecord]
+    ) -> List[Tuple[OpenAIMessage, int]]:
+        r"""Returns the OpenAI message and its token count for each record,
+        converting the records missing from the cache and tokenizing them in
+        one batch."""
+        results: List[Optional[Tuple[OpenAIMessage, int]]] = []
+        missing: List[Tuple[int, int, OpenAIMessage]] = []
+        for i, record in enumerate(records):
+            uuid = record.memory_record.uuid_int
+            cached = self._cache.get(uuid)
+            if cached is not None:
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+                estimated = self._estimates.get(uuid)
+                message = (
+                    estimated[0]
+                    if estimated is not None
+                    else record.memory_record.to_openai_message()
+                )
+                missing.append((i, uuid, message))
+            results.append(cached)
+
+        if missing:
+            counts = self.token_counter.count_tokens_per_message(
+                [message for _, _, message in missing]
+            )
+            for (i, uuid, message), num_tokens in zip(missing, counts):
+                self._cache[uuid] = results[i] = (message, num_tokens)
+        return results  # type: ignore[return-value]
+
+    def _get_messages_and_estimates(
+        self, records: List[ContextRecord]
+    ) -> List[Tuple[OpenAIMessage, int]]:
+        r"""Returns the OpenAI message and its exact or estimated token count
+        for each record. New records are estimated, except the ones sampled
+        to calibrate the estimator, which are counted exactly."""
+        assert self._estimator is not None
+        results: List[Optional[Tuple[OpenAIMessage, int]]] = []
+        sampled: List[Tuple[int, int, OpenAIMessage]] = []
+        for i, record in enumerate(records):
+            uuid = record.memory_record.uuid_int
+            cached = self._cache.get(uuid) or self._estimates.get(uuid)
+            if cached is None:
+                message = record.memory_record.to_openai_message()
+                self._num_new_records += 1
+                if (
+                    self._num_new_records <= self._MIN_CALIBRATION_SAMPLES
+                    or self._num_new_records % self.calibration_interval == 0
+                ):
+                    sampled.append((i, uuid, message))
+                else:
+                    cached = (
+                        message,
+                        self._estimator.estimate_message(message),
+                    )
+                    self._estimates[uuid] = cached
+            results.append(cached)
+
+        if sampled:
+            messages = [message for _, _, message in sampled]
+            counts = self.token_counter.count_tokens_per_message(messages)
+            self._estimator.calibrate(messages, counts)
+            for (i, uuid, message), num_tokens in zip(sampled, counts):
+                self._cache[uuid] = results[i] = (message, num_tokens)
+        return results  # type: ignore[return-value]
+
+    def _is_estimate_safe(self, estimated_tokens: int) -> bool:
+        r"""Whether an estimated total is far enough below the limit to be
+        used without exact counting."""
+        if self._estimator is None or self.estimate_margin is None:
+            return False
+        error_bound = self._estimator.error_bound
+        if error_bound is None:
+            return False
+        margin = max(self.estimate_margin, error_bound)
+        return estimated_tokens * (1 + margin) <= self.token_limit
+
     def create_context(
         self,
         records: List[ContextRecord],
@@ -82,61 +235,104 @@ class ScoreBasedContextCreator(BaseContextCreator):
         """
         # Create unique context units list
         uuid_set = set()
-        context_units = []
+        unique_records = []
         for idx, record in enumerate(records):
-            if record.memory_record.uuid not in uuid_set:
-                uuid_set.add(record.memory_record.uuid)
-                context_units.append(
-                    _ContextUnit(
-                        idx,
-                        record,
-                        self.token_counter.count_tokens_from_messages(
-                            [record.memory_record.to_openai_message()]
-                        ),
-                    )
+            if record.memory_record.uuid_int not in uuid_set:
+                uuid_set.add(record.memory_record.uuid_int)
+                unique_records.append((idx, record))
+
+        if self._estimator is not None:
+            estimated_units = [
+                ContextUnit(idx, record, message, num_tokens)
+                for (idx, record), (message, num_tokens) in zip(
+                    unique_records,
+                    self._get_messages_and_estimates(
+                        [record for _, record in unique_records]
+                    ),
                 )
+            ]
+            estimated_tokens = sum(unit.num_tokens for unit in estimated_units)
+            if self._is_estimate_safe(estimated_tokens):
+                self._forget_records(uuid_set)
+                return self._create_output(estimated_units)
+
+        context_units = [
+            ContextUnit(idx, record, message, num_tokens)
+            for (idx, record), (message, num_tokens) in zip(
+                unique_records,
+                self._get_messages_and_tokens(
+                    [record for _, record in unique_records]
+                ),
+            )
+        ]
 
-        # TODO: optimize the process, may give information back to memory
+        self._forget_records(uuid_set)
 
         # If not exceed token limit, simply return
         total_tokens = sum([unit.num_tokens for unit in context_units])
         if total_tokens <= self.token_limit:
             return self._create_output(context_units)
 
-        # Sort by score
-        context_units = sorted(
-            context_units, key=lambda unit: unit.record.score
-        )
+        for strategy in self.compaction_strategies:
+            if total_tokens <= self.token_limit:
+                break
+            context_units = strategy.compact(
+                context_units, self.token_limit, self.token_counter
+            )
+            total_tokens = sum(unit.num_tokens for unit in context_units)
 
         # Remove the least score messages until total token number is smaller
         # than token limit
-        truncate_idx = None
-        for i, unit in enumerate(context_units):
-            if unit.record.score == 1:
-                raise RuntimeError(
-                    "Cannot create context: exceed token limit.", total_tokens
-                )
-            total_tokens -= unit.num_tokens
-            if total_tokens <= self.token_limit:
-                truncate_idx = i
-                break
-        if truncate_idx is None:
+        if total_tokens > self.token_limit:
+            context_units, total_tokens = self._prune(
+                context_units, total_tokens
+            )
+
+        if total_tokens > self.token_limit:
             raise RuntimeError(
                 "Cannot create context: exceed token limit.", total_tokens
             )
-        return self._create_output(context_units[truncate_idx + 1 :])
+        return self._create_output(context_units)
+
+    def _prune(
+        self, context_units: List[ContextUnit], total_tokens: int
+    ) -> Tuple[List[ContextUnit], int]:
+        r"""Removes the units with a score below 1, lowest score first and
+        oldest first among equal scores, until the total token count fits the
+        limit or none is left. The kept units stay ordered by index."""
+        # Sorting is linear for scores decaying with age, as in a chat
+        # history, and so is restoring the order of the kept units
+        by_score = sorted(context_units, key=lambda unit: unit.record.score)
+        num_removed = 0
+        for unit in by_score:
+            if total_tokens <= self.token_limit or unit.record.score >= 1:
+                break
+            total_tokens -= unit.num_tokens
+            num_removed += 1
+        if num_removed == 0:
+            return context_units, total_tokens
+        context_units = by_score[num_removed:]
+        context_units.sort(key=lambda unit: unit.idx)
+        return context_units, total_tokens
+
+    def _forget_records(self, uuid_set: Set[int]) -> None:
+        r"""Forgets records that are no longer part of the history, e.g.
+        after the memory is cleared or the window has moved past them."""
+        for cache in (self._cache, self._estimates):
+            if len(cache) > len(uuid_set):
+                for uuid in cache.keys() - uuid_set:
+                    del cache[uuid]
 
     def _create_output(
-        self, context_units: List[_ContextUnit]
+        self, context_units: List[ContextUnit]
     ) -> Tuple[List[OpenAIMessage], int]:
         r"""Helper method to generate output from context units.
 
         This method converts the provided context units into a format suitable
         for output, specifically a list of OpenAIMessages and an integer
-        representing the total token count.
+        representing the total token count. The units must be ordered by
+        their index.
         """
-        context_units = sorted(context_units, key=lambda unit: unit.idx)
-        return [
-            unit.record.memory_record.to_openai_message()
-            for unit in context_units
-        ], sum([unit.num_tokens for unit in context_units])
+        return [unit.message for unit in context_units], sum(
+            [unit.num_tokens for unit in context_units]
+        )
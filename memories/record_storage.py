@@ -0,0 +1,112 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+from typing import Any, Dict, List, Optional
+
+from camel.memories.records import MemoryRecord
+from camel.storages import BaseKeyValueStorage
+
+
+class InMemoryRecordStorage(BaseKeyValueStorage):
+    r"""An in-memory key-value storage keeping :obj:`MemoryRecord` objects
+    instead of dicts. Memory blocks write and read the records directly with
+    :meth:`save_records` and :meth:`load_records`, without converting them
+    to dicts and back. The dict interface of :obj:`BaseKeyValueStorage` is
+    still supported, converting the records on the fly.
+
+    Records are immutable, so loading returns the stored records themselves
+    without any copy.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[MemoryRecord] = []
+
+    def save_records(self, records: List[MemoryRecord]) -> None:
+        r"""Appends records to the storage.
+
+        Args:
+            records (List[MemoryRecord]): The records to store.
+        """
+        self.records.extend(records)
+
+    def load_records(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> List[MemoryRecord]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics.
+
+        Args:
+            start (int, optional): Index of the first record to load.
+                (default: :obj:`0`)
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[MemoryRecord]: The stored records.
+        """
+        return self.records[start:stop]
+
+    def save(self, records: List[Dict[str, Any]]) -> None:
+        r"""Saves a batch of records to the key-value storage system.
+
+        Args:
+            records (List[Dict[str, Any]]): A list of dictionaries generated
+                by :meth:`MemoryRecord.to_dict`.
+        """
+        self.records.extend(MemoryRecord.from_dict(r) for r in records)
+
+    def load(self) -> List[Dict[str, Any]]:
+        r"""Loads all stored records from the key-value storage system.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        return [record.to_dict() for record in self.records]
+
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        return [record.to_dict() for record in self.records[start:stop]]
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        return self.load_range(-n)
+
+    def clear(self) -> None:
+        r"""Removes all records from the key-value storage system."""
+        self.records.clear()
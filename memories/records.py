@@ -11,19 +11,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
-
-from dataclasses import asdict, dataclass, field
-from typing import Any, ClassVar, Dict
+import sys
+from dataclasses import FrozenInstanceError, fields
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Mapping, Optional, Tuple, Union
 from uuid import UUID, uuid4
 
 from camel.messages import BaseMessage, FunctionCallingMessage, OpenAIMessage
 from camel.types import OpenAIBackendRole
 
+_EMPTY_EXTRA_INFO: Mapping[str, str] = MappingProxyType({})
+_BACKEND_ROLES: Dict[str, OpenAIBackendRole] = {
+    role.value: role for role in OpenAIBackendRole
+}
+
+
+def _to_backend_role(
+    role: Union[OpenAIBackendRole, str],
+) -> OpenAIBackendRole:
+    r"""Returns the shared enum member of a role, which serializing storages
+    may return as its value."""
+    if isinstance(role, OpenAIBackendRole):
+        return role
+    return _BACKEND_ROLES.get(role) or OpenAIBackendRole(role)
+
+
+class _FrozenSlots:
+    r"""Base class of the immutable, slotted record classes."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
 
-@dataclass(frozen=True)
-class MemoryRecord:
+class MemoryRecord(_FrozenSlots):
     r"""The basic message storing unit in the CAMEL memory system.
 
+    Records are immutable and use slots instead of a `__dict__`, to keep
+    the memory overhead low with many records per process. The UUID is
+    stored as an integer, and the OpenAI message is converted once, on
+    first use, and shared by all later calls.
+
     Attributes:
         message (BaseMessage): The main content of the record.
         role_at_backend (OpenAIBackendRole): An enumeration value representing
@@ -34,19 +66,85 @@ class MemoryRecord:
             This is used to uniquely identify this record in the memory system.
             If not given, it will be assigned with a random UUID.
         extra_info (Dict[str, str], optional): A dictionary of additional
-            key-value pairs that provide more information. If not given, it
-            will be an empty `Dict`.
+            key-value pairs that provide more information. The record keeps
+            a copy of it and exposes it as a read-only mapping, like the
+            rest of the record. If not given, it will be empty.
     """
 
+    __slots__ = (
+        "message",
+        "role_at_backend",
+        "_uuid",
+        "_extra_info",
+        "_openai_message",
+    )
+
     message: BaseMessage
     role_at_backend: OpenAIBackendRole
-    uuid: UUID = field(default_factory=uuid4)
-    extra_info: Dict[str, str] = field(default_factory=dict)
 
     _MESSAGE_TYPES: ClassVar[dict] = {
         "BaseMessage": BaseMessage,
         "FunctionCallingMessage": FunctionCallingMessage,
     }
+    _message_fields: ClassVar[Dict[type, Tuple[str, ...]]] = {}
+
+    def __init__(
+        self,
+        message: BaseMessage,
+        role_at_backend: OpenAIBackendRole,
+        uuid: Optional[UUID] = None,
+        extra_info: Optional[Dict[str, str]] = None,
+    ) -> None:
+        set_field = object.__setattr__
+        set_field(self, "message", message)
+        set_field(self, "role_at_backend", _to_backend_role(role_at_backend))
+        set_field(self, "_uuid", (uuid or uuid4()).int)
+        # Copied, so that the caller cannot change the record through it
+        set_field(
+            self, "_extra_info", dict(extra_info) if extra_info else None
+        )
+        set_field(self, "_openai_message", None)
+
+    @property
+    def uuid(self) -> UUID:
+        return UUID(int=self._uuid)
+
+    @property
+    def uuid_int(self) -> int:
+        r"""The UUID as an integer, a cheaper key than :obj:`uuid`."""
+        return self._uuid
+
+    @property
+    def extra_info(self) -> Mapping[str, str]:
+        if self._extra_info is None:
+            return _EMPTY_EXTRA_INFO
+        return MappingProxyType(self._extra_info)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MemoryRecord):
+            return NotImplemented
+        return (
+            self._uuid == other._uuid
+            and self.role_at_backend == other.role_at_backend
+            and self.message == other.message
+            and self.extra_info == other.extra_info
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._uuid)
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoryRecord(message={self.message!r}, "
+            f"role_at_backend={self.role_at_backend!r}, "
+            f"uuid={self.uuid!r}, extra_info={dict(self.extra_info)!r})"
+        )
+
+    def __reduce__(self) -> Any:
+        return (
+            self.__class__,
+            (self.message, self.role_at_backend, self.uuid, self._extra_info),
+        )
 
     @classmethod
     def from_dict(cls, record_dict: Dict[str, Any]) -> "MemoryRecord":
@@ -58,6 +156,8 @@ class MemoryRecord:
         message_cls = cls._MESSAGE_TYPES[record_dict["message"]["__class__"]]
         kwargs: Dict = record_dict["message"].copy()
         kwargs.pop("__class__")
+        # Share one string per role name between the records
+        kwargs["role_name"] = sys.intern(kwargs["role_name"])
         reconstructed_message = message_cls(**kwargs)
         return cls(
             uuid=UUID(record_dict["uuid"]),
@@ -68,26 +168,75 @@ class MemoryRecord:
 
     def to_dict(self) -> Dict[str, Any]:
         r"""Convert the :obj:`MemoryRecord` to a dict for serialization
-        purposes.
+        purposes. The fields of the message are not copied, so the dict
+        must not be modified in place.
         """
+        message_cls = self.message.__class__
+        names = self._message_fields.get(message_cls)
+        if names is None:
+            names = tuple(field.name for field in fields(message_cls))
+            self._message_fields[message_cls] = names
+        message_dict: Dict[str, Any] = {"__class__": message_cls.__name__}
+        for name in names:
+            message_dict[name] = getattr(self.message, name)
         return {
             "uuid": str(self.uuid),
-            "message": {
-                "__class__": self.message.__class__.__name__,
-                **asdict(self.message),
-            },
+            "message": message_dict,
             "role_at_backend": self.role_at_backend,
-            "extra_info": self.extra_info,
+            "extra_info": dict(self.extra_info),
         }
 
     def to_openai_message(self) -> OpenAIMessage:
-        r"""Converts the record to an :obj:`OpenAIMessage` object."""
-        return self.message.to_openai_message(self.role_at_backend)
+        r"""Converts the record to an :obj:`OpenAIMessage` object. A text
+        message is converted on the first call and shared by the following
+        ones. Messages with images or a video are converted on every call,
+        since their encoded payloads are owned by the bounded cache of
+        :obj:`BaseMessage`, which makes converting them again cheap.
+
+        Returns:
+            OpenAIMessage: The converted message. It is shared, e.g. with
+                the cache of the context creators, and must not be mutated:
+                a change would permanently alter the message sent for this
+                record. Copy it before modifying it.
+        """
+        openai_message = self._openai_message
+        if openai_message is None:
+            openai_message = self.message.to_openai_message(
+                self.role_at_backend
+            )
+            if not self.message.image_list and not self.message.video_bytes:
+                object.__setattr__(self, "_openai_message", openai_message)
+        return openai_message
 
 
-@dataclass(frozen=True)
-class ContextRecord:
+class ContextRecord(_FrozenSlots):
     r"""The result of memory retrieving."""
 
+    __slots__ = ("memory_record", "score")
+
     memory_record: MemoryRecord
     score: float
+
+    def __init__(self, memory_record: MemoryRecord, score: float) -> None:
+        object.__setattr__(self, "memory_record", memory_record)
+        object.__setattr__(self, "score", score)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ContextRecord):
+            return NotImplemented
+        return (
+            self.memory_record == other.memory_record
+            and self.score == other.score
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.memory_record, self.score))
+
+    def __repr__(self) -> str:
+        return (
+            f"ContextRecord(memory_record={self.memory_record!r}, "
+            f"score={self.score!r})"
+        )
+
+    def __reduce__(self) -> Any:
+        return (self.__class__, (self.memory_record, self.score))
@@ -0,0 +1,403 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from camel.memories.base import AgentMemory, BaseContextCreator
+from camel.memories.blocks import ChatHistoryBlock
+from camel.memories.record_storage import InMemoryRecordStorage
+from camel.memories.records import ContextRecord, MemoryRecord
+from camel.storages import BaseKeyValueStorage
+
+# Approximate size in bytes of a record without its content, including the
+# message and the entry in the record list
+_RECORD_OVERHEAD_BYTES = 400
+
+
+def _estimate_size(record: MemoryRecord) -> int:
+    r"""Approximates the number of bytes a record keeps resident."""
+    message = record.message
+    size = _RECORD_OVERHEAD_BYTES + len(message.content)
+    if message.video_bytes is not None:
+        size += len(message.video_bytes)
+    for image in message.image_list or ():
+        size += image.width * image.height * len(image.getbands())
+    return size
+
+
+class SessionMemory(AgentMemory):
+    r"""The chat history memory of a session managed by a
+    :obj:`SessionMemoryManager`. It behaves like a :obj:`ChatHistoryMemory`,
+    but its records may be evicted to the persistent storage of the session
+    by the manager, and are loaded back the next time the memory is used.
+
+    Memories are created by :meth:`SessionMemoryManager.get_memory`.
+
+    Args:
+        manager (SessionMemoryManager): The manager of the memory.
+        session_id (str): The ID of the session.
+    """
+
+    def __init__(self, manager: "SessionMemoryManager", session_id: str):
+        self.session_id = session_id
+        self._manager = manager
+        # Guards the state of the memory and the access to its storage
+        self._lock = threading.RLock()
+        self._storage: Optional[BaseKeyValueStorage] = None
+        # The records in memory, or `None` if the memory is not resident
+        self._block: Optional[ChatHistoryBlock] = None
+        self._context_creator: Optional[BaseContextCreator] = None
+        # Number of resident records already in the persistent storage
+        self._num_persisted = 0
+        self._size = 0
+        # The size and number of records of the memory as counted by the
+        # manager
+        self._accounted_size = 0
+        self._accounted_records = 0
+
+    @property
+    def is_resident(self) -> bool:
+        r"""Whether the records of the memory are in memory."""
+        return self._block is not None
+
+    @property
+    def storage(self) -> BaseKeyValueStorage:
+        r"""The persistent storage of the session, created on first use."""
+        with self._lock:
+            if self._storage is None:
+                self._storage = self._manager.storage_factory(self.session_id)
+            return self._storage
+
+    def _num_records(self) -> int:
+        return 0 if self._block is None else len(self._records())
+
+    def _records(self) -> List[MemoryRecord]:
+        assert self._block is not None
+        storage = self._block.storage
+        assert isinstance(storage, InMemoryRecordStorage)
+        return storage.records
+
+    def _load(self) -> bool:
+        r"""Loads the records of the session from the persistent storage if
+        they are not resident. With a window size, only the records inside
+        the window are loaded.
+
+        Returns:
+            bool: Whether the records had to be loaded.
+        """
+        if self._block is not None:
+            return False
+        window_size = self._manager.window_size
+        if window_size:
+            record_dicts = self.storage.load_tail(window_size)
+        else:
+            record_dicts = self.storage.load()
+        records = [MemoryRecord.from_dict(r) for r in record_dicts]
+        block = ChatHistoryBlock(keep_rate=self._manager.keep_rate)
+        block.write_records(records)
+        self._block = block
+        self._num_persisted = len(records)
+        self._size = sum(_estimate_size(record) for record in records)
+        return True
+
+    def _persist(self) -> None:
+        r"""Saves the records that are not yet in the persistent storage.
+        With a window size, the saved records outside the window are then
+        dropped from memory."""
+        records = self._records()
+        if self._num_persisted < len(records):
+            self.storage.save(
+                [record.to_dict() for record in records[self._num_persisted :]]
+            )
+            self._num_persisted = len(records)
+        window_size = self._manager.window_size
+        if window_size and len(records) > window_size:
+            num_dropped = len(records) - window_size
+            self._size -= sum(
+                _estimate_size(record) for record in records[:num_dropped]
+            )
+            del records[:num_dropped]
+            self._num_persisted -= num_dropped
+
+    def _evict(self) -> None:
+        r"""Saves the new records and releases the memory of the session."""
+        self._persist()
+        self._block = None
+        self._context_creator = None
+        self._size = 0
+
+    def retrieve(self) -> List[ContextRecord]:
+        with self._lock:
+            loaded = self._load()
+            assert self._block is not None
+            records = self._block.retrieve(self._manager.window_size)
+            self._manager._record_use(self, loaded)
+        self._manager._enforce_budget(self)
+        return records
+
+    def write_records(self, records: List[MemoryRecord]) -> None:
+        with self._lock:
+            loaded = self._load()
+            assert self._block is not None
+            self._block.write_records(records)
+            self._size += sum(_estimate_size(record) for record in records)
+            self._manager._record_use(self, loaded)
+        self._manager._enforce_budget(self)
+
+    def get_context_creator(self) -> BaseContextCreator:
+        with self._lock:
+            if self._context_creator is None:
+                factory = self._manager.context_creator_factory
+                self._context_creator = factory()
+            return self._context_creator
+
+    def clear(self) -> None:
+        with self._lock:
+            self.storage.clear()
+            self._num_persisted = 0
+            if self._block is None:
+                # Nothing to release, and no reason to load the history
+                return
+            self._block.clear()
+            self._size = 0
+            self._manager._record_use(self, False)
+
+
+class SessionMemoryManager:
+    r"""Manages the chat history memories of many sessions, e.g. of one agent
+    per user of a service, keeping only the recently used ones in memory.
+
+    The manager creates a :obj:`SessionMemory` per session, to be passed to
+    the agent of the session. Once more than :obj:`max_sessions` memories
+    are resident, or their records take more than :obj:`max_bytes` bytes,
+    the least recently used memories are evicted: their new records are
+    saved to the persistent storage of their session and released. An
+    evicted memory loads its records back the next time it is read or
+    written, e.g. in the next step of its agent. The memory in use is never
+    evicted, so a single session may exceed the budget.
+
+    New records are only saved on eviction and by :meth:`flush`, so the
+    records written since then are lost if the process ends without
+    flushing. Memories can be used from several threads. Every memory has
+    its own lock, held while its storage is read or written, so that
+    loading or saving one session does not block the others.
+
+    Args:
+        context_creator_factory (Callable[[], BaseContextCreator]): Creates
+            the context creator of a memory. It is called again after a
+            memory is reloaded, so that cached context state is released
+            with the records.
+        storage_factory (Callable[[str], BaseKeyValueStorage]): Creates the
+            persistent storage of a session from its ID, e.g.
+            :obj:`SQLiteKeyValueStorage` with the session ID.
+        max_sessions (int, optional): The maximum number of resident
+            memories. If `None`, the number is not limited.
+            (default: :obj:`1024`)
+        max_bytes (int, optional): The maximum approximate size in bytes of
+            the records of the resident memories. If `None`, the size is not
+            limited. (default: :obj:`None`)
+        window_size (int, optional): The number of recent chat messages
+            retrieved by the memories. Only the records inside the window
+            are loaded and kept in memory. If `None`, the entire chat history
+            is retrieved. (default: :obj:`None`)
+        keep_rate (float, optional): The score decay of older messages. See
+            :obj:`ChatHistoryBlock`. (default: :obj:`0.9`)
+    """
+
+    def __init__(
+        self,
+        context_creator_factory: Callable[[], BaseContextCreator],
+        storage_factory: Callable[[str], BaseKeyValueStorage],
+        max_sessions: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        window_size: Optional[int] = None,
+        keep_rate: float = 0.9,
+    ) -> None:
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError("`max_sessions` must be positive.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("`max_bytes` must be positive.")
+        if window_size is not None and window_size < 0:
+            raise ValueError("`window_size` must be non-negative.")
+        if keep_rate > 1 or keep_rate < 0:
+            raise ValueError("`keep_rate` should be in [0,1]")
+        self.context_creator_factory = context_creator_factory
+        self.storage_factory = storage_factory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.window_size = window_size
+        self.keep_rate = keep_rate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Guards the bookkeeping only. Storages are accessed with the lock
+        # of the memory held instead, which may be acquired before this
+        # one, but never after it.
+        self._lock = threading.Lock()
+        # Resident memories, least recently used first
+        self._resident: OrderedDict[str, SessionMemory] = OrderedDict()
+        self._resident_bytes = 0
+        self._resident_records = 0
+        # Size of the memories being evicted
+        self._releasing_bytes = 0
+        # All memories still referenced, by the agents or the manager
+        self._memories: weakref.WeakValueDictionary[str, SessionMemory] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def get_memory(self, session_id: str) -> SessionMemory:
+        r"""Returns the memory of a session, creating it if needed. Its
+        records are loaded when it is first used.
+
+        Args:
+            session_id (str): The ID of the session.
+
+        Returns:
+            SessionMemory: The memory of the session.
+        """
+        with self._lock:
+            memory = self._memories.get(session_id)
+            if memory is None:
+                memory = SessionMemory(self, session_id)
+                self._memories[session_id] = memory
+            return memory
+
+    def _record_use(self, memory: SessionMemory, loaded: bool) -> None:
+        r"""Marks a memory as most recently used and accounts for its
+        current size. Must be called with the lock of the memory held."""
+        with self._lock:
+            if loaded:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if memory.session_id in self._resident:
+                self._resident.move_to_end(memory.session_id)
+            else:
+                self._resident[memory.session_id] = memory
+            self._account(memory)
+
+    def _account(self, memory: SessionMemory) -> None:
+        r"""Updates the resident size and number of records to the current
+        state of a memory. Must be called with the locks of the memory and
+        of the manager held."""
+        num_records = memory._num_records()
+        self._resident_bytes += memory._size - memory._accounted_size
+        self._resident_records += num_records - memory._accounted_records
+        memory._accounted_size = memory._size
+        memory._accounted_records = num_records
+
+    def _enforce_budget(self, current: SessionMemory) -> None:
+        r"""Evicts the least recently used memories other than the current
+        one while the budget is exceeded. Memories in use by other threads
+        are skipped. Their records are saved with only their own lock held,
+        so that the other memories can be used meanwhile."""
+        while True:
+            with self._lock:
+                victim = self._pick_victim(current)
+                if victim is None:
+                    return
+                # Not counted while it is saved, so that other threads do
+                # not evict more memories for the same excess
+                del self._resident[victim.session_id]
+                self._releasing_bytes += victim._accounted_size
+            # The lock of the victim was acquired by `_pick_victim`
+            try:
+                victim._evict()
+            except BaseException:
+                with self._lock:
+                    self._releasing_bytes -= victim._accounted_size
+                    self._resident[victim.session_id] = victim
+                    self._resident.move_to_end(victim.session_id, last=False)
+                victim._lock.release()
+                raise
+            with self._lock:
+                self._releasing_bytes -= victim._accounted_size
+                self._account(victim)
+                self.evictions += 1
+            victim._lock.release()
+
+    def _pick_victim(self, current: SessionMemory) -> Optional[SessionMemory]:
+        r"""Returns the least recently used memory to evict, with its lock
+        acquired, or `None` if the budget is not exceeded or no memory can
+        be evicted. Must be called with the lock of the manager held."""
+        if not self._is_over_budget():
+            return None
+        for memory in self._resident.values():
+            # Never block on a memory lock while holding the manager lock
+            if memory is not current and memory._lock.acquire(
+                blocking=False
+            ):
+                return memory
+        return None
+
+    def _is_over_budget(self) -> bool:
+        return (
+            self.max_sessions is not None
+            and len(self._resident) > self.max_sessions
+        ) or (
+            self.max_bytes is not None
+            and self._resident_bytes - self._releasing_bytes > self.max_bytes
+        )
+
+    def _resident_memories(self) -> List[SessionMemory]:
+        with self._lock:
+            return list(self._resident.values())
+
+    def flush(self) -> None:
+        r"""Saves the new records of all resident memories to their
+        persistent storages. With a window size, the records outside the
+        window are then released."""
+        for memory in self._resident_memories():
+            with memory._lock:
+                if memory._block is None:
+                    continue
+                memory._persist()
+                with self._lock:
+                    self._account(memory)
+
+    def evict_all(self) -> None:
+        r"""Saves the new records of all resident memories and releases
+        them, e.g. before shutting down."""
+        for memory in self._resident_memories():
+            with memory._lock:
+                if memory._block is None:
+                    continue
+                memory._evict()
+                with self._lock:
+                    self._resident.pop(memory.session_id, None)
+                    self._account(memory)
+                    self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        r"""Returns the residency and eviction statistics of the manager.
+
+        Returns:
+            Dict[str, int]: The number of uses of resident memories (hits)
+                and of memories that had to be loaded (misses), the number
+                of evictions, the number of memories still referenced and of
+                resident ones, and the number and approximate size in bytes
+                of the resident records.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "sessions": len(self._memories),
+                "resident_sessions": len(self._resident),
+                "resident_records": self._resident_records,
+                "resident_bytes": self._resident_bytes,
+            }
@@ -12,11 +12,16 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 import base64
+import hashlib
 import io
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
-import numpy as np
 from PIL import Image
 
 from camel.messages import (
@@ -264,7 +269,10 @@ class BaseMessage:
         return {"role": "system", "content": self.content}
 
     def to_openai_user_message(self) -> OpenAIUserMessage:
-        r"""Converts the message to an :obj:`OpenAIUserMessage` object.
+        r"""Converts the message to an :obj:`OpenAIUserMessage` object. The
+        encoded images and video frames are kept in a bounded cache keyed by
+        their content, so that converting the message again does not encode
+        them again. The content hash of an image object is computed once.
 
         Returns:
             OpenAIUserMessage: The converted :obj:`OpenAIUserMessage` object.
@@ -279,77 +287,18 @@ class BaseMessage:
 
         if self.image_list and len(self.image_list) > 0:
             for image in self.image_list:
-                if image.format is None:
-                    raise ValueError(
-                        f"Image's `format` is `None`, please "
-                        f"transform the `PIL.Image.Image` to  one of "
-                        f"following supported formats, such as "
-                        f"{list(OpenAIImageType)}"
-                    )
-
-                image_type: str = image.format.lower()
-                if image_type not in OpenAIImageType:
-                    raise ValueError(
-                        f"Image type {image.format} "
-                        f"is not supported by OpenAI vision model"
-                    )
-                with io.BytesIO() as buffer:
-                    image.save(fp=buffer, format=image.format)
-                    encoded_image = base64.b64encode(buffer.getvalue()).decode(
-                        "utf-8"
-                    )
-                image_prefix = f"data:image/{image_type};base64,"
                 hybird_content.append(
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"{image_prefix}{encoded_image}",
+                            "url": _encode_image(image),
                             "detail": self.image_detail,
                         },
                     }
                 )
 
         if self.video_bytes:
-            import imageio.v3 as iio
-
-            base64Frames: List[str] = []
-            frame_count = 0
-            # read video bytes
-            video = iio.imiter(
-                self.video_bytes, plugin=Constants.VIDEO_DEFAULT_PLUG_PYAV
-            )
-
-            for frame in video:
-                frame_count += 1
-                if (
-                    frame_count % Constants.VIDEO_IMAGE_EXTRACTION_INTERVAL
-                    == 0
-                ):
-                    # convert frame to numpy array
-                    frame_array = np.asarray(frame)
-                    frame_image = Image.fromarray(frame_array)
-
-                    # Get the dimensions of the frame
-                    width, height = frame_image.size
-
-                    # resize the frame to the default image size
-                    new_width = Constants.VIDEO_DEFAULT_IMAGE_SIZE
-                    aspect_ratio = width / height
-                    new_height = int(new_width / aspect_ratio)
-                    resized_img = frame_image.resize((new_width, new_height))
-
-                    # encode the image to base64
-                    with io.BytesIO() as buffer:
-                        image_format = OpenAIImageType.JPEG.value
-                        image_format = image_format.upper()
-                        resized_img.save(fp=buffer, format=image_format)
-                        encoded_image = base64.b64encode(
-                            buffer.getvalue()
-                        ).decode("utf-8")
-
-                    base64Frames.append(encoded_image)
-
-            for encoded_image in base64Frames:
+            for encoded_image in _encode_video_frames(self.video_bytes):
                 item = {
                     "type": "image_url",
                     "image_url": {
@@ -393,3 +342,238 @@ class BaseMessage:
             **(self.meta_dict or {}),
             "content": self.content,
         }
+
+
+class _EncodedMediaCache:
+    r"""A thread-safe LRU cache of base64 encoded images and video frames,
+    keyed by the hash of their content and bounded by the total length of
+    the encoded strings."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[str, List[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: List[str]) -> None:
+        value_size = sum(len(item) for item in value)
+        if value_size > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self.size += value_size
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sum(len(item) for item in evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class _ImageKeys:
+    r"""Remembers the content hash of every image object for as long as the
+    object is alive, so that the pixels of an image are hashed only once.
+    Images are not hashable, so they are tracked by their ID and a weak
+    reference removing the entry once the image is freed. Images must not be
+    modified in place after they were encoded."""
+
+    def __init__(self) -> None:
+        self._keys: Dict[int, Tuple[weakref.ref, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, image: Image.Image) -> Optional[str]:
+        entry = self._keys.get(id(image))
+        if entry is None or entry[0]() is not image:
+            return None
+        return entry[1]
+
+    def set(self, image: Image.Image, key: str) -> None:
+        image_id = id(image)
+
+        def forget(ref: weakref.ref) -> None:
+            with self._lock:
+                if self._keys.get(image_id, (None,))[0] is ref:
+                    del self._keys[image_id]
+
+        with self._lock:
+            self._keys[image_id] = (weakref.ref(image, forget), key)
+
+
+_encoded_media_cache = _EncodedMediaCache(Constants.ENCODED_MEDIA_CACHE_SIZE)
+_image_keys = _ImageKeys()
+
+
+def _get_image_key(image: Image.Image) -> str:
+    r"""Returns the content hash of an image, hashing its pixels only the
+    first time the image object is seen."""
+    key = _image_keys.get(image)
+    if key is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(
+            f"image:{image.format}:{image.mode}:{image.size}".encode()
+        )
+        hasher.update(image.tobytes())
+        key = hasher.hexdigest()
+        _image_keys.set(image, key)
+    return key
+
+
+def _encode_image(image: Image.Image) -> str:
+    r"""Encodes an image as a base64 data URL, reusing the result for images
+    with the same content."""
+    if image.format is None:
+        raise ValueError(
+            f"Image's `format` is `None`, please "
+            f"transform the `PIL.Image.Image` to  one of "
+            f"following supported formats, such as "
+            f"{list(OpenAIImageType)}"
+        )
+
+    image_type: str = image.format.lower()
+    if image_type not in OpenAIImageType:
+        raise ValueError(
+            f"Image type {image.format} "
+            f"is not supported by OpenAI vision model"
+        )
+
+    key = _get_image_key(image)
+    cached = _encoded_media_cache.get(key)
+    if cached is not None:
+        return cached[0]
+
+    with io.BytesIO() as buffer:
+        image.save(fp=buffer, format=image.format)
+        encoded_image = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    url = f"data:image/{image_type};base64,{encoded_image}"
+    _encoded_media_cache.set(key, [url])
+    return url
+
+
+def _encode_video_frames(video_bytes: bytes) -> List[str]:
+    r"""Extracts frames from a video and encodes them as base64 JPEG images,
+    reusing the result for videos with the same content."""
+    key = "video:" + hashlib.blake2b(video_bytes, digest_size=16).hexdigest()
+    cached = _encoded_media_cache.get(key)
+    if cached is not None:
+        return cached
+
+    frames = _sample_video_frames(
+        video_bytes,
+        Constants.VIDEO_IMAGE_EXTRACTION_INTERVAL,
+        Constants.VIDEO_MAX_EXTRACTED_IMAGES,
+    )
+    if not frames:
+        return []
+    # Pillow releases the GIL while resizing and encoding
+    with ThreadPoolExecutor(
+        max_workers=min(len(frames), os.cpu_count() or 1)
+    ) as executor:
+        base64Frames = list(executor.map(_resize_and_encode_frame, frames))
+
+    _encoded_media_cache.set(key, base64Frames)
+    return base64Frames
+
+
+def _resize_and_encode_frame(frame_image: Image.Image) -> str:
+    r"""Resizes a video frame to the default image width and encodes it as a
+    base64 JPEG image."""
+    # Get the dimensions of the frame
+    width, height = frame_image.size
+
+    # resize the frame to the default image size
+    new_width = Constants.VIDEO_DEFAULT_IMAGE_SIZE
+    aspect_ratio = width / height
+    new_height = int(new_width / aspect_ratio)
+    resized_img = frame_image.resize((new_width, new_height))
+
+    # encode the image to base64
+    with io.BytesIO() as buffer:
+        image_format = OpenAIImageType.JPEG.value
+        image_format = image_format.upper()
+        resized_img.save(fp=buffer, format=image_format)
+        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def _sample_video_frames(
+    video_bytes: bytes, interval: int, max_frames: int
+) -> List[Image.Image]:
+    r"""Extracts every :obj:`interval`-th frame of a video, or
+    :obj:`max_frames` evenly spaced frames if there would be more of them.
+
+    Instead of decoding the whole video, the container is seeked to the
+    keyframe before each target timestamp and decoded from there, so the
+    cost scales with the number of extracted frames. Videos without a known
+    frame rate or duration are decoded sequentially.
+
+    Args:
+        video_bytes (bytes): The video.
+        interval (int): The interval between extracted frames, in frames.
+        max_frames (int): The maximum number of extracted frames.
+
+    Returns:
+        List[Image.Image]: The extracted frames in RGB.
+    """
+    import av
+
+    with av.open(io.BytesIO(video_bytes)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        time_base = stream.time_base
+        rate = stream.average_rate or stream.guessed_rate
+        duration = None
+        if stream.duration is not None and time_base is not None:
+            duration = float(stream.duration * time_base)
+        elif container.duration is not None:
+            duration = container.duration / av.time_base
+        if not rate or not duration or time_base is None:
+            return _decode_video_frames(container, interval, max_frames)
+
+        fps = float(rate)
+        num_frames = stream.frames or int(duration * fps)
+        # The 1-based frame numbers `interval`, `2 * interval`, ...
+        frame_numbers = list(range(interval, num_frames + 1, interval))
+        if len(frame_numbers) > max_frames:
+            step = len(frame_numbers) / max_frames
+            frame_numbers = [
+                frame_numbers[int(i * step)] for i in range(max_frames)
+            ]
+
+        start = 0.0
+        if stream.start_time is not None:
+            start = float(stream.start_time * time_base)
+        frames: List[Image.Image] = []
+        for frame_number in frame_numbers:
+            timestamp = start + (frame_number - 1) / fps
+            target_pts = round(timestamp / time_base)
+            container.seek(target_pts, stream=stream, backward=True)
+            # Decode from the keyframe up to the first frame at the target
+            for frame in container.decode(stream):
+                if frame.pts is None or frame.pts >= target_pts:
+                    frames.append(frame.to_image())
+                    break
+        return frames
+
+
+def _decode_video_frames(
+    container: Any, interval: int, max_frames: int
+) -> List[Image.Image]:
+    r"""Decodes a video sequentially, keeping every :obj:`interval`-th frame
+    up to :obj:`max_frames` frames."""
+    frames: List[Image.Image] = []
+    for frame_count, frame in enumerate(container.decode(video=0), start=1):
+        if frame_count % interval == 0:
+            frames.append(frame.to_image())
+            if len(frames) >= max_frames:
+                break
+    return frames
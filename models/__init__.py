@@ -12,16 +12,24 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 from .anthropic_model import AnthropicModel
-from .base_model import BaseModelBackend
+from .base_model import (
+    BaseModelBackend,
+    get_prompt_tokens_hint,
+    prompt_tokens_hint,
+)
+from .cached_model import CachedModelBackend, ResponseCache
 from .litellm_model import LiteLLMModel
 from .model_factory import ModelFactory
 from .open_source_model import OpenSourceModel
 from .openai_audio_models import OpenAIAudioModels
 from .openai_model import OpenAIModel
+from .rate_limited_model import RateLimitedModelBackend, RateLimiter
 from .stub_model import StubModel
 
 __all__ = [
     'BaseModelBackend',
+    'prompt_tokens_hint',
+    'get_prompt_tokens_hint',
     'OpenAIModel',
     'AnthropicModel',
     'StubModel',
@@ -29,4 +37,8 @@ __all__ = [
     'ModelFactory',
     'LiteLLMModel',
     'OpenAIAudioModels',
+    'CachedModelBackend',
+    'ResponseCache',
+    'RateLimitedModelBackend',
+    'RateLimiter',
 ]
@@ -14,7 +14,7 @@
 import os
 from typing import Any, Dict, List, Optional
 
-from anthropic import NOT_GIVEN, Anthropic
+from anthropic import NOT_GIVEN, Anthropic, AsyncAnthropic
 
 from camel.configs import ANTHROPIC_API_PARAMS
 from camel.messages import OpenAIMessage
@@ -49,6 +49,7 @@ class AnthropicModel(BaseModelBackend):
         super().__init__(model_type, model_config_dict)
         self._api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         self.client = Anthropic(api_key=self._api_key)
+        self.async_client = AsyncAnthropic(api_key=self._api_key)
         self._token_counter: Optional[BaseTokenCounter] = None
 
     def _convert_response_from_anthropic_to_openai(self, response):
@@ -125,6 +126,37 @@ class AnthropicModel(BaseModelBackend):
 
         return response
 
+    @model_api_key_required
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ):
+        r"""Run inference of Anthropic chat completion asynchronously.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            ChatCompletion: Response in the OpenAI API format.
+        """
+
+        if messages[0]["role"] == "system":
+            sys_msg = str(messages.pop(0)["content"])
+        else:
+            sys_msg = NOT_GIVEN  # type: ignore[assignment]
+        response = await self.async_client.messages.create(
+            model=self.model_type.value,
+            system=sys_msg,
+            messages=messages,  # type: ignore[arg-type]
+            **self.model_config_dict,
+        )
+
+        # format response to openai format
+        response = self._convert_response_from_anthropic_to_openai(response)
+
+        return response
+
     def check_model_config(self):
         r"""Check whether the model configuration is valid for anthropic
         model backends.
@@ -11,15 +11,72 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
-
-from openai import Stream
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from openai import AsyncStream, Stream
 
 from camel.messages import OpenAIMessage
 from camel.types import ChatCompletion, ChatCompletionChunk, ModelType
 from camel.utils import BaseTokenCounter
 
+# The messages of the current model call and their number of tokens, if the
+# caller already counted them
+_prompt_tokens: ContextVar[Optional[Tuple[List[OpenAIMessage], int]]] = (
+    ContextVar("camel_prompt_tokens", default=None)
+)
+
+
+@contextmanager
+def prompt_tokens_hint(
+    messages: List[OpenAIMessage], num_tokens: int
+) -> Iterator[None]:
+    r"""Declares the number of tokens of messages about to be sent to a model
+    backend, so that backends needing it, such as
+    :obj:`RateLimitedModelBackend`, do not tokenize the messages again. The
+    hint applies to calls with the same message list inside the `with`
+    block, in the same thread or asyncio task.
+
+    Args:
+        messages (List[OpenAIMessage]): The messages to be sent.
+        num_tokens (int): The number of tokens of the messages.
+    """
+    token = _prompt_tokens.set((messages, num_tokens))
+    try:
+        yield
+    finally:
+        _prompt_tokens.reset(token)
+
+
+def get_prompt_tokens_hint(messages: List[OpenAIMessage]) -> Optional[int]:
+    r"""Returns the number of tokens declared by :func:`prompt_tokens_hint`
+    for messages.
+
+    Args:
+        messages (List[OpenAIMessage]): The messages of a model call.
+
+    Returns:
+        Optional[int]: The number of tokens, or `None` if no hint was given
+            for this message list.
+    """
+    hint = _prompt_tokens.get()
+    if hint is None or hint[0] is not messages:
+        return None
+    return hint[1]
+
 
 class BaseModelBackend(ABC):
     r"""Base class for different model backends.
@@ -75,6 +132,37 @@ class BaseModelBackend(ABC):
         """
         pass
 
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+        r"""Runs the query to the backend model asynchronously. Backends
+        with a native async client should override this method. By default,
+        the blocking :meth:`run` is executed in the default executor of the
+        running event loop, so that it does not block the loop. In the stream
+        mode, the chunks are then read in the executor one at a time and
+        returned as an asynchronous iterator.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or
+                `AsyncStream[ChatCompletionChunk]` in the stream mode.
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the context, so that hints such as
+        # `prompt_tokens_hint` reach `run`
+        context = copy_context()
+        response = await loop.run_in_executor(
+            None, partial(context.run, self.run, messages)
+        )
+        if isinstance(response, ChatCompletion):
+            return response
+        return _iterate_in_executor(response)  # type: ignore[return-value]
+
     @abstractmethod
     def check_model_config(self):
         r"""Check whether the input model configuration contains unexpected
@@ -117,3 +205,24 @@ class BaseModelBackend(ABC):
             bool: Whether the model is in stream mode.
         """
         return False
+
+
+async def _iterate_in_executor(
+    stream: Iterator[ChatCompletionChunk],
+) -> AsyncIterator[ChatCompletionChunk]:
+    r"""Reads a blocking stream in the default executor of the running event
+    loop, one chunk at a time, so that reading it does not block the loop.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(stream)
+    end = object()
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, iterator, end)
+            if chunk is end:
+                return
+            yield chunk  # type: ignore[misc]
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,364 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+from pydantic import ValidationError
+
+from camel.messages import OpenAIMessage
+from camel.models.base_model import BaseModelBackend
+from camel.types import ChatCompletion, ChatCompletionChunk, ModelType
+from camel.utils import BaseTokenCounter
+
+# Seconds during which a response is not marked as used again
+_TOUCH_INTERVAL = 10.0
+# Number of pending access times written in one transaction
+_TOUCH_BATCH_SIZE = 64
+
+
+class ResponseCache:
+    r"""A persistent cache of model responses backed by a SQLite database.
+    Entries are evicted in least-recently-used order once the total size of
+    the stored responses exceeds :obj:`max_size_bytes`.
+
+    Lookups do not write to the database on every hit. The access time of a
+    response is only updated if it is older than a few seconds, and the
+    updates are written in batches, before any eviction, so that a fully
+    cached rerun reads from the database almost exclusively.
+
+    Args:
+        path (Path, optional): Path to the SQLite database file. If `None`, a
+            default path `./camel_response_cache.db` will be used.
+            (default: :obj:`None`)
+        max_size_bytes (int, optional): The maximum total size of the stored
+            responses in bytes. (default: :obj:`1 << 30`)
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_size_bytes: int = 1 << 30,
+    ) -> None:
+        if max_size_bytes <= 0:
+            raise ValueError("`max_size_bytes` must be positive.")
+        self.path = path or Path("./camel_response_cache.db")
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Access times not yet written to the database, by key
+        self._pending_touches: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access "
+                "ON responses (last_access)"
+            )
+
+    @staticmethod
+    def make_key(
+        model_type: ModelType,
+        model_config_dict: Dict[str, Any],
+        messages: List[OpenAIMessage],
+    ) -> str:
+        r"""Computes a stable key for a model request.
+
+        Args:
+            model_type (ModelType): The model the request is sent to.
+            model_config_dict (Dict[str, Any]): The config of the request.
+            messages (List[OpenAIMessage]): The messages of the request.
+
+        Returns:
+            str: The SHA-256 hex digest of the canonical JSON form of the
+                request.
+        """
+        payload = json.dumps(
+            [model_type.value, model_config_dict, messages],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        r"""Looks up a response and marks it as recently used.
+
+        Args:
+            key (str): The key computed by :meth:`make_key`.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored response, or `None` if
+                there is no response for the key.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, last_access FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            last_access = self._pending_touches.get(key, row[1])
+            if now - last_access > _TOUCH_INTERVAL:
+                self._pending_touches[key] = now
+                if len(self._pending_touches) >= _TOUCH_BATCH_SIZE:
+                    self._write_touches()
+        return json.loads(row[0])
+
+    def _write_touches(self) -> None:
+        r"""Writes the pending access times in one transaction. Must be
+        called with the lock held."""
+        if not self._pending_touches:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(now, key) for key, now in self._pending_touches.items()],
+            )
+        self._pending_touches.clear()
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        r"""Stores a response, evicting the least recently used responses if
+        the cache grows beyond its size limit.
+
+        Args:
+            key (str): The key computed by :meth:`make_key`.
+            value (Dict[str, Any]): A JSON-serializable response.
+        """
+        data = json.dumps(value).encode("utf-8")
+        with self._lock:
+            self._pending_touches.pop(key, None)
+            # Written first, so that evictions follow the actual use
+            self._write_touches()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time()),
+                )
+                total_size = self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()[0]
+                if total_size <= self.max_size_bytes:
+                    return
+                # Only the least recently used rows needed to get under the
+                # limit are read, following the index on the access time
+                evict_keys = []
+                cursor = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access"
+                )
+                for evict_key, size in cursor:
+                    if total_size <= self.max_size_bytes:
+                        break
+                    total_size -= size
+                    evict_keys.append((evict_key,))
+                cursor.close()
+                self._conn.executemany(
+                    "DELETE FROM responses WHERE key = ?", evict_keys
+                )
+                self.evictions += len(evict_keys)
+
+    def clear(self) -> None:
+        r"""Removes all responses from the cache and resets the statistics."""
+        with self._lock, self._conn:
+            self._pending_touches.clear()
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        r"""Returns the statistics of the cache.
+
+        Returns:
+            Dict[str, int]: The number of hits, misses and evictions, and the
+                number and total size in bytes of the stored responses.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+def _restore_completion(data: Dict[str, Any]) -> ChatCompletion:
+    try:
+        return ChatCompletion.model_validate(data)
+    except ValidationError:
+        # Some backends build their responses without validation
+        return ChatCompletion.construct(**data)
+
+
+class CachedModelBackend(BaseModelBackend):
+    r"""A model backend wrapper that serves repeated requests from a
+    :obj:`ResponseCache`. Requests are identified by the model type, the
+    model config and the messages. Both complete responses and streams are
+    cached. Streams are stored once they are fully consumed, and replayed
+    chunk by chunk.
+
+    Args:
+        backend (BaseModelBackend): The model backend to wrap.
+        cache (ResponseCache): The cache to store the responses in.
+    """
+
+    def __init__(
+        self, backend: BaseModelBackend, cache: ResponseCache
+    ) -> None:
+        self.backend = backend
+        self.cache = cache
+        super().__init__(backend.model_type, backend.model_config_dict)
+
+    @property
+    def token_counter(self) -> BaseTokenCounter:
+        return self.backend.token_counter
+
+    @property
+    def token_limit(self) -> int:
+        return self.backend.token_limit
+
+    @property
+    def stream(self) -> bool:
+        return self.backend.stream
+
+    def check_model_config(self):
+        r"""The config has already been checked by the wrapped backend."""
+        pass
+
+    def _make_key(self, messages: List[OpenAIMessage]) -> str:
+        return self.cache.make_key(
+            self.model_type, self.backend.model_config_dict, messages
+        )
+
+    def _replay(
+        self, cached: Dict[str, Any]
+    ) -> Union[ChatCompletion, List[ChatCompletionChunk]]:
+        if cached["type"] == "completion":
+            return _restore_completion(cached["data"])
+        return [
+            ChatCompletionChunk.model_validate(chunk)
+            for chunk in cached["data"]
+        ]
+
+    def run(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, Iterator[ChatCompletionChunk]]:
+        r"""Returns the cached response for the messages, or runs the wrapped
+        backend and caches its response.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, Iterator[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or an iterator of
+                `ChatCompletionChunk` in the stream mode.
+        """
+        # The key is computed first, as some backends modify the messages
+        key = self._make_key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            replayed = self._replay(cached)
+            if isinstance(replayed, ChatCompletion):
+                return replayed
+            return iter(replayed)
+
+        response = self.backend.run(messages)
+        if isinstance(response, ChatCompletion):
+            self.cache.set(
+                key, {"type": "completion", "data": response.model_dump()}
+            )
+            return response
+        return self._record_stream(key, response)
+
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, AsyncIterator[ChatCompletionChunk]]:
+        r"""Asynchronous version of :meth:`run`.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, AsyncIterator[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or an async iterator
+                of `ChatCompletionChunk` in the stream mode.
+        """
+        key = self._make_key(messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            replayed = self._replay(cached)
+            if isinstance(replayed, ChatCompletion):
+                return replayed
+            return self._replay_stream_async(replayed)
+
+        response = await self.backend.arun(messages)
+        if isinstance(response, ChatCompletion):
+            self.cache.set(
+                key, {"type": "completion", "data": response.model_dump()}
+            )
+            return response
+        return self._record_stream_async(key, response)
+
+    def _record_stream(
+        self, key: str, stream: Iterator[ChatCompletionChunk]
+    ) -> Iterator[ChatCompletionChunk]:
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        self.cache.set(key, {"type": "stream", "data": chunks})
+
+    async def _record_stream_async(
+        self, key: str, stream: AsyncIterator[ChatCompletionChunk]
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        self.cache.set(key, {"type": "stream", "data": chunks})
+
+    async def _replay_stream_async(
+        self, chunks: List[ChatCompletionChunk]
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        for chunk in chunks:
+            yield chunk
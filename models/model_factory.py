@@ -15,8 +15,13 @@ from typing import Any, Dict, Optional
 
 from camel.models.anthropic_model import AnthropicModel
 from camel.models.base_model import BaseModelBackend
+from camel.models.cached_model import CachedModelBackend, ResponseCache
 from camel.models.open_source_model import OpenSourceModel
 from camel.models.openai_model import OpenAIModel
+from camel.models.rate_limited_model import (
+    RateLimitedModelBackend,
+    RateLimiter,
+)
 from camel.models.stub_model import StubModel
 from camel.types import ModelType
 
@@ -33,6 +38,8 @@ class ModelFactory:
         model_type: ModelType,
         model_config_dict: Dict,
         api_key: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> BaseModelBackend:
         r"""Creates an instance of `BaseModelBackend` of the specified type.
 
@@ -42,6 +49,13 @@ class ModelFactory:
                 the backend constructor.
             api_key (Optional[str]): The API key for authenticating with the
                 LLM service.
+            response_cache (Optional[ResponseCache]): If provided, the
+                backend is wrapped in a :obj:`CachedModelBackend` serving
+                repeated requests from this cache. (default: :obj:`None`)
+            rate_limiter (Optional[RateLimiter]): If provided, the backend is
+                wrapped in a :obj:`RateLimitedModelBackend` admitting every
+                request through this rate limiter. Cache hits are not
+                rate limited. (default: :obj:`None`)
 
         Raises:
             ValueError: If there is not backend for the model.
@@ -62,4 +76,8 @@ class ModelFactory:
             raise ValueError(f"Unknown model type `{model_type}` is input")
 
         inst = model_class(model_type, model_config_dict, api_key)
+        if rate_limiter is not None:
+            inst = RateLimitedModelBackend(inst, rate_limiter)
+        if response_cache is not None:
+            inst = CachedModelBackend(inst, response_cache)
         return inst
@@ -13,13 +13,17 @@
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 from typing import Any, Dict, List, Optional, Union
 
-from openai import OpenAI, Stream
+from openai import AsyncStream, Stream
 
 from camel.configs import OPENAI_API_PARAMS
 from camel.messages import OpenAIMessage
 from camel.models import BaseModelBackend
 from camel.types import ChatCompletion, ChatCompletionChunk, ModelType
-from camel.utils import BaseTokenCounter, OpenSourceTokenCounter
+from camel.utils import (
+    BaseTokenCounter,
+    OpenAIClientRegistry,
+    OpenSourceTokenCounter,
+)
 
 
 class OpenSourceModel(BaseModelBackend):
@@ -73,7 +77,7 @@ class OpenSourceModel(BaseModelBackend):
                 "URL to server running open-source LLM is not provided."
             )
         self.server_url: str = server_url
-        self._client = OpenAI(
+        self._client = OpenAIClientRegistry.default().get_client(
             base_url=self.server_url,
             timeout=60,
             max_retries=3,
@@ -121,6 +125,35 @@ class OpenSourceModel(BaseModelBackend):
         )
         return response
 
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+        r"""Runs inference of OpenAI-API-style chat completion
+        asynchronously.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or
+                `AsyncStream[ChatCompletionChunk]` in the stream mode.
+        """
+        async_client = OpenAIClientRegistry.default().get_async_client(
+            base_url=self.server_url,
+            timeout=60,
+            max_retries=3,
+            api_key="fake_key",
+        )
+        response = await async_client.chat.completions.create(
+            messages=messages,
+            model=self.model_name,
+            **self.model_config_dict,
+        )
+        return response
+
     def check_model_config(self):
         r"""Check whether the model configuration is valid for open-source
         model backends.
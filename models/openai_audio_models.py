@@ -14,9 +14,10 @@
 import os
 from typing import Any, List, Optional, Union
 
-from openai import OpenAI, _legacy_response
+from openai import _legacy_response
 
 from camel.types import AudioModelType, VoiceType
+from camel.utils import OpenAIClientRegistry
 
 
 class OpenAIAudioModels:
@@ -28,7 +29,9 @@ class OpenAIAudioModels:
     ) -> None:
         r"""Initialize an instance of OpenAI."""
         url = os.environ.get('OPENAI_API_BASE_URL')
-        self._client = OpenAI(timeout=120, max_retries=3, base_url=url)
+        self._client = OpenAIClientRegistry.default().get_client(
+            timeout=120, max_retries=3, base_url=url
+        )
 
     def text_to_speech(
         self,
@@ -14,7 +14,7 @@
 import os
 from typing import Any, Dict, List, Optional, Union
 
-from openai import OpenAI, Stream
+from openai import AsyncStream, Stream
 
 from camel.configs import OPENAI_API_PARAMS
 from camel.messages import OpenAIMessage
@@ -22,6 +22,7 @@ from camel.models import BaseModelBackend
 from camel.types import ChatCompletion, ChatCompletionChunk, ModelType
 from camel.utils import (
     BaseTokenCounter,
+    OpenAIClientRegistry,
     OpenAITokenCounter,
     model_api_key_required,
 )
@@ -47,10 +48,13 @@ class OpenAIModel(BaseModelBackend):
                 OpenAI service. (default: :obj:`None`)
         """
         super().__init__(model_type, model_config_dict)
-        url = os.environ.get('OPENAI_API_BASE_URL', None)
+        self._url = os.environ.get('OPENAI_API_BASE_URL', None)
         self._api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        self._client = OpenAI(
-            timeout=60, max_retries=3, base_url=url, api_key=self._api_key
+        self._client = OpenAIClientRegistry.default().get_client(
+            timeout=60,
+            max_retries=3,
+            base_url=self._url,
+            api_key=self._api_key,
         )
         self._token_counter: Optional[BaseTokenCounter] = None
 
@@ -89,6 +93,35 @@ class OpenAIModel(BaseModelBackend):
         )
         return response
 
+    @model_api_key_required
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+        r"""Runs inference of OpenAI chat completion asynchronously.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or
+                `AsyncStream[ChatCompletionChunk]` in the stream mode.
+        """
+        async_client = OpenAIClientRegistry.default().get_async_client(
+            timeout=60,
+            max_retries=3,
+            base_url=self._url,
+            api_key=self._api_key,
+        )
+        response = await async_client.chat.completions.create(
+            messages=messages,
+            model=self.model_type.value,
+            **self.model_config_dict,
+        )
+        return response
+
     def check_model_config(self):
         r"""Check whether the model configuration contains any
         unexpected arguments to OpenAI API.
@@ -0,0 +1,361 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Union
+
+from openai import AsyncStream, Stream
+
+from camel.messages import OpenAIMessage
+from camel.models.base_model import (
+    BaseModelBackend,
+    get_prompt_tokens_hint,
+)
+from camel.types import ChatCompletion, ChatCompletionChunk
+from camel.utils import BaseTokenCounter, time_phase
+
+
+class RateLimiter:
+    r"""A client-side rate limiter shared by several model backends. Two
+    token buckets track the requests per minute and the tokens per minute.
+    A request is admitted once both buckets hold enough capacity for it.
+
+    Waiting requests are queued per key, typically one key per agent, and
+    the keys are served in round-robin order. One agent sending many
+    requests therefore cannot starve the others, and a large request is not
+    overtaken indefinitely by small ones.
+
+    Args:
+        requests_per_minute (float, optional): The maximum number of requests
+            per minute. If `None`, requests are not limited.
+            (default: :obj:`None`)
+        tokens_per_minute (float, optional): The maximum number of tokens per
+            minute. If `None`, tokens are not limited. (default: :obj:`None`)
+        poll_interval (float, optional): The maximum number of seconds an
+            asynchronous waiter sleeps before checking again whether it can
+            be admitted. (default: :obj:`0.05`)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        poll_interval: float = 0.05,
+    ) -> None:
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError("`requests_per_minute` must be positive.")
+        if tokens_per_minute is not None and tokens_per_minute <= 0:
+            raise ValueError("`tokens_per_minute` must be positive.")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.poll_interval = poll_interval
+        # Both buckets start full
+        self._available_requests = requests_per_minute or 0.0
+        self._available_tokens = tokens_per_minute or 0.0
+        self._last_refill = time.monotonic()
+        self._queues: OrderedDict[Hashable, Deque[object]] = OrderedDict()
+        self._cond = threading.Condition()
+        self._num_admitted = 0
+        self._total_wait_time = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_minute is not None:
+            self._available_requests = min(
+                self.requests_per_minute,
+                self._available_requests
+                + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute is not None:
+            self._available_tokens = min(
+                self.tokens_per_minute,
+                self._available_tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    def _get_delay(self, num_tokens: int) -> float:
+        r"""Returns the number of seconds until both buckets hold enough
+        capacity for a request, or `0` if they already do."""
+        delay = 0.0
+        if self.requests_per_minute is not None:
+            missing = 1 - self._available_requests
+            delay = max(delay, missing * 60 / self.requests_per_minute)
+        if self.tokens_per_minute is not None:
+            # A request larger than the bucket is admitted when it is full
+            missing = (
+                min(num_tokens, self.tokens_per_minute)
+                - self._available_tokens
+            )
+            delay = max(delay, missing * 60 / self.tokens_per_minute)
+        return delay
+
+    def _enqueue(self, key: Hashable, ticket: object) -> None:
+        self._queues.setdefault(key, deque()).append(ticket)
+
+    def _dequeue(self, key: Hashable, ticket: object) -> None:
+        queue = self._queues.get(key)
+        if queue is None or ticket not in queue:
+            return
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[key]
+
+    def _try_acquire(
+        self, key: Hashable, ticket: object, num_tokens: int
+    ) -> Optional[float]:
+        r"""Admits the request if it is at the head of the queue and the
+        buckets have enough capacity. Must be called with the lock held.
+
+        Returns:
+            Optional[float]: `None` if the request is admitted, `-1` if it
+                is not at the head of the queue, otherwise the number of
+                seconds until the buckets hold enough capacity for it.
+        """
+        head_key = next(iter(self._queues))
+        if head_key != key or self._queues[key][0] is not ticket:
+            return -1.0
+        self._refill()
+        delay = self._get_delay(num_tokens)
+        if delay > 0:
+            return delay
+        if self.requests_per_minute is not None:
+            self._available_requests -= 1
+        if self.tokens_per_minute is not None:
+            self._available_tokens -= num_tokens
+        # Serve the next key, moving this one to the end of the round
+        queue = self._queues.pop(key)
+        queue.popleft()
+        if queue:
+            self._queues[key] = queue
+        self._num_admitted += 1
+        self._cond.notify_all()
+        return None
+
+    def acquire(self, num_tokens: int = 0, key: Hashable = None) -> float:
+        r"""Blocks until a request with the given number of tokens is
+        admitted.
+
+        Args:
+            num_tokens (int, optional): The number of tokens of the request.
+                (default: :obj:`0`)
+            key (Hashable, optional): The queue of the request, e.g. one per
+                agent. (default: :obj:`None`)
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        start = time.monotonic()
+        ticket = object()
+        with self._cond:
+            self._enqueue(key, ticket)
+            try:
+                while True:
+                    delay = self._try_acquire(key, ticket, num_tokens)
+                    if delay is None:
+                        break
+                    self._cond.wait(timeout=delay if delay > 0 else None)
+            except BaseException:
+                self._dequeue(key, ticket)
+                self._cond.notify_all()
+                raise
+            waited = time.monotonic() - start
+            self._total_wait_time += waited
+        return waited
+
+    async def acquire_async(
+        self, num_tokens: int = 0, key: Hashable = None
+    ) -> float:
+        r"""Waits without blocking the event loop until a request with the
+        given number of tokens is admitted.
+
+        Args:
+            num_tokens (int, optional): The number of tokens of the request.
+                (default: :obj:`0`)
+            key (Hashable, optional): The queue of the request, e.g. one per
+                agent. (default: :obj:`None`)
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        start = time.monotonic()
+        ticket = object()
+        with self._cond:
+            self._enqueue(key, ticket)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_acquire(key, ticket, num_tokens)
+                if delay is None:
+                    break
+                if delay < 0:
+                    delay = self.poll_interval
+                await asyncio.sleep(min(delay, self.poll_interval))
+        except BaseException:
+            with self._cond:
+                self._dequeue(key, ticket)
+                self._cond.notify_all()
+            raise
+        waited = time.monotonic() - start
+        with self._cond:
+            self._total_wait_time += waited
+        return waited
+
+    def consume_tokens(self, num_tokens: int) -> None:
+        r"""Charges additional tokens to the bucket after a request has been
+        admitted, e.g. the completion tokens reported in the response. The
+        bucket may become negative, which delays the following requests.
+
+        Args:
+            num_tokens (int): The number of tokens to charge.
+        """
+        if self.tokens_per_minute is None or num_tokens <= 0:
+            return
+        with self._cond:
+            self._refill()
+            self._available_tokens -= num_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        r"""Returns the statistics of the rate limiter.
+
+        Returns:
+            Dict[str, Any]: The number of admitted and waiting requests, the
+                total time spent waiting, and the currently available
+                requests and tokens.
+        """
+        with self._cond:
+            self._refill()
+            return {
+                "admitted": self._num_admitted,
+                "waiting": sum(len(q) for q in self._queues.values()),
+                "total_wait_time": self._total_wait_time,
+                "available_requests": (
+                    self._available_requests
+                    if self.requests_per_minute is not None
+                    else None
+                ),
+                "available_tokens": (
+                    self._available_tokens
+                    if self.tokens_per_minute is not None
+                    else None
+                ),
+            }
+
+
+class RateLimitedModelBackend(BaseModelBackend):
+    r"""A model backend wrapper that admits every request through a shared
+    :obj:`RateLimiter` before sending it. The prompt tokens are taken from
+    :func:`prompt_tokens_hint`, as given by :obj:`ChatAgent`, or counted
+    with the token counter of the wrapped backend otherwise, and
+    :obj:`max_tokens` of the model config is added if it is set. Completion
+    tokens beyond that are charged once the response reports its usage.
+
+    Args:
+        backend (BaseModelBackend): The model backend to wrap.
+        rate_limiter (RateLimiter): The rate limiter shared with other
+            backends.
+    """
+
+    def __init__(
+        self, backend: BaseModelBackend, rate_limiter: RateLimiter
+    ) -> None:
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        super().__init__(backend.model_type, backend.model_config_dict)
+
+    @property
+    def token_counter(self) -> BaseTokenCounter:
+        return self.backend.token_counter
+
+    @property
+    def token_limit(self) -> int:
+        return self.backend.token_limit
+
+    @property
+    def stream(self) -> bool:
+        return self.backend.stream
+
+    def check_model_config(self):
+        r"""The config has already been checked by the wrapped backend."""
+        pass
+
+    def _get_num_tokens(self, messages: List[OpenAIMessage]) -> int:
+        num_tokens = 0
+        if self.rate_limiter.tokens_per_minute is not None:
+            # Reuse the count of the caller, e.g. the context size computed
+            # by the memory of the agent
+            hint = get_prompt_tokens_hint(messages)
+            num_tokens = (
+                hint
+                if hint is not None
+                else self.token_counter.count_tokens_from_messages(messages)
+            )
+            max_tokens = self.backend.model_config_dict.get("max_tokens")
+            if isinstance(max_tokens, int):
+                num_tokens += max_tokens
+        return num_tokens
+
+    def _charge_usage(self, response: Any, num_tokens: int) -> None:
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int):
+            self.rate_limiter.consume_tokens(total_tokens - num_tokens)
+
+    def run(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, Stream[ChatCompletionChunk]]:
+        r"""Waits until the request is admitted by the rate limiter, then
+        runs the wrapped backend.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, Stream[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or
+                `Stream[ChatCompletionChunk]` in the stream mode.
+        """
+        num_tokens = self._get_num_tokens(messages)
+        with time_phase("rate_limit_wait"):
+            self.rate_limiter.acquire(num_tokens, key=id(self))
+        response = self.backend.run(messages)
+        self._charge_usage(response, num_tokens)
+        return response
+
+    async def arun(
+        self,
+        messages: List[OpenAIMessage],
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+        r"""Waits without blocking the event loop until the request is
+        admitted by the rate limiter, then runs the wrapped backend.
+
+        Args:
+            messages (List[OpenAIMessage]): Message list with the chat history
+                in OpenAI API format.
+
+        Returns:
+            Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+                `ChatCompletion` in the non-stream mode, or
+                `AsyncStream[ChatCompletionChunk]` in the stream mode.
+        """
+        num_tokens = self._get_num_tokens(messages)
+        with time_phase("rate_limit_wait"):
+            await self.rate_limiter.acquire_async(num_tokens, key=id(self))
+        response = await self.backend.arun(messages)
+        self._charge_usage(response, num_tokens)
+        return response
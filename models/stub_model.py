@@ -14,7 +14,7 @@
 import time
 from typing import Any, Dict, List, Optional, Union
 
-from openai import Stream
+from openai import AsyncStream, Stream
 
 from camel.messages import OpenAIMessage
 from camel.models import BaseModelBackend
@@ -106,6 +106,17 @@ class StubModel(BaseModelBackend):
         )
         return response
 
+    async def arun(
+        self, messages: List[OpenAIMessage]
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk]]:
+        r"""Run fake asynchronous inference by returning a fixed string.
+        All arguments are unused for the dummy model.
+
+        Returns:
+            Dict[str, Any]: Response in the OpenAI API format.
+        """
+        return self.run(messages)
+
     def check_model_config(self):
         r"""Directly pass the check on arguments to STUB model."""
         pass
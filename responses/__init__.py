@@ -11,8 +11,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
-from .agent_responses import ChatAgentResponse
+from .agent_responses import (
+    AsyncChatAgentStream,
+    ChatAgentResponse,
+    ChatAgentStream,
+)
 
 __all__ = [
     'ChatAgentResponse',
+    'ChatAgentStream',
+    'AsyncChatAgentStream',
 ]
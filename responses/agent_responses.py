@@ -12,7 +12,15 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 
 from camel.messages import BaseMessage
 
@@ -43,3 +51,74 @@ class ChatAgentResponse:
                 "for a single message in msgs."
             )
         return self.msgs[0]
+
+
+class ChatAgentStream:
+    r"""Iterator over the content deltas of a streamed :obj:`ChatAgent` step.
+
+    Deltas are yielded as strings as soon as they arrive from the model. Once
+    the iteration is finished, the complete :obj:`ChatAgentResponse` of the
+    step is available as :obj:`response`.
+
+    Args:
+        generator (Iterator[Union[str, ChatAgentResponse]]): A generator
+            yielding the content deltas followed by the final response.
+    """
+
+    def __init__(
+        self, generator: Iterator[Union[str, ChatAgentResponse]]
+    ) -> None:
+        self._generator = generator
+        self._response: Optional[ChatAgentResponse] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for item in self._generator:
+            if isinstance(item, ChatAgentResponse):
+                self._response = item
+            else:
+                yield item
+
+    @property
+    def response(self) -> ChatAgentResponse:
+        r"""The final response of the step.
+
+        Raises:
+            RuntimeError: If the stream has not been consumed yet.
+        """
+        if self._response is None:
+            raise RuntimeError("The stream has not been consumed yet.")
+        return self._response
+
+
+class AsyncChatAgentStream:
+    r"""Asynchronous counterpart of :obj:`ChatAgentStream`.
+
+    Args:
+        generator (AsyncIterator[Union[str, ChatAgentResponse]]): An async
+            generator yielding the content deltas followed by the final
+            response.
+    """
+
+    def __init__(
+        self, generator: AsyncIterator[Union[str, ChatAgentResponse]]
+    ) -> None:
+        self._generator = generator
+        self._response: Optional[ChatAgentResponse] = None
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        async for item in self._generator:
+            if isinstance(item, ChatAgentResponse):
+                self._response = item
+            else:
+                yield item
+
+    @property
+    def response(self) -> ChatAgentResponse:
+        r"""The final response of the step.
+
+        Raises:
+            RuntimeError: If the stream has not been consumed yet.
+        """
+        if self._response is None:
+            raise RuntimeError("The stream has not been consumed yet.")
+        return self._response
@@ -14,9 +14,12 @@
 
 from .graph_storages.base import BaseGraphStorage
 from .graph_storages.neo4j_graph import Neo4jGraph
+from .key_value_storages.append_only import AppendOnlyStorage
 from .key_value_storages.base import BaseKeyValueStorage
 from .key_value_storages.in_memory import InMemoryKeyValueStorage
 from .key_value_storages.json import JsonStorage
+from .key_value_storages.serialization import RecordSerializer
+from .key_value_storages.sqlite import SQLiteKeyValueStorage
 from .vectordb_storages.base import (
     BaseVectorStorage,
     VectorDBQuery,
@@ -30,6 +33,9 @@ __all__ = [
     'BaseKeyValueStorage',
     'InMemoryKeyValueStorage',
     'JsonStorage',
+    'AppendOnlyStorage',
+    'RecordSerializer',
+    'SQLiteKeyValueStorage',
     'VectorRecord',
     'BaseVectorStorage',
     'VectorDBQuery',
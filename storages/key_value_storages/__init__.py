@@ -12,12 +12,18 @@
 # limitations under the License.
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
+from .append_only import AppendOnlyStorage
 from .base import BaseKeyValueStorage
 from .in_memory import InMemoryKeyValueStorage
 from .json import JsonStorage
+from .serialization import RecordSerializer
+from .sqlite import SQLiteKeyValueStorage
 
 __all__ = [
     'BaseKeyValueStorage',
     'InMemoryKeyValueStorage',
     'JsonStorage',
+    'AppendOnlyStorage',
+    'RecordSerializer',
+    'SQLiteKeyValueStorage',
 ]
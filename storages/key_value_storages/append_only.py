@@ -0,0 +1,253 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import os
+import struct
+import warnings
+from pathlib import Path
+from typing import IO, Any, ClassVar, Dict, List, Optional, Tuple
+
+from camel.storages.key_value_storages.base import BaseKeyValueStorage
+from camel.storages.key_value_storages.serialization import RecordSerializer
+
+
+class AppendOnlyStorage(BaseKeyValueStorage):
+    r"""A :obj:`BaseKeyValueStorage` appending records in a compact binary
+    format to a file, for persistent storage that is faster to write and read
+    than :obj:`JsonStorage`.
+
+    The file starts with a header holding a magic number, the version of the
+    file format and the format of the records, followed by the records
+    encoded by a :obj:`RecordSerializer`, each prefixed with its length.
+    Binary payloads of the records, such as images and videos, are stored
+    out of line in a second file with the suffix `.blobs`. The offset of
+    every record is indexed lazily, so that :meth:`load_range` and
+    :meth:`load_tail` only read and decode the requested records. A record
+    cut off at the end of the file, e.g. by a crash while appending, is
+    ignored when reading, and removed when the file is opened.
+
+    Args:
+        path (Path, optional): Path to the file. If `None`, a default path
+            `./chat_history.bin` will be used. (default: :obj:`None`)
+        format (str, optional): The format of the records of a new file,
+            either `"json"` or `"msgpack"`. If `None`, the fastest available
+            one is chosen. The format of an existing file is read from its
+            header. (default: :obj:`None`)
+
+    Raises:
+        ValueError: If the file is not a storage file of a supported version.
+    """
+
+    MAGIC: ClassVar[bytes] = b"CAMELKV\x00"
+    VERSION: ClassVar[int] = 1
+    _FORMAT_CODES: ClassVar[Dict[str, int]] = {"json": 0, "msgpack": 1}
+    # Magic number, version, format code and reserved bytes
+    _HEADER: ClassVar[struct.Struct] = struct.Struct("<8sHB5x")
+    _LENGTH: ClassVar[struct.Struct] = struct.Struct("<I")
+
+    def __init__(
+        self, path: Optional[Path] = None, format: Optional[str] = None
+    ) -> None:
+        self.path = path or Path("./chat_history.bin")
+        self.blob_path = self.path.with_name(self.path.name + ".blobs")
+        self.path.touch()
+        self.blob_path.touch()
+        with self.path.open("rb") as f:
+            header = f.read(self._HEADER.size)
+        # Offsets of the records and the file size they were computed for.
+        # The index is rebuilt if the file changes size behind our back.
+        self._offsets: Optional[List[int]] = None
+        self._indexed_size = 0
+        if header:
+            self.serializer = RecordSerializer(self._read_header(header))
+            self._truncate_partial_frame()
+        else:
+            self.serializer = RecordSerializer(format)
+            self._write_header()
+
+    def _read_header(self, header: bytes) -> str:
+        if len(header) < self._HEADER.size:
+            raise ValueError(f"Truncated storage file header: {self.path}.")
+        magic, version, format_code = self._HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a storage file: {self.path}.")
+        if version != self.VERSION:
+            raise ValueError(
+                f"Unsupported storage file version {version}: {self.path}."
+            )
+        for name, code in self._FORMAT_CODES.items():
+            if code == format_code:
+                return name
+        raise ValueError(f"Unknown record format {format_code}: {self.path}.")
+
+    def _truncate_partial_frame(self) -> None:
+        r"""Removes a truncated record at the end of the file, left by a
+        crash while appending, so that new records are appended after the
+        last complete one."""
+        self._get_offsets()
+        if self.path.stat().st_size > self._indexed_size:
+            warnings.warn(
+                f"Removing a truncated record at the end of {self.path}."
+            )
+            os.truncate(self.path, self._indexed_size)
+
+    def _write_header(self) -> None:
+        with self.path.open("wb") as f:
+            f.write(
+                self._HEADER.pack(
+                    self.MAGIC,
+                    self.VERSION,
+                    self._FORMAT_CODES[self.serializer.format],
+                )
+            )
+
+    def _is_index_valid(self) -> bool:
+        return (
+            self._offsets is not None
+            and self.path.stat().st_size == self._indexed_size
+        )
+
+    def _get_offsets(self) -> List[int]:
+        r"""Returns the offsets of all records, building the index by hopping
+        over the length prefixes if it is missing or stale."""
+        if self._offsets is None or not self._is_index_valid():
+            offsets = []
+            size = self.path.stat().st_size
+            pos = self._HEADER.size
+            with self.path.open("rb") as f:
+                f.seek(pos)
+                while pos + self._LENGTH.size <= size:
+                    (length,) = self._LENGTH.unpack(f.read(self._LENGTH.size))
+                    if pos + self._LENGTH.size + length > size:
+                        # A frame still being written, or cut off by a crash
+                        break
+                    offsets.append(pos)
+                    pos += self._LENGTH.size + length
+                    f.seek(pos)
+            self._offsets = offsets
+            self._indexed_size = pos
+        return self._offsets
+
+    def _decode_frames(
+        self, data: bytes, blob_file: IO[bytes]
+    ) -> List[Dict[str, Any]]:
+        def load_blob(offset: int, length: int) -> bytes:
+            blob_file.seek(offset)
+            return blob_file.read(length)
+
+        payloads = []
+        pos = 0
+        while pos < len(data):
+            (length,) = self._LENGTH.unpack_from(data, pos)
+            pos += self._LENGTH.size
+            payloads.append(data[pos : pos + length])
+            pos += length
+        return self.serializer.decode_batch(payloads, load_blob)
+
+    def _read(self, start: int, end: int) -> List[Dict[str, Any]]:
+        r"""Decodes the records stored between two byte offsets."""
+        with self.path.open("rb") as f, self.blob_path.open("rb") as blobs:
+            f.seek(start)
+            data = f.read(end - start)
+            return self._decode_frames(data, blobs)
+
+    def save(self, records: List[Dict[str, Any]]) -> None:
+        r"""Saves a batch of records to the key-value storage system.
+
+        Args:
+            records (List[Dict[str, Any]]): A list of dictionaries, where each
+                dictionary represents a unique record to be stored.
+        """
+        blob_chunks: List[bytes] = []
+        blob_end = self.blob_path.stat().st_size
+
+        def store_blob(blob: bytes) -> Tuple[int, int]:
+            nonlocal blob_end
+            blob_chunks.append(blob)
+            offset = blob_end
+            blob_end += len(blob)
+            return offset, len(blob)
+
+        frames = []
+        for record in records:
+            payload = self.serializer.encode(record, store_blob)
+            frames.append(self._LENGTH.pack(len(payload)) + payload)
+        # Write the blobs first, so that stored records never reference
+        # missing blobs
+        if blob_chunks:
+            with self.blob_path.open("ab") as f:
+                f.writelines(blob_chunks)
+        update_index = self._is_index_valid()
+        with self.path.open("ab") as f:
+            f.writelines(frames)
+        if update_index and self._offsets is not None:
+            for frame in frames:
+                self._offsets.append(self._indexed_size)
+                self._indexed_size += len(frame)
+
+    def load(self) -> List[Dict[str, Any]]:
+        r"""Loads all stored records from the key-value storage system.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        # Only read complete records
+        self._get_offsets()
+        return self._read(self._HEADER.size, self._indexed_size)
+
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics. Only the
+        bytes of the requested records are read from the file.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        offsets = self._get_offsets()
+        start, stop, _ = slice(start, stop).indices(len(offsets))
+        if start >= stop:
+            return []
+        end = offsets[stop] if stop < len(offsets) else self._indexed_size
+        return self._read(offsets[start], end)
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        return self.load_range(-n)
+
+    def clear(self) -> None:
+        r"""Removes all records from the key-value storage system."""
+        self._write_header()
+        with self.blob_path.open("wb"):
+            pass
+        self._offsets = []
+        self._indexed_size = self._HEADER.size
@@ -13,7 +13,7 @@
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 
 class BaseKeyValueStorage(ABC):
@@ -50,6 +50,42 @@ class BaseKeyValueStorage(ABC):
         """
         pass
 
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics. Subclasses
+        should override this method if they can read a range of records
+        without loading all of them.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        return self.load()[start:stop]
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records. Subclasses should override
+        this method if they can read the most recent records without loading
+        all of them.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        return self.load()[-n:]
+
     @abstractmethod
     def clear(self) -> None:
         r"""Removes all records from the key-value storage system."""
@@ -13,19 +13,90 @@
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
 from copy import deepcopy
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from camel.storages.key_value_storages import BaseKeyValueStorage
 
 
+def _readonly(self, *args: Any, **kwargs: Any) -> Any:
+    raise TypeError("Records in a frozen storage are read-only.")
+
+
+class _FrozenDict(dict):
+    r"""A read-only :obj:`dict`. Its :meth:`copy` returns a regular mutable
+    :obj:`dict`, so a caller that needs to modify a record only pays for a
+    shallow copy of it.
+    """
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self) -> Dict[str, Any]:  # type: ignore[override]
+        return dict(self)
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return deepcopy(dict(self), memo)
+
+    def __reduce__(self) -> Any:
+        return (dict, (dict(self),))
+
+
+class _FrozenList(list):
+    r"""A read-only :obj:`list`, the counterpart of :obj:`_FrozenDict`."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = _readonly
+    sort = reverse = _readonly
+
+    def copy(self) -> List[Any]:  # type: ignore[override]
+        return list(self)
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> List[Any]:
+        return deepcopy(list(self), memo)
+
+    def __reduce__(self) -> Any:
+        return (list, (list(self),))
+
+
+def _freeze(value: Any) -> Any:
+    r"""Recursively converts dicts and lists into their read-only
+    counterparts. Other values are kept as they are, without being copied."""
+    if isinstance(value, dict):
+        return _FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    return value
+
+
 class InMemoryKeyValueStorage(BaseKeyValueStorage):
     r"""A concrete implementation of the :obj:`BaseKeyValueStorage` using
     in-memory list. Ideal for temporary storage purposes, as data will be lost
     when the program ends.
+
+    By default, records are deep-copied when they are saved and again when
+    they are loaded. In frozen mode, records are converted once into read-only
+    containers when they are saved, and loading returns the stored records
+    themselves without any copy. Leaf objects such as images or bytes are
+    shared with the caller and must not be modified after saving.
+
+    Args:
+        frozen (bool, optional): Whether to store records as read-only
+            containers shared between loads instead of copying them.
+            (default: :obj:`False`)
     """
 
-    def __init__(self) -> None:
+    def __init__(self, frozen: bool = False) -> None:
         self.memory_list: List[Dict] = []
+        self.frozen = frozen
+
+    def _copy(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(records) if self.frozen else deepcopy(records)
 
     def save(self, records: List[Dict[str, Any]]) -> None:
         r"""Saves a batch of records to the key-value storage system.
@@ -34,7 +105,10 @@ class InMemoryKeyValueStorage(BaseKeyValueStorage):
             records (List[Dict[str, Any]]): A list of dictionaries, where each
                 dictionary represents a unique record to be stored.
         """
-        self.memory_list.extend(deepcopy(records))
+        if self.frozen:
+            self.memory_list.extend(_freeze(record) for record in records)
+        else:
+            self.memory_list.extend(deepcopy(records))
 
     def load(self) -> List[Dict[str, Any]]:
         r"""Loads all stored records from the key-value storage system.
@@ -43,7 +117,39 @@ class InMemoryKeyValueStorage(BaseKeyValueStorage):
             List[Dict[str, Any]]: A list of dictionaries, where each dictionary
                 represents a stored record.
         """
-        return deepcopy(self.memory_list)
+        return self._copy(self.memory_list)
+
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        return self._copy(self.memory_list[start:stop])
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        return self._copy(self.memory_list[-n:])
 
     def clear(self) -> None:
         r"""Removes all records from the key-value storage system."""
@@ -13,6 +13,7 @@
 # =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
 
 import json
+import os
 from enum import EnumMeta
 from pathlib import Path
 from typing import Any, ClassVar, Dict, List, Optional
@@ -44,15 +45,26 @@ class JsonStorage(BaseKeyValueStorage):
     r"""A concrete implementation of the :obj:`BaseKeyValueStorage` using JSON
     files. Allows for persistent storage of records in a human-readable format.
 
+    Records are stored one per line. The byte offset of every line is indexed
+    lazily, so that :meth:`load_range` and :meth:`load_tail` only read and
+    parse the requested records instead of the whole file.
+
     Args:
         path (Path, optional): Path to the desired JSON file. If `None`, a
             default path `./chat_history.json` will be used.
             (default: :obj:`None`)
     """
 
+    _TAIL_BLOCK_SIZE: ClassVar[int] = 1 << 16
+
     def __init__(self, path: Optional[Path] = None) -> None:
         self.json_path = path or Path("./chat_history.json")
         self.json_path.touch()
+        # Byte offsets of the start of every line and the file size they were
+        # computed for. The index is rebuilt if the file changes size behind
+        # our back.
+        self._offsets: Optional[List[int]] = None
+        self._indexed_size: int = 0
 
     def _json_object_hook(self, d) -> Any:
         if "__enum__" in d:
@@ -61,6 +73,32 @@ class JsonStorage(BaseKeyValueStorage):
         else:
             return d
 
+    def _parse_lines(self, data: bytes) -> List[Dict[str, Any]]:
+        return [
+            json.loads(line, object_hook=self._json_object_hook)
+            for line in data.splitlines()
+        ]
+
+    def _is_index_valid(self) -> bool:
+        return (
+            self._offsets is not None
+            and self.json_path.stat().st_size == self._indexed_size
+        )
+
+    def _get_offsets(self) -> List[int]:
+        r"""Returns the byte offsets of all lines, building the index by a
+        single scan over the file if it is missing or stale."""
+        if self._offsets is None or not self._is_index_valid():
+            offsets = []
+            pos = 0
+            with self.json_path.open("rb") as f:
+                for line in f:
+                    offsets.append(pos)
+                    pos += len(line)
+            self._offsets = offsets
+            self._indexed_size = pos
+        return self._offsets
+
     def save(self, records: List[Dict[str, Any]]) -> None:
         r"""Saves a batch of records to the key-value storage system.
 
@@ -68,10 +106,17 @@ class JsonStorage(BaseKeyValueStorage):
             records (List[Dict[str, Any]]): A list of dictionaries, where each
                 dictionary represents a unique record to be stored.
         """
-        with self.json_path.open("a") as f:
-            f.writelines(
-                [json.dumps(r, cls=_CamelJSONEncoder) + "\n" for r in records]
-            )
+        lines = [
+            (json.dumps(r, cls=_CamelJSONEncoder) + "\n").encode("utf-8")
+            for r in records
+        ]
+        update_index = self._is_index_valid()
+        with self.json_path.open("ab") as f:
+            f.writelines(lines)
+        if update_index and self._offsets is not None:
+            for line in lines:
+                self._offsets.append(self._indexed_size)
+                self._indexed_size += len(line)
 
     def load(self) -> List[Dict[str, Any]]:
         r"""Loads all stored records from the key-value storage system.
@@ -86,7 +131,69 @@ class JsonStorage(BaseKeyValueStorage):
                 for r in f.readlines()
             ]
 
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics. Only the
+        bytes of the requested records are read from the file.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        offsets = self._get_offsets()
+        start, stop, _ = slice(start, stop).indices(len(offsets))
+        if start >= stop:
+            return []
+        end = offsets[stop] if stop < len(offsets) else self._indexed_size
+        with self.json_path.open("rb") as f:
+            f.seek(offsets[start])
+            data = f.read(end - offsets[start])
+        return self._parse_lines(data)
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records. If the line index has not
+        been built, the file is read backwards in blocks until enough lines
+        have been found.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        if self._is_index_valid():
+            return self.load_range(-n)
+
+        chunks: List[bytes] = []
+        num_newlines = 0
+        with self.json_path.open("rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            # One more newline than requested records guarantees that the
+            # first of them is complete
+            while pos > 0 and num_newlines <= n:
+                read_size = min(self._TAIL_BLOCK_SIZE, pos)
+                pos -= read_size
+                f.seek(pos)
+                chunk = f.read(read_size)
+                chunks.append(chunk)
+                num_newlines += chunk.count(b"\n")
+        data = b"".join(reversed(chunks))
+        return self._parse_lines(b"\n".join(data.splitlines()[-n:]))
+
     def clear(self) -> None:
         r"""Removes all records from the key-value storage system."""
         with self.json_path.open("w"):
             pass
+        self._offsets = []
+        self._indexed_size = 0
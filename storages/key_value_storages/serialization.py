@@ -0,0 +1,368 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import io
+import json
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from camel.types import ModelType, OpenAIBackendRole, RoleType, TaskType
+
+# Enums are encoded as the position of their class in this table and their
+# value. Changing the order of the table breaks stored data, so new classes
+# must be appended.
+_ENUM_CLASSES: Tuple[Any, ...] = (
+    RoleType,
+    TaskType,
+    ModelType,
+    OpenAIBackendRole,
+)
+_ENUM_CLASS_CODES: Dict[Any, int] = {
+    cls: code for code, cls in enumerate(_ENUM_CLASSES)
+}
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+_ROLE_TYPES: Dict[str, RoleType] = {role.value: role for role in RoleType}
+_BACKEND_ROLES: Dict[str, OpenAIBackendRole] = {
+    role.value: role for role in OpenAIBackendRole
+}
+
+# Fields of a message dict that are encoded positionally
+_MESSAGE_FIELDS = (
+    "role_name",
+    "role_type",
+    "meta_dict",
+    "content",
+    "video_bytes",
+    "image_list",
+    "image_detail",
+    "video_detail",
+)
+_RECORD_KEYS = frozenset(("uuid", "message", "role_at_backend", "extra_info"))
+
+# Tags of values that are not plain JSON in the generic encoding
+_ENUM_TAG = "__e"
+_BYTES_TAG = "__b"
+_IMAGE_TAG = "__i"
+
+StoreBlob = Callable[[bytes], Tuple[int, int]]
+LoadBlob = Callable[[int, int], bytes]
+
+
+class _Format:
+    r"""A binary encoding of JSON-like values."""
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+    ) -> None:
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+
+def _load_format(name: str) -> Optional[_Format]:
+    r"""Returns the named format, or `None` if its package is missing."""
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            return None
+        # orjson writes plain JSON, readable by the standard library
+        return _Format("json", orjson.dumps, orjson.loads)
+    if name == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            return None
+        return _Format(
+            "msgpack",
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False),
+        )
+    if name == "json":
+        return _Format(
+            "json",
+            lambda obj: json.dumps(obj, separators=(",", ":")).encode(),
+            json.loads,
+        )
+    raise ValueError(f"Unknown serialization format: {name}.")
+
+
+class RecordSerializer:
+    r"""Encodes the record dicts of key-value storages into compact bytes.
+
+    Dicts produced by :meth:`MemoryRecord.to_dict` are encoded as arrays of
+    their fields in a fixed order, without keys. Other dicts are encoded as
+    they are. Enums are encoded as compact tags, and binary payloads, i.e.
+    bytes and PIL images, are stored out of line through a callback and
+    replaced by a reference, so that the encoded records stay small.
+
+    The bytes are produced by `orjson` if it is installed, else by
+    `msgpack`, else by the standard :mod:`json` module. `orjson` and
+    :mod:`json` produce the same format, so data written by one can be read
+    by the other.
+
+    Args:
+        format (str, optional): The format of the encoded records, either
+            `"json"` or `"msgpack"`. If `None`, the fastest available one
+            is chosen. (default: :obj:`None`)
+
+    Raises:
+        ImportError: If `"msgpack"` is requested but not installed.
+    """
+
+    def __init__(self, format: Optional[str] = None) -> None:
+        # orjson is preferred since it encodes memory records about 1.7 times
+        # as fast as the json module and decodes them with `decode_batch` at
+        # the same rate, about 360k records/s for chat messages.
+        if format is None:
+            fmt = (
+                _load_format("orjson")
+                or _load_format("msgpack")
+                or _load_format("json")
+            )
+        elif format == "json":
+            fmt = _load_format("orjson") or _load_format("json")
+        elif format == "msgpack":
+            fmt = _load_format("msgpack")
+            if fmt is None:
+                raise ImportError(
+                    "The `msgpack` format requires the `msgpack` package."
+                )
+        else:
+            raise ValueError(f"Unknown serialization format: {format}.")
+        assert fmt is not None
+        self._format = fmt
+
+    @property
+    def format(self) -> str:
+        r"""The name of the format of the encoded records."""
+        return self._format.name
+
+    def encode(self, record: Dict[str, Any], store_blob: StoreBlob) -> bytes:
+        r"""Encodes a record dict.
+
+        Args:
+            record (Dict[str, Any]): The record to encode.
+            store_blob (Callable[[bytes], Tuple[int, int]]): A callback
+                storing a binary payload and returning a reference to it,
+                as two integers.
+
+        Returns:
+            bytes: The encoded record.
+        """
+        packer = _Packer(store_blob)
+        if record.keys() == _RECORD_KEYS and isinstance(
+            record["message"], dict
+        ):
+            value: Any = _pack_memory_record(record, packer)
+        else:
+            value = packer.pack(record)
+        return self._format.dumps(value)
+
+    def decode_batch(
+        self, data_list: List[bytes], load_blob: LoadBlob
+    ) -> List[Dict[str, Any]]:
+        r"""Decodes record dicts encoded by :meth:`encode`.
+
+        Args:
+            data_list (List[bytes]): The encoded records.
+            load_blob (Callable[[int, int], bytes]): A callback returning the
+                binary payload of a reference.
+
+        Returns:
+            List[Dict[str, Any]]: The decoded records.
+        """
+        if self._format.name == "json":
+            # Parse all records in one call
+            values = self._format.loads(b"[" + b",".join(data_list) + b"]")
+        else:
+            values = [self._format.loads(data) for data in data_list]
+        return [
+            (
+                _unpack_memory_record(value, load_blob)
+                if isinstance(value, list)
+                else _unpack(value, load_blob)
+            )
+            for value in values
+        ]
+
+    def decode(self, data: bytes, load_blob: LoadBlob) -> Dict[str, Any]:
+        r"""Decodes a record dict encoded by :meth:`encode`.
+
+        Args:
+            data (bytes): The encoded record.
+            load_blob (Callable[[int, int], bytes]): A callback returning the
+                binary payload of a reference.
+
+        Returns:
+            Dict[str, Any]: The decoded record.
+        """
+        return self.decode_batch([data], load_blob)[0]
+
+
+class _Packer:
+    r"""Converts values into plain JSON-like values, tagging enums and
+    storing binary payloads out of line. Records whether any value was
+    tagged, so that decoding can skip untagged values."""
+
+    __slots__ = ("store_blob", "tagged")
+
+    def __init__(self, store_blob: StoreBlob) -> None:
+        self.store_blob = store_blob
+        self.tagged = False
+
+    def pack(self, value: Any) -> Any:
+        if type(value) in _PLAIN_TYPES:
+            return value
+        if isinstance(value, dict):
+            return {key: self.pack(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.pack(item) for item in value]
+        if isinstance(value, Enum) and type(value) in _ENUM_CLASS_CODES:
+            self.tagged = True
+            return {_ENUM_TAG: [_ENUM_CLASS_CODES[type(value)], value.value]}
+        if isinstance(value, (str, int, float)):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            self.tagged = True
+            return {_BYTES_TAG: self.store_blob(bytes(value))}
+        if isinstance(value, Image.Image):
+            self.tagged = True
+            return {_IMAGE_TAG: self.store_blob(_encode_image(value))}
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not serializable."
+        )
+
+
+def _encode_image(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image.format or "PNG")
+    return buffer.getvalue()
+
+
+def _decode_image(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def _pack_memory_record(
+    record: Dict[str, Any], packer: _Packer
+) -> List[Any]:
+    r"""Encodes a dict of a :obj:`MemoryRecord` as an array of its fields.
+    Plain fields are stored as they are, the others through the packer."""
+    message = record["message"]
+    video_bytes = message.get("video_bytes")
+    image_list = message.get("image_list")
+    extra_fields = {
+        key: value
+        for key, value in message.items()
+        if key != "__class__" and key not in _MESSAGE_FIELDS
+    }
+    role_at_backend = record["role_at_backend"]
+    role_type = message["role_type"]
+    return [
+        record["uuid"],
+        getattr(role_at_backend, "value", role_at_backend),
+        message["__class__"],
+        message["role_name"],
+        getattr(role_type, "value", role_type),
+        message["content"],
+        message.get("image_detail", "auto"),
+        message.get("video_detail", "low"),
+        None if video_bytes is None else packer.store_blob(video_bytes),
+        (
+            None
+            if image_list is None
+            else [
+                packer.store_blob(_encode_image(image))
+                for image in image_list
+            ]
+        ),
+        packer.pack(message.get("meta_dict")),
+        packer.pack(record["extra_info"]),
+        packer.pack(extra_fields) if extra_fields else None,
+        # Must come last, after all fields have been packed
+        packer.tagged,
+    ]
+
+
+def _unpack_memory_record(
+    value: List[Any], load_blob: LoadBlob
+) -> Dict[str, Any]:
+    r"""Reverts :func:`_pack_memory_record`."""
+    (
+        uuid,
+        role_at_backend,
+        message_class,
+        role_name,
+        role_type,
+        content,
+        image_detail,
+        video_detail,
+        video_ref,
+        image_refs,
+        meta_dict,
+        extra_info,
+        extra_fields,
+        tagged,
+    ) = value
+    if tagged:
+        meta_dict = _unpack(meta_dict, load_blob)
+        extra_info = _unpack(extra_info, load_blob)
+        extra_fields = _unpack(extra_fields, load_blob)
+    message = {
+        "__class__": message_class,
+        "role_name": role_name,
+        "role_type": _ROLE_TYPES[role_type],
+        "meta_dict": meta_dict,
+        "content": content,
+        "video_bytes": None if video_ref is None else load_blob(*video_ref),
+        "image_list": (
+            None
+            if image_refs is None
+            else [_decode_image(load_blob(*ref)) for ref in image_refs]
+        ),
+        "image_detail": image_detail,
+        "video_detail": video_detail,
+    }
+    if extra_fields:
+        message.update(extra_fields)
+    return {
+        "uuid": uuid,
+        "message": message,
+        "role_at_backend": _BACKEND_ROLES[role_at_backend],
+        "extra_info": extra_info,
+    }
+
+
+def _unpack(value: Any, load_blob: LoadBlob) -> Any:
+    r"""Reverts :meth:`_Packer.pack`."""
+    if isinstance(value, dict):
+        if len(value) == 1:
+            if _ENUM_TAG in value:
+                class_code, member_value = value[_ENUM_TAG]
+                return _ENUM_CLASSES[class_code](member_value)
+            if _BYTES_TAG in value:
+                return load_blob(*value[_BYTES_TAG])
+            if _IMAGE_TAG in value:
+                return _decode_image(load_blob(*value[_IMAGE_TAG]))
+        return {key: _unpack(item, load_blob) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unpack(item, load_blob) for item in value]
+    return value
@@ -0,0 +1,332 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple
+
+from camel.storages.key_value_storages.base import BaseKeyValueStorage
+from camel.storages.key_value_storages.serialization import RecordSerializer
+
+
+class _Connection:
+    r"""A SQLite connection shared by the storages of a process, with the
+    lock serializing its use across threads."""
+
+    def __init__(self, path: str, timeout: float) -> None:
+        self.conn = sqlite3.connect(
+            path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.lock = threading.RLock()
+
+
+class SQLiteKeyValueStorage(BaseKeyValueStorage):
+    r"""A :obj:`BaseKeyValueStorage` keeping the records of many sessions,
+    e.g. the chat histories of many agents, in one SQLite database.
+
+    Records are keyed by their session ID and their position in the session,
+    which is the primary key of the table, so that :meth:`load_range` and
+    :meth:`load_tail` only read the requested rows. Each call to
+    :meth:`save` inserts its batch in one transaction. The database is
+    opened in WAL mode, so that readers do not block the writer, and several
+    processes can share it.
+
+    Storages of the same database in a process share one connection, which
+    is reopened in forked child processes. Records are encoded by a
+    :obj:`RecordSerializer`, and their binary payloads, such as images, are
+    stored in a separate table.
+
+    Args:
+        path (Path, optional): Path to the database file. If `None`, a
+            default path `./chat_history.db` will be used.
+            (default: :obj:`None`)
+        session_id (str, optional): The ID of the session whose records are
+            stored. (default: :obj:`"default"`)
+        format (str, optional): The format of the records of a new database,
+            either `"json"` or `"msgpack"`. If `None`, the fastest available
+            one is chosen. The format of an existing database is read from
+            it. (default: :obj:`None`)
+        timeout (float, optional): How many seconds to wait for a lock held
+            by another process before raising an error.
+            (default: :obj:`30.0`)
+
+    Raises:
+        ValueError: If the database was created by an unsupported version.
+    """
+
+    VERSION: ClassVar[int] = 1
+
+    # Connections of the current process by database path
+    _connections: ClassVar[Dict[str, _Connection]] = {}
+    _connections_pid: ClassVar[int] = os.getpid()
+    _connections_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        session_id: str = "default",
+        format: Optional[str] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.path = path or Path("./chat_history.db")
+        self.session_id = session_id
+        self.timeout = timeout
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "session_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "data BLOB NOT NULL, PRIMARY KEY (session_id, seq)) "
+                "WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, "
+                "data BLOB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS blobs_session "
+                "ON blobs (session_id)"
+            )
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if not meta:
+                self.serializer = RecordSerializer(format)
+                conn.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [
+                        ("version", str(self.VERSION)),
+                        ("format", self.serializer.format),
+                    ],
+                )
+            elif meta.get("version") != str(self.VERSION):
+                raise ValueError(
+                    f"Unsupported storage database version "
+                    f"{meta.get('version')}: {self.path}."
+                )
+            else:
+                self.serializer = RecordSerializer(meta["format"])
+
+    def _get_connection(self) -> _Connection:
+        cls = SQLiteKeyValueStorage
+        key = os.path.abspath(self.path)
+        with cls._connections_lock:
+            pid = os.getpid()
+            if cls._connections_pid != pid:
+                # Connections must not be used across a fork
+                cls._connections = {}
+                cls._connections_pid = pid
+            connection = cls._connections.get(key)
+            if connection is None:
+                connection = _Connection(key, self.timeout)
+                connection.conn.execute("PRAGMA journal_mode=WAL")
+                connection.conn.execute("PRAGMA synchronous=NORMAL")
+                cls._connections[key] = connection
+            return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        r"""Runs a write transaction, taking the write lock of the database
+        up front so that concurrent writers of other processes wait instead
+        of failing midway."""
+        connection = self._get_connection()
+        with connection.lock:
+            conn = connection.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @classmethod
+    def close_connections(cls) -> None:
+        r"""Closes the connections of the current process. Storages reopen
+        them when they are used again."""
+        with cls._connections_lock:
+            if cls._connections_pid == os.getpid():
+                for connection in cls._connections.values():
+                    with connection.lock:
+                        connection.conn.close()
+            cls._connections = {}
+            cls._connections_pid = os.getpid()
+
+    @classmethod
+    def list_sessions(cls, path: Optional[Path] = None) -> List[str]:
+        r"""Lists the sessions of a database that have stored records.
+
+        Args:
+            path (Path, optional): Path to the database file. If `None`, the
+                default path `./chat_history.db` will be used.
+                (default: :obj:`None`)
+
+        Returns:
+            List[str]: The session IDs, in sorted order.
+        """
+        storage = cls(path)
+        rows = storage._query(
+            "SELECT DISTINCT session_id FROM records ORDER BY session_id", ()
+        )
+        return [session_id for (session_id,) in rows]
+
+    def _query(self, sql: str, params: Tuple[Any, ...]) -> List[Any]:
+        connection = self._get_connection()
+        with connection.lock:
+            return connection.conn.execute(sql, params).fetchall()
+
+    def _count(self, conn: sqlite3.Connection) -> int:
+        # Positions are contiguous from 0, so the count is read from the
+        # index instead of scanning the rows of the session
+        (last,) = conn.execute(
+            "SELECT MAX(seq) FROM records WHERE session_id = ?",
+            (self.session_id,),
+        ).fetchone()
+        return 0 if last is None else last + 1
+
+    def _decode(self, rows: List[Any]) -> List[Dict[str, Any]]:
+        def load_blob(blob_id: int, length: int) -> bytes:
+            (data,) = self._query(
+                "SELECT data FROM blobs WHERE id = ?", (blob_id,)
+            )[0]
+            return data
+
+        return self.serializer.decode_batch(
+            [bytes(data) for (data,) in rows], load_blob
+        )
+
+    def save(self, records: List[Dict[str, Any]]) -> None:
+        r"""Saves a batch of records to the key-value storage system.
+
+        Args:
+            records (List[Dict[str, Any]]): A list of dictionaries, where each
+                dictionary represents a unique record to be stored.
+        """
+        if not records:
+            return
+        with self._transaction() as conn:
+
+            def store_blob(blob: bytes) -> Tuple[int, int]:
+                cursor = conn.execute(
+                    "INSERT INTO blobs (session_id, data) VALUES (?, ?)",
+                    (self.session_id, blob),
+                )
+                assert cursor.lastrowid is not None
+                return cursor.lastrowid, len(blob)
+
+            first = self._count(conn)
+            conn.executemany(
+                "INSERT INTO records VALUES (?, ?, ?)",
+                [
+                    (
+                        self.session_id,
+                        first + i,
+                        self.serializer.encode(record, store_blob),
+                    )
+                    for i, record in enumerate(records)
+                ],
+            )
+
+    def load(self) -> List[Dict[str, Any]]:
+        r"""Loads all stored records from the key-value storage system.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        return self._decode(
+            self._query(
+                "SELECT data FROM records WHERE session_id = ? ORDER BY seq",
+                (self.session_id,),
+            )
+        )
+
+    def load_range(
+        self, start: int, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        r"""Loads the stored records in the half-open range
+        :obj:`[start, stop)`, following Python slicing semantics. Only the
+        requested rows are read from the database.
+
+        Args:
+            start (int): Index of the first record to load.
+            stop (int, optional): Index after the last record to load. If
+                `None`, records are loaded until the end of the storage.
+                (default: :obj:`None`)
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record.
+        """
+        connection = self._get_connection()
+        with connection.lock:
+            conn = connection.conn
+            if start < 0 or (stop is not None and stop < 0):
+                start, stop, _ = slice(start, stop).indices(
+                    self._count(conn)
+                )
+            if stop is None:
+                rows = conn.execute(
+                    "SELECT data FROM records WHERE session_id = ? "
+                    "AND seq >= ? ORDER BY seq",
+                    (self.session_id, start),
+                ).fetchall()
+            elif start < stop:
+                rows = conn.execute(
+                    "SELECT data FROM records WHERE session_id = ? "
+                    "AND seq >= ? AND seq < ? ORDER BY seq",
+                    (self.session_id, start, stop),
+                ).fetchall()
+            else:
+                rows = []
+        return self._decode(rows)
+
+    def load_tail(self, n: int) -> List[Dict[str, Any]]:
+        r"""Loads the last :obj:`n` stored records.
+
+        Args:
+            n (int): The number of most recent records to load.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionaries, where each dictionary
+                represents a stored record, in storing order.
+        """
+        if n <= 0:
+            return []
+        rows = self._query(
+            "SELECT data FROM records WHERE session_id = ? "
+            "ORDER BY seq DESC LIMIT ?",
+            (self.session_id, n),
+        )
+        rows.reverse()
+        return self._decode(rows)
+
+    def clear(self) -> None:
+        r"""Removes all records of the session from the key-value storage
+        system. The records of other sessions are kept."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM records WHERE session_id = ?",
+                (self.session_id,),
+            )
+            conn.execute(
+                "DELETE FROM blobs WHERE session_id = ?", (self.session_id,)
+            )
@@ -28,13 +28,17 @@ from .commons import (
     text_extract_from_web,
     to_pascal,
 )
+from .client_registry import OpenAIClientRegistry
 from .constants import Constants
+from .timing import PhaseTimer, time_phase
 from .token_counting import (
     AnthropicTokenCounter,
     BaseTokenCounter,
     LiteLLMTokenCounter,
     OpenAITokenCounter,
     OpenSourceTokenCounter,
+    TokenEstimator,
+    TokenizerRegistry,
     get_model_encoding,
 )
 
@@ -60,4 +64,9 @@ __all__ = [
     'create_chunks',
     'dependencies_required',
     'api_keys_required',
+    'OpenAIClientRegistry',
+    'PhaseTimer',
+    'time_phase',
+    'TokenizerRegistry',
+    'TokenEstimator',
 ]
@@ -0,0 +1,308 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import asyncio
+import threading
+import weakref
+from typing import Any, ClassVar, Dict, Optional, Set, Tuple, Union
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+_ClientKey = Tuple[Optional[str], Optional[str], float, int]
+
+# Tasks closing clients, referenced until they are done
+_closing_tasks: Set[asyncio.Task] = set()
+
+
+class OpenAIClientRegistry:
+    r"""A process-wide registry of OpenAI clients. Clients are shared by all
+    callers using the same base URL, API key, timeout and number of retries,
+    so that they also share one HTTP connection pool instead of opening their
+    own connections.
+
+    Asynchronous clients are additionally keyed by the running event loop,
+    as their connections cannot be used across event loops.
+
+    The default pool limits are those of the OpenAI SDK, so that sharing a
+    client does not lower the concurrency a backend had with its own one.
+
+    Args:
+        max_connections (int, optional): The maximum number of concurrent
+            connections of each client. (default: :obj:`1000`)
+        max_keepalive_connections (int, optional): The maximum number of idle
+            connections kept alive by each client. (default: :obj:`100`)
+        keepalive_expiry (float, optional): The number of seconds an idle
+            connection is kept alive. (default: :obj:`5.0`)
+    """
+
+    _default: ClassVar[Optional["OpenAIClientRegistry"]] = None
+    _default_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        max_connections: int = 1000,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry: float = 5.0,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[_ClientKey, OpenAI] = {}
+        self._async_clients: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+        self._http_clients: weakref.WeakSet = weakref.WeakSet()
+        self._num_requests = 0
+        self.configure(
+            max_connections, max_keepalive_connections, keepalive_expiry
+        )
+
+    @classmethod
+    def default(cls) -> "OpenAIClientRegistry":
+        r"""Returns the registry shared by all model backends, embeddings and
+        audio models of the process."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def configure(
+        self,
+        max_connections: int = 1000,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry: float = 5.0,
+    ) -> None:
+        r"""Sets the connection pool limits of the clients created from now
+        on. Existing clients keep their limits.
+
+        Args:
+            max_connections (int, optional): The maximum number of concurrent
+                connections of each client. (default: :obj:`1000`)
+            max_keepalive_connections (int, optional): The maximum number of
+                idle connections kept alive by each client.
+                (default: :obj:`100`)
+            keepalive_expiry (float, optional): The number of seconds an idle
+                connection is kept alive. (default: :obj:`5.0`)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+    def _count_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self._num_requests += 1
+
+    async def _count_request_async(self, request: httpx.Request) -> None:
+        self._count_request(request)
+
+    def get_client(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 60,
+        max_retries: int = 3,
+    ) -> OpenAI:
+        r"""Returns the shared synchronous client for the given settings,
+        creating it on first use.
+
+        Args:
+            api_key (str, optional): The API key. If `None`, the client reads
+                it from the environment. (default: :obj:`None`)
+            base_url (str, optional): The base URL of the API.
+                (default: :obj:`None`)
+            timeout (float, optional): The request timeout in seconds.
+                (default: :obj:`60`)
+            max_retries (int, optional): The maximum number of retries.
+                (default: :obj:`3`)
+
+        Returns:
+            OpenAI: The shared client.
+        """
+        key = (base_url, api_key, float(timeout), max_retries)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                http_client = httpx.Client(
+                    timeout=timeout,
+                    limits=self.limits,
+                    event_hooks={"request": [self._count_request]},
+                )
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=timeout,
+                    max_retries=max_retries,
+                    http_client=http_client,
+                )
+                self._clients[key] = client
+                self._http_clients.add(http_client)
+            return client
+
+    def get_async_client(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 60,
+        max_retries: int = 3,
+    ) -> AsyncOpenAI:
+        r"""Returns the shared asynchronous client for the given settings
+        and the running event loop, creating it on first use.
+
+        Args:
+            api_key (str, optional): The API key. If `None`, the client reads
+                it from the environment. (default: :obj:`None`)
+            base_url (str, optional): The base URL of the API.
+                (default: :obj:`None`)
+            timeout (float, optional): The request timeout in seconds.
+                (default: :obj:`60`)
+            max_retries (int, optional): The maximum number of retries.
+                (default: :obj:`3`)
+
+        Returns:
+            AsyncOpenAI: The shared client.
+        """
+        key = (base_url, api_key, float(timeout), max_retries)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                async_http_client = httpx.AsyncClient(
+                    timeout=timeout,
+                    limits=self.limits,
+                    event_hooks={"request": [self._count_request_async]},
+                )
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=timeout,
+                    max_retries=max_retries,
+                    http_client=async_http_client,
+                )
+                clients[key] = client
+                self._http_clients.add(async_http_client)
+            return client
+
+    def stats(self) -> Dict[str, Any]:
+        r"""Returns the utilization of the shared connection pools.
+
+        Returns:
+            Dict[str, Any]: The number of shared clients, the number of
+                requests sent through them, the number of open connections
+                and how many of them are idle, and the configured limits.
+        """
+        with self._lock:
+            http_clients = list(self._http_clients)
+            num_async_clients = sum(
+                len(clients) for clients in self._async_clients.values()
+            )
+            num_requests = self._num_requests
+            num_clients = len(self._clients)
+
+        num_connections = 0
+        num_idle_connections = 0
+        for http_client in http_clients:
+            for connection in _get_pool_connections(http_client):
+                num_connections += 1
+                if connection.is_idle():
+                    num_idle_connections += 1
+        return {
+            "clients": num_clients,
+            "async_clients": num_async_clients,
+            "requests": num_requests,
+            "connections": num_connections,
+            "idle_connections": num_idle_connections,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": (
+                self.limits.max_keepalive_connections
+            ),
+        }
+
+    def _take_clients(self) -> Tuple[list, list]:
+        with self._lock:
+            clients = list(self._clients.values())
+            async_clients = [
+                (loop, list(loop_clients.values()))
+                for loop, loop_clients in self._async_clients.items()
+            ]
+            self._clients.clear()
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._http_clients = weakref.WeakSet()
+        return clients, async_clients
+
+    def close(self) -> None:
+        r"""Closes all clients and forgets them. Asynchronous clients are
+        closed on their event loop: right away if it is idle, or as a task
+        scheduled on it if it is running. Clients of closed loops are only
+        forgotten, as their connections were dropped with the loop. Use
+        :meth:`aclose` from a coroutine to wait for the clients of the
+        running loop to be closed."""
+        clients, async_clients = self._take_clients()
+        for client in clients:
+            client.close()
+        for loop, loop_clients in async_clients:
+            _close_async_clients(loop, loop_clients)
+
+    async def aclose(self) -> None:
+        r"""Closes all clients and forgets them, waiting for the
+        asynchronous clients of the running event loop to be closed. Those
+        of other event loops are closed as in :meth:`close`."""
+        clients, async_clients = self._take_clients()
+        for client in clients:
+            client.close()
+        running_loop = asyncio.get_running_loop()
+        for loop, loop_clients in async_clients:
+            if loop is running_loop:
+                for client in loop_clients:
+                    await client.close()
+            else:
+                _close_async_clients(loop, loop_clients)
+
+
+def _close_async_clients(
+    loop: asyncio.AbstractEventLoop, clients: list
+) -> None:
+    r"""Closes asynchronous clients on the event loop they were created on,
+    which is the only one their connections can be used from."""
+    if loop.is_closed():
+        return
+
+    async def close_all() -> None:
+        for client in clients:
+            await client.close()
+
+    if loop.is_running():
+        try:
+            running_loop: Optional[asyncio.AbstractEventLoop] = (
+                asyncio.get_running_loop()
+            )
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            task = loop.create_task(close_all())
+            _closing_tasks.add(task)
+            task.add_done_callback(_closing_tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(close_all(), loop)
+    else:
+        loop.run_until_complete(close_all())
+
+
+def _get_pool_connections(
+    http_client: Union[httpx.Client, httpx.AsyncClient],
+) -> list:
+    r"""Returns the connections of the connection pool of an httpx client,
+    or an empty list if the transport does not expose a pool."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    return list(getattr(pool, "connections", []))
@@ -22,5 +22,13 @@ class Constants:
     # are extracted from the video.
     VIDEO_IMAGE_EXTRACTION_INTERVAL = 50
 
+    # This value defines the maximum number of images extracted from a
+    # video. Longer videos are sampled at evenly spaced timestamps instead.
+    VIDEO_MAX_EXTRACTED_IMAGES = 50
+
     # default plug of imageio to read video
     VIDEO_DEFAULT_PLUG_PYAV = "pyav"
+
+    # This value defines the maximum total size (in bytes) of the base64
+    # encoded images and video frames cached for messages.
+    ENCODED_MEDIA_CACHE_SIZE = 256 * 1024 * 1024
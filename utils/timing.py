@@ -0,0 +1,110 @@
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+# Licensed under the Apache License, Version 2.0 (the “License”);
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an “AS IS” BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =========== Copyright 2023 @ CAMEL-AI.org. All Rights Reserved. ===========
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+_active_timer: ContextVar[Optional["PhaseTimer"]] = ContextVar(
+    "camel_active_timer", default=None
+)
+_NULL_CONTEXT = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "PhaseTimer", name: str) -> None:
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timer.record(self.name, time.perf_counter() - self.start)
+
+
+class PhaseTimer:
+    r"""Measures the wall-clock durations of the named phases of an
+    operation, such as the step of an agent. While the timer is active, i.e.
+    inside its `with` block, every :func:`time_phase` block executed in the
+    same thread or asyncio task is recorded. A phase entered several times is
+    summed up, and the whole `with` block is recorded as `"total"`.
+
+    Args:
+        on_phase (Callable[[str, float], None], optional): A callback
+            invoked with the name and duration in seconds of every recorded
+            phase. (default: :obj:`None`)
+    """
+
+    def __init__(
+        self, on_phase: Optional[Callable[[str, float], None]] = None
+    ) -> None:
+        self.timings: Dict[str, float] = {}
+        self.on_phase = on_phase
+        self._start = 0.0
+        self._token: Optional[Token] = None
+
+    def phase(self, name: str) -> ContextManager[None]:
+        r"""Returns a context manager recording its duration as the given
+        phase of this timer.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            ContextManager[None]: The context manager.
+        """
+        return _Phase(self, name)
+
+    def record(self, name: str, duration: float) -> None:
+        r"""Adds a duration to a phase.
+
+        Args:
+            name (str): The name of the phase.
+            duration (float): The duration in seconds.
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+        if self.on_phase is not None:
+            self.on_phase(name, duration)
+
+    def __enter__(self) -> "PhaseTimer":
+        self._token = _active_timer.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.record("total", time.perf_counter() - self._start)
+        if self._token is not None:
+            _active_timer.reset(self._token)
+            self._token = None
+
+
+def time_phase(name: str) -> ContextManager[None]:
+    r"""Returns a context manager recording its duration as a phase of the
+    active :obj:`PhaseTimer`. If no timer is active, a shared no-op context
+    manager is returned, so that instrumented code costs next to nothing.
+
+    Args:
+        name (str): The name of the phase.
+
+    Returns:
+        ContextManager[None]: The context manager.
+    """
+    timer = _active_timer.get()
+    if timer is None:
+        return _NULL_CONTEXT
+    return _Phase(timer, name)
@@ -15,15 +15,28 @@
 from __future__ import annotations
 
 import base64
+import struct
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
 from io import BytesIO
 from math import ceil
-from typing import TYPE_CHECKING, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 from anthropic import Anthropic
 from PIL import Image
 
-from camel.types import ModelType, OpenAIImageType, OpenAIVisionDetailType
+from camel.types import ModelType, OpenAIVisionDetailType
 
 if TYPE_CHECKING:
     from camel.messages import OpenAIMessage
@@ -35,6 +48,29 @@ SQUARE_PIXELS = 512
 SQUARE_TOKENS = 170
 EXTRA_TOKENS = 85
 
+# Length of the base64 payload decoded first to read the image dimensions
+_IMAGE_HEADER_PREFIX_LENGTH = 4096
+_DATA_URL_PREFIX_SEARCH_LENGTH = 64
+_IMAGE_SIZE_CACHE_SIZE = 4096
+# Smaller batches are encoded directly, without starting worker threads
+_MIN_ENCODE_BATCH_SIZE = 16
+# Typical number of UTF-8 bytes per token of English text
+_BYTES_PER_TOKEN = {
+    "cl100k_base": 4.0,
+    "o200k_base": 4.0,
+    "p50k_base": 3.7,
+    "r50k_base": 3.7,
+}
+_image_size_cache: OrderedDict[Tuple[int, int], Tuple[int, int]] = (
+    OrderedDict()
+)
+_image_size_cache_lock = threading.Lock()
+_JPEG_SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7)
+    + (0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+)
+_JPEG_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xD8)))
+
 
 def messages_to_prompt(messages: List[OpenAIMessage], model: ModelType) -> str:
     r"""Parse the message list into a single prompt following model-specifc
@@ -48,16 +84,37 @@ def messages_to_prompt(messages: List[OpenAIMessage], model: ModelType) -> str:
     Returns:
         str: A single prompt summarizing all the messages.
     """
+    return "".join(messages_to_prompt_chunks(messages, model))
+
+
+def messages_to_prompt_chunks(
+    messages: List[OpenAIMessage], model: ModelType
+) -> List[str]:
+    r"""Parse the message list into the prompt of :func:`messages_to_prompt`,
+    split into chunks. Every chunk but the last one ends with the separator
+    closing a pair of turns, which consists of special tokens (`</s>`) of
+    the model's tokenizer. As tokenizers split the text at special tokens
+    before tokenizing it, the chunks can be tokenized independently and
+    their token counts summed.
+
+    Args:
+        messages (List[OpenAIMessage]): Message list with the chat history
+            in OpenAI API format.
+        model (ModelType): Model type for which messages will be parsed.
+
+    Returns:
+        List[str]: The chunks of the prompt.
+    """
     system_message = messages[0]["content"]
 
-    ret: str
+    chunks: List[str] = []
+    parts: List[str] = []
     if model == ModelType.LLAMA_2:
         # reference: https://github.com/facebookresearch/llama/blob/cfc3fc8c1968d390eb830e65c63865e980873a06/llama/generation.py#L212
         seps = [" ", " </s><s>"]
         role_map = {"user": "[INST]", "assistant": "[/INST]"}
 
         system_prompt = f"[INST] <<SYS>>\n{system_message}\n<</SYS>>\n\n"
-        ret = ""
         for i, msg in enumerate(messages[1:]):
             role = role_map[msg["role"]]
             content = msg["content"]
@@ -68,18 +125,20 @@ def messages_to_prompt(messages: List[OpenAIMessage], model: ModelType) -> str:
                         "supported by the token counter."
                     )
                 if i == 0:
-                    ret += system_prompt + content
+                    parts.append(system_prompt + content)
                 else:
-                    ret += role + " " + content + seps[i % 2]
+                    parts.append(role + " " + content + seps[i % 2])
+                    if i % 2 == 1:
+                        chunks.append("".join(parts))
+                        parts = []
             else:
-                ret += role
-        return ret
+                parts.append(role)
     elif model == ModelType.VICUNA or model == ModelType.VICUNA_16K:
         seps = [" ", "</s>"]
         role_map = {"user": "USER", "assistant": "ASSISTANT"}
 
         system_prompt = f"{system_message}"
-        ret = system_prompt + seps[0]
+        parts.append(system_prompt + seps[0])
         for i, msg in enumerate(messages[1:]):
             role = role_map[msg["role"]]
             content = msg["content"]
@@ -89,16 +148,22 @@ def messages_to_prompt(messages: List[OpenAIMessage], model: ModelType) -> str:
                     "supported by the token counter."
                 )
             if content:
-                ret += role + ": " + content + seps[i % 2]
+                parts.append(role + ": " + content + seps[i % 2])
+                if i % 2 == 1:
+                    chunks.append("".join(parts))
+                    parts = []
             else:
-                ret += role + ":"
-        return ret
+                parts.append(role + ":")
     else:
         raise ValueError(f"Invalid model type: {model}")
+    if parts:
+        chunks.append("".join(parts))
+    return chunks
 
 
 def get_model_encoding(value_for_tiktoken: str):
-    r"""Get model encoding from tiktoken.
+    r"""Get model encoding from tiktoken. Encodings are loaded once per
+    process by the default :obj:`TokenizerRegistry`.
 
     Args:
         value_for_tiktoken: Model value for tiktoken.
@@ -106,6 +171,12 @@ def get_model_encoding(value_for_tiktoken: str):
     Returns:
         tiktoken.Encoding: Model encoding.
     """
+    return TokenizerRegistry.default().get_tiktoken_encoding(
+        value_for_tiktoken
+    )
+
+
+def _load_model_encoding(value_for_tiktoken: str):
     import tiktoken
 
     try:
@@ -116,6 +187,350 @@ def get_model_encoding(value_for_tiktoken: str):
     return encoding
 
 
+def _load_hf_tokenizer(model_path: str):
+    # Use a fast Rust-based tokenizer if it is supported for a given model.
+    # If a fast tokenizer is not available for a given model,
+    # a normal Python-based tokenizer is returned instead.
+    from transformers import AutoTokenizer
+
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            use_fast=True,
+        )
+    except TypeError:
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            use_fast=False,
+        )
+    except Exception:
+        raise ValueError(
+            f"Invalid `model_path` ({model_path}) is provided. "
+            "Tokenizer loading failed."
+        )
+    return tokenizer
+
+
+class TokenizerRegistry:
+    r"""A process-wide registry of tokenizers and cache of token counts.
+    Each tokenizer is loaded once and shared by all token counters, and the
+    number of tokens of a text is cached, so that system prompts and
+    repeated messages are not tokenized again by every agent.
+
+    Token counts are cached in least-recently-used order, keyed by the
+    tokenizer and the hash and length of the text.
+
+    Args:
+        max_cached_counts (int, optional): The maximum number of cached token
+            counts. (default: :obj:`65536`)
+    """
+
+    _default: ClassVar[Optional["TokenizerRegistry"]] = None
+    _default_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, max_cached_counts: int = 65536) -> None:
+        self.max_cached_counts = max_cached_counts
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._tokenizers: Dict[Tuple[str, str], Any] = {}
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._counts: OrderedDict[Tuple[str, int, int], int] = OrderedDict()
+
+    @classmethod
+    def default(cls) -> "TokenizerRegistry":
+        r"""Returns the registry shared by all token counters of the
+        process."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def _get_or_load(self, key: Tuple[str, str], loader: Callable[[], Any]):
+        with self._lock:
+            if key in self._tokenizers:
+                return self._tokenizers[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        # Only one thread loads a tokenizer, without blocking other loads
+        with load_lock:
+            with self._lock:
+                if key in self._tokenizers:
+                    return self._tokenizers[key]
+            tokenizer = loader()
+            with self._lock:
+                self._tokenizers[key] = tokenizer
+            return tokenizer
+
+    def get_tiktoken_encoding(self, value_for_tiktoken: str):
+        r"""Returns the shared tiktoken encoding of a model.
+
+        Args:
+            value_for_tiktoken (str): Model value for tiktoken.
+
+        Returns:
+            tiktoken.Encoding: Model encoding.
+        """
+        return self._get_or_load(
+            ("tiktoken", value_for_tiktoken),
+            lambda: _load_model_encoding(value_for_tiktoken),
+        )
+
+    def get_hf_tokenizer(self, model_path: str):
+        r"""Returns the shared Hugging Face tokenizer located at a path.
+
+        Args:
+            model_path (str): The path to the model files, where the
+                tokenizer model should be located.
+
+        Returns:
+            transformers.PreTrainedTokenizerBase: The tokenizer.
+        """
+        return self._get_or_load(
+            ("huggingface", model_path),
+            lambda: _load_hf_tokenizer(model_path),
+        )
+
+    def get_anthropic_client(self) -> Anthropic:
+        r"""Returns the shared Anthropic client used to count tokens.
+
+        Returns:
+            Anthropic: The client.
+        """
+        return self._get_or_load(("anthropic", ""), Anthropic)
+
+    def count_tokens(
+        self, namespace: str, text: str, count: Callable[[str], int]
+    ) -> int:
+        r"""Returns the number of tokens of a text, tokenizing it only if it
+        is not cached.
+
+        Args:
+            namespace (str): The name of the tokenizer, separating the counts
+                of different tokenizers.
+            text (str): The text.
+            count (Callable[[str], int]): A function tokenizing the text and
+                returning its number of tokens.
+
+        Returns:
+            int: The number of tokens of the text.
+        """
+        key = (namespace, hash(text), len(text))
+        with self._lock:
+            num_tokens = self._counts.get(key)
+            if num_tokens is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return num_tokens
+            self.misses += 1
+
+        num_tokens = count(text)
+        with self._lock:
+            self._counts[key] = num_tokens
+            if len(self._counts) > self.max_cached_counts:
+                self._counts.popitem(last=False)
+        return num_tokens
+
+    def count_tokens_batch(
+        self,
+        namespace: str,
+        texts: List[str],
+        count_batch: Callable[[List[str]], List[int]],
+    ) -> List[int]:
+        r"""Returns the number of tokens of each text, tokenizing the texts
+        that are not cached in a single call.
+
+        Args:
+            namespace (str): The name of the tokenizer, separating the counts
+                of different tokenizers.
+            texts (List[str]): The texts.
+            count_batch (Callable[[List[str]], List[int]]): A function
+                tokenizing a list of texts and returning their numbers of
+                tokens.
+
+        Returns:
+            List[int]: The number of tokens of each text.
+        """
+        keys = [(namespace, hash(text), len(text)) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[Tuple[str, int, int], List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                num_tokens = self._counts.get(key)
+                if num_tokens is not None:
+                    self._counts.move_to_end(key)
+                    self.hits += 1
+                    counts[i] = num_tokens
+                else:
+                    missing.setdefault(key, []).append(i)
+            self.misses += len(missing)
+
+        if missing:
+            missing_keys = list(missing)
+            missing_counts = count_batch(
+                [texts[missing[key][0]] for key in missing_keys]
+            )
+            with self._lock:
+                for key, num_tokens in zip(missing_keys, missing_counts):
+                    for i in missing[key]:
+                        counts[i] = num_tokens
+                    self._counts[key] = num_tokens
+                while len(self._counts) > self.max_cached_counts:
+                    self._counts.popitem(last=False)
+        return counts  # type: ignore[return-value]
+
+    def clear_cache(self) -> None:
+        r"""Removes all cached token counts and resets the statistics. The
+        loaded tokenizers are kept."""
+        with self._lock:
+            self._counts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        r"""Returns the statistics of the registry.
+
+        Returns:
+            Dict[str, int]: The number of loaded tokenizers, the number of
+                cached token counts, and the number of hits and misses of
+                the cache.
+        """
+        with self._lock:
+            return {
+                "tokenizers": len(self._tokenizers),
+                "cached_counts": len(self._counts),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class TokenEstimator:
+    r"""Estimates the number of tokens of messages from the UTF-8 length of
+    their texts, as a cheap alternative to tokenizing them. Images and the
+    per-message overhead are counted exactly, and texts are assumed to take
+    :obj:`bytes_per_token` bytes per token.
+
+    The ratio starts at a default for the encoding, e.g. about 4 bytes per
+    token for English text with `cl100k_base`, and is calibrated with exact
+    counts passed to :meth:`calibrate`. As the estimate of a context is a
+    weighted average over its texts, it underestimates the exact count by
+    at most the largest relative deviation of the ratio of a calibration
+    sample, which is tracked as :obj:`error_bound`. The bound only holds for
+    texts similar to the calibration samples, which is why callers should
+    count exactly when an estimate is close to a limit.
+
+    Args:
+        bytes_per_token (float, optional): The initial number of bytes per
+            token of texts. (default: :obj:`4.0`)
+        tokens_per_message (int, optional): The number of tokens added for
+            every message. (default: :obj:`3`)
+        tokens_per_name (int, optional): The number of tokens added for the
+            name field of a message. (default: :obj:`1`)
+    """
+
+    # Samples with fewer tokens are too noisy to bound the error
+    _MIN_SAMPLE_TOKENS = 16
+    _MAX_SAMPLES = 256
+
+    def __init__(
+        self,
+        bytes_per_token: float = 4.0,
+        tokens_per_message: int = 3,
+        tokens_per_name: int = 1,
+    ) -> None:
+        self.bytes_per_token = bytes_per_token
+        self.tokens_per_message = tokens_per_message
+        self.tokens_per_name = tokens_per_name
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._total_tokens = 0
+        self._sample_ratios: Deque[float] = deque(maxlen=self._MAX_SAMPLES)
+
+    @property
+    def num_samples(self) -> int:
+        r"""The number of calibration samples the error bound is based
+        on."""
+        return len(self._sample_ratios)
+
+    @property
+    def error_bound(self) -> Optional[float]:
+        r"""The relative error by which an estimate may fall below the exact
+        count, or `None` if there are no calibration samples."""
+        with self._lock:
+            if not self._sample_ratios:
+                return None
+            return max(
+                0.0,
+                max(
+                    self.bytes_per_token / ratio - 1
+                    for ratio in self._sample_ratios
+                ),
+            )
+
+    def _split_message(self, message: OpenAIMessage) -> Tuple[int, int]:
+        r"""Returns the number of bytes of the texts of a message, and the
+        number of tokens of everything else."""
+        num_bytes = 0
+        num_tokens = self.tokens_per_message + 3
+        for key, value in message.items():
+            if not isinstance(value, list):
+                num_bytes += len(str(value).encode("utf-8"))
+            else:
+                for item in value:
+                    if item["type"] == "text":
+                        num_bytes += len(str(item["text"]).encode("utf-8"))
+                    elif item["type"] == "image_url":
+                        width, height = get_image_size_from_url(
+                            item["image_url"]["url"]
+                        )
+                        num_tokens += count_tokens_from_image_size(
+                            width,
+                            height,
+                            OpenAIVisionDetailType(
+                                item["image_url"]["detail"]
+                            ),
+                        )
+            if key == "name":
+                num_tokens += self.tokens_per_name
+        return num_bytes, num_tokens
+
+    def estimate_message(self, message: OpenAIMessage) -> int:
+        r"""Estimates the number of tokens of a message on its own, i.e. as a
+        message list of one message.
+
+        Args:
+            message (OpenAIMessage): The message in OpenAI API format.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        num_bytes, num_tokens = self._split_message(message)
+        return num_tokens + ceil(num_bytes / self.bytes_per_token)
+
+    def calibrate(
+        self, messages: List[OpenAIMessage], num_tokens: List[int]
+    ) -> None:
+        r"""Updates the ratio of bytes per token and the error bound with the
+        exact token counts of messages.
+
+        Args:
+            messages (List[OpenAIMessage]): Messages in OpenAI API format.
+            num_tokens (List[int]): The exact number of tokens of each
+                message on its own.
+        """
+        with self._lock:
+            for message, exact in zip(messages, num_tokens):
+                num_bytes, overhead = self._split_message(message)
+                text_tokens = exact - overhead
+                if num_bytes <= 0 or text_tokens <= 0:
+                    continue
+                self._total_bytes += num_bytes
+                self._total_tokens += text_tokens
+                if text_tokens >= self._MIN_SAMPLE_TOKENS:
+                    self._sample_ratios.append(num_bytes / text_tokens)
+            if self._total_tokens > 0:
+                self.bytes_per_token = self._total_bytes / self._total_tokens
+
+
 class BaseTokenCounter(ABC):
     r"""Base class for token counters of different kinds of models."""
 
@@ -132,6 +547,46 @@ class BaseTokenCounter(ABC):
         """
         pass
 
+    def count_tokens_batch(
+        self, messages_list: List[List[OpenAIMessage]]
+    ) -> List[int]:
+        r"""Count number of tokens in each of the provided message lists.
+        Counters that can tokenize many texts at once override this method.
+
+        Args:
+            messages_list (List[List[OpenAIMessage]]): Message lists with the
+                chat history in OpenAI API format.
+
+        Returns:
+            List[int]: Number of tokens in each message list.
+        """
+        return [
+            self.count_tokens_from_messages(messages)
+            for messages in messages_list
+        ]
+
+    def count_tokens_per_message(
+        self, messages: List[OpenAIMessage]
+    ) -> List[int]:
+        r"""Count number of tokens of each provided message on its own, i.e.
+        as a message list of one message, in one batch.
+
+        Args:
+            messages (List[OpenAIMessage]): Messages in OpenAI API format.
+
+        Returns:
+            List[int]: Number of tokens of each message.
+        """
+        return self.count_tokens_batch([[message] for message in messages])
+
+    def create_estimator(self) -> TokenEstimator:
+        r"""Creates a :obj:`TokenEstimator` approximating this counter.
+
+        Returns:
+            TokenEstimator: An uncalibrated estimator.
+        """
+        return TokenEstimator()
+
 
 class OpenSourceTokenCounter(BaseTokenCounter):
     def __init__(self, model_type: ModelType, model_path: str):
@@ -144,34 +599,32 @@ class OpenSourceTokenCounter(BaseTokenCounter):
                 model should be located.
         """
 
-        # Use a fast Rust-based tokenizer if it is supported for a given model.
-        # If a fast tokenizer is not available for a given model,
-        # a normal Python-based tokenizer is returned instead.
-        from transformers import AutoTokenizer
-
-        try:
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_path,
-                use_fast=True,
-            )
-        except TypeError:
-            tokenizer = AutoTokenizer.from_pretrained(
-                model_path,
-                use_fast=False,
-            )
-        except Exception:
-            raise ValueError(
-                f"Invalid `model_path` ({model_path}) is provided. "
-                "Tokenizer loading failed."
-            )
-
+        self._registry = TokenizerRegistry.default()
+        tokenizer = self._registry.get_hf_tokenizer(model_path)
         self.tokenizer = tokenizer
         self.model_type = model_type
+        self.model_path = model_path
+        # Chunks are counted without the special tokens added by the
+        # tokenizer, e.g. `<s>`, which are added once per prompt instead
+        self._namespace = f"{model_path}:no_special_tokens"
+        self._num_added_special_tokens = len(tokenizer("").input_ids)
+
+    def _count_chunks(self, chunks: List[str]) -> List[int]:
+        return [
+            len(input_ids)
+            for input_ids in self.tokenizer(
+                chunks, add_special_tokens=False
+            ).input_ids
+        ]
 
     def count_tokens_from_messages(self, messages: List[OpenAIMessage]) -> int:
         r"""Count number of tokens in the provided message list using
         loaded tokenizer specific for this type of model.
 
+        The prompt is tokenized in chunks of two turns, whose token counts
+        are cached, so that counting a growing chat history only tokenizes
+        its newest turns.
+
         Args:
             messages (List[OpenAIMessage]): Message list with the chat history
                 in OpenAI API format.
@@ -179,10 +632,37 @@ class OpenSourceTokenCounter(BaseTokenCounter):
         Returns:
             int: Number of tokens in the messages.
         """
-        prompt = messages_to_prompt(messages, self.model_type)
-        input_ids = self.tokenizer(prompt).input_ids
+        return self.count_tokens_batch([messages])[0]
 
-        return len(input_ids)
+    def count_tokens_batch(
+        self, messages_list: List[List[OpenAIMessage]]
+    ) -> List[int]:
+        r"""Count number of tokens in each of the provided message lists,
+        tokenizing all uncached prompt chunks in one call of the tokenizer.
+
+        Args:
+            messages_list (List[List[OpenAIMessage]]): Message lists with the
+                chat history in OpenAI API format.
+
+        Returns:
+            List[int]: Number of tokens in each message list.
+        """
+        chunks_list = [
+            messages_to_prompt_chunks(messages, self.model_type)
+            for messages in messages_list
+        ]
+        chunk_counts = iter(
+            self._registry.count_tokens_batch(
+                self._namespace,
+                [chunk for chunks in chunks_list for chunk in chunks],
+                self._count_chunks,
+            )
+        )
+        return [
+            self._num_added_special_tokens
+            + sum(next(chunk_counts) for _ in chunks)
+            for chunks in chunks_list
+        ]
 
 
 class OpenAITokenCounter(BaseTokenCounter):
@@ -218,6 +698,26 @@ class OpenAITokenCounter(BaseTokenCounter):
             )
 
         self.encoding = get_model_encoding(self.model)
+        self._registry = TokenizerRegistry.default()
+
+    def create_estimator(self) -> TokenEstimator:
+        r"""Creates a :obj:`TokenEstimator` approximating this counter, with
+        the default ratio of bytes per token of its encoding.
+
+        Returns:
+            TokenEstimator: An uncalibrated estimator.
+        """
+        return TokenEstimator(
+            _BYTES_PER_TOKEN.get(self.encoding.name, 4.0),
+            self.tokens_per_message,
+            self.tokens_per_name,
+        )
+
+    def _encode_lengths(self, texts: List[str]) -> List[int]:
+        if len(texts) < _MIN_ENCODE_BATCH_SIZE:
+            return [len(self.encoding.encode(text)) for text in texts]
+        # tiktoken releases the GIL and encodes the batch on worker threads
+        return [len(tokens) for tokens in self.encoding.encode_batch(texts)]
 
     def count_tokens_from_messages(self, messages: List[OpenAIMessage]) -> int:
         r"""Count number of tokens in the provided message list with the
@@ -230,46 +730,62 @@ class OpenAITokenCounter(BaseTokenCounter):
         Returns:
             int: Number of tokens in the messages.
         """
-        num_tokens = 0
-        for message in messages:
-            num_tokens += self.tokens_per_message
-            for key, value in message.items():
-                if not isinstance(value, list):
-                    num_tokens += len(self.encoding.encode(str(value)))
-                else:
-                    for item in value:
-                        if item["type"] == "text":
-                            num_tokens += len(
-                                self.encoding.encode(str(item["text"]))
-                            )
-                        elif item["type"] == "image_url":
-                            image_str: str = item["image_url"]["url"]
-                            detail = item["image_url"]["detail"]
-
-                            image_prefix_format = "data:image/{};base64,"
-                            image_prefix: Optional[str] = None
-                            for image_type in list(OpenAIImageType):
-                                # Find the correct image format
-                                image_prefix = image_prefix_format.format(
-                                    image_type.value
+        return self.count_tokens_batch([messages])[0]
+
+    def count_tokens_batch(
+        self, messages_list: List[List[OpenAIMessage]]
+    ) -> List[int]:
+        r"""Count number of tokens in each of the provided message lists.
+        The texts of all messages are tokenized in one batch.
+
+        Args:
+            messages_list (List[List[OpenAIMessage]]): Message lists with the
+                chat history in OpenAI API format.
+
+        Returns:
+            List[int]: Number of tokens in each message list.
+        """
+        # Count everything but the texts, and collect the texts of each list
+        texts: List[str] = []
+        text_owners: List[int] = []
+        counts: List[int] = []
+        for owner, messages in enumerate(messages_list):
+            num_tokens = 0
+            for message in messages:
+                num_tokens += self.tokens_per_message
+                for key, value in message.items():
+                    if not isinstance(value, list):
+                        texts.append(str(value))
+                        text_owners.append(owner)
+                    else:
+                        for item in value:
+                            if item["type"] == "text":
+                                texts.append(str(item["text"]))
+                                text_owners.append(owner)
+                            elif item["type"] == "image_url":
+                                width, height = get_image_size_from_url(
+                                    item["image_url"]["url"]
                                 )
-                                if image_prefix in image_str:
-                                    break
-                            assert isinstance(image_prefix, str)
-                            encoded_image = image_str.split(image_prefix)[1]
-                            image_bytes = BytesIO(
-                                base64.b64decode(encoded_image)
-                            )
-                            image = Image.open(image_bytes)
-                            num_tokens += count_tokens_from_image(
-                                image, OpenAIVisionDetailType(detail)
-                            )
-                if key == "name":
-                    num_tokens += self.tokens_per_name
-
-        # every reply is primed with <|start|>assistant<|message|>
-        num_tokens += 3
-        return num_tokens
+                                num_tokens += count_tokens_from_image_size(
+                                    width,
+                                    height,
+                                    OpenAIVisionDetailType(
+                                        item["image_url"]["detail"]
+                                    ),
+                                )
+                    if key == "name":
+                        num_tokens += self.tokens_per_name
+
+            # every reply is primed with <|start|>assistant<|message|>
+            num_tokens += 3
+            counts.append(num_tokens)
+
+        text_counts = self._registry.count_tokens_batch(
+            self.encoding.name, texts, self._encode_lengths
+        )
+        for owner, num_tokens in zip(text_owners, text_counts):
+            counts[owner] += num_tokens
+        return counts
 
 
 class AnthropicTokenCounter(BaseTokenCounter):
@@ -282,7 +798,8 @@ class AnthropicTokenCounter(BaseTokenCounter):
         """
 
         self.model_type = model_type
-        self.client = Anthropic()
+        self._registry = TokenizerRegistry.default()
+        self.client = self._registry.get_anthropic_client()
         self.tokenizer = self.client.get_tokenizer()
 
     def count_tokens_from_messages(self, messages: List[OpenAIMessage]) -> int:
@@ -298,7 +815,9 @@ class AnthropicTokenCounter(BaseTokenCounter):
         """
         prompt = messages_to_prompt(messages, self.model_type)
 
-        return self.client.count_tokens(prompt)
+        return self._registry.count_tokens(
+            "anthropic", prompt, self.client.count_tokens
+        )
 
 
 class LiteLLMTokenCounter:
@@ -371,13 +890,31 @@ def count_tokens_from_image(
         detail (OpenAIVisionDetailType): Image detail type to count
             number of tokens.
 
+    Returns:
+        int: Number of tokens for the image given a detail type.
+    """
+    width, height = image.size
+    return count_tokens_from_image_size(width, height, detail)
+
+
+def count_tokens_from_image_size(
+    width: int, height: int, detail: OpenAIVisionDetailType
+) -> int:
+    r"""Count image tokens for OpenAI vision model from the dimensions of the
+    image. See :func:`count_tokens_from_image` for details.
+
+    Args:
+        width (int): Width of the image in pixels.
+        height (int): Height of the image in pixels.
+        detail (OpenAIVisionDetailType): Image detail type to count
+            number of tokens.
+
     Returns:
         int: Number of tokens for the image given a detail type.
     """
     if detail == OpenAIVisionDetailType.LOW:
         return LOW_DETAIL_TOKENS
 
-    width, height = image.size
     if width > FIT_SQUARE_PIXELS or height > FIT_SQUARE_PIXELS:
         scaling_factor = max(width, height) / FIT_SQUARE_PIXELS
         width = int(width / scaling_factor)
@@ -391,3 +928,105 @@ def count_tokens_from_image(
     w = ceil(scaled_width / SQUARE_PIXELS)
     total = EXTRA_TOKENS + SQUARE_TOKENS * h * w
     return total
+
+
+def get_image_size_from_url(url: str) -> Tuple[int, int]:
+    r"""Gets the dimensions of an image given as a base64 data URL. Only the
+    header of the image is decoded for PNG, JPEG, GIF and WEBP images, and
+    the whole image is decoded for other formats. Results are cached by the
+    hash and length of the URL.
+
+    Args:
+        url (str): The data URL of the image, e.g.
+            `data:image/png;base64,...`.
+
+    Returns:
+        Tuple[int, int]: The width and height of the image in pixels.
+    """
+    key = (hash(url), len(url))
+    with _image_size_cache_lock:
+        size = _image_size_cache.get(key)
+        if size is not None:
+            _image_size_cache.move_to_end(key)
+            return size
+
+    # The prefix is at the start, no need to search the whole payload
+    prefix_end = url.find(";base64,", 0, _DATA_URL_PREFIX_SEARCH_LENGTH)
+    if prefix_end == -1:
+        raise ValueError("Image URL is not a base64 data URL.")
+    payload_start = prefix_end + len(";base64,")
+
+    # Decode growing prefixes, as JPEG metadata may precede the header
+    prefix_length = _IMAGE_HEADER_PREFIX_LENGTH
+    while True:
+        data = base64.b64decode(
+            url[payload_start : payload_start + prefix_length]
+        )
+        size = _parse_image_size(data)
+        if size is not None or payload_start + prefix_length >= len(url):
+            break
+        prefix_length *= 4
+    if size is None:
+        # The whole payload has been decoded
+        size = Image.open(BytesIO(data)).size
+
+    with _image_size_cache_lock:
+        _image_size_cache[key] = size
+        if len(_image_size_cache) > _IMAGE_SIZE_CACHE_SIZE:
+            _image_size_cache.popitem(last=False)
+    return size
+
+
+def _parse_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    r"""Parses the dimensions of a PNG, JPEG, GIF or WEBP image from the
+    first bytes of the image. Returns `None` if the format is not recognized
+    or the header is not contained in the bytes."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR":
+        if len(data) >= 24:
+            width, height = struct.unpack(">II", data[16:24])
+            return width, height
+        return None
+
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) >= 10:
+            width, height = struct.unpack("<HH", data[6:10])
+            return width, height
+        return None
+
+    if data.startswith(b"\xff\xd8"):
+        offset = 2
+        while offset + 9 <= len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            # Fill bytes, and markers without a segment
+            if marker == 0xFF:
+                offset += 1
+                continue
+            if marker in _JPEG_STANDALONE_MARKERS:
+                offset += 2
+                continue
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack(
+                    ">HH", data[offset + 5 : offset + 9]
+                )
+                return width, height
+            (segment_length,) = struct.unpack(
+                ">H", data[offset + 2 : offset + 4]
+            )
+            offset += 2 + segment_length
+        return None
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return width, height
+    return None